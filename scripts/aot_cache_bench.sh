@@ -0,0 +1,22 @@
+#!/bin/bash
+# Compare cold vs warm load times of the .metta AOT cache.
+# usage: scripts/aot_cache_bench.sh [file.metta ...]
+
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+METTALOG="${METTALOG:-$SCRIPT_DIR/../mettalog}"
+export METTALOG_CACHE_DIR="${METTALOG_CACHE_DIR:-$(mktemp -d)}"
+
+FILES=("$@")
+if [ ${#FILES[@]} -eq 0 ]; then
+    FILES=("$SCRIPT_DIR/../tests/performance/basic/coins.metta")
+fi
+
+for file in "${FILES[@]}"; do
+    rm -f "$METTALOG_CACHE_DIR"/*.qlf
+    echo "== $file (cold, cache dir $METTALOG_CACHE_DIR)"
+    /usr/bin/time -f "   %es elapsed, %MKB maxrss" "$METTALOG" --aot-cache=true "$file" > /dev/null
+    echo "== $file (warm)"
+    /usr/bin/time -f "   %es elapsed, %MKB maxrss" "$METTALOG" --aot-cache=true "$file" > /dev/null
+    echo "== $file (cache disabled)"
+    /usr/bin/time -f "   %es elapsed, %MKB maxrss" "$METTALOG" --aot-cache=false "$file" > /dev/null
+done
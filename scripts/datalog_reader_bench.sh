@@ -0,0 +1,18 @@
+#!/bin/bash
+# Throughput of the datalog-shaped fast reader vs the generic reader.
+# usage: scripts/datalog_reader_bench.sh [lines]   (default 10000000)
+
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+METTALOG="${METTALOG:-$SCRIPT_DIR/../mettalog}"
+LINES="${1:-10000000}"
+DATA="$(mktemp --suffix=.metta)"
+trap 'rm -f "$DATA"' EXIT
+
+awk -v n="$LINES" 'BEGIN { for (i = 0; i < n; i++) printf("(edge n%d n%d %d)\n", i, i+1, i % 97) }' > "$DATA"
+echo "== $LINES rows in $DATA"
+
+for mode in true false; do
+    echo "== --data-reader=$mode"
+    /usr/bin/time -f "   %es elapsed, %MKB maxrss" \
+        "$METTALOG" --data-reader=$mode --aot-cache=false --load-stream=false "$DATA" > /dev/null
+done
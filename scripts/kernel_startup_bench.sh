@@ -0,0 +1,45 @@
+#!/bin/bash
+# Time from launching a MeTTa Jupyter kernel until it answers kernel_info,
+# cold (METTA_KERNEL_POOL=0) vs forked from a warm metta_kernel_pool.
+# usage: scripts/kernel_startup_bench.sh [runs]
+
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+RUNS="${1:-5}"
+WORK="$(mktemp -d)"
+export PYTHONPATH="$SCRIPT_DIR/../src${PYTHONPATH:+:$PYTHONPATH}"
+export METTA_KERNEL_POOL_SOCKET="$WORK/pool.sock"
+export JUPYTER_PATH="$WORK"
+POOL_PID=""
+trap '[ -n "$POOL_PID" ] && kill "$POOL_PID"; rm -rf "$WORK"' EXIT
+
+mkdir -p "$WORK/kernels/metta_bench"
+cp "$SCRIPT_DIR/../src/kernel.json" "$WORK/kernels/metta_bench/kernel.json"
+
+time_kernel_starts() {
+    python3 - "$RUNS" <<'EOF'
+import sys, time
+from jupyter_client.manager import KernelManager
+times = []
+for _ in range(int(sys.argv[1])):
+    km = KernelManager(kernel_name='metta_bench')
+    t0 = time.monotonic()
+    km.start_kernel()
+    kc = km.client()
+    kc.start_channels()
+    kc.wait_for_ready(timeout=300)
+    times.append(time.monotonic() - t0)
+    kc.stop_channels()
+    km.shutdown_kernel(now=True)
+times.sort()
+print(f"   min {times[0]:.3f}s  median {times[len(times) // 2]:.3f}s  max {times[-1]:.3f}s")
+EOF
+}
+
+echo "== cold start ($RUNS runs)"
+METTA_KERNEL_POOL=0 time_kernel_starts
+
+echo "== warm pool ($RUNS runs)"
+python3 -m metta_kernel_pool --serve 2> "$WORK/pool.log" &
+POOL_PID=$!
+/usr/bin/time -f "   pool ready after %es" bash -c "until [ -S '$METTA_KERNEL_POOL_SOCKET' ]; do sleep 0.1; done"
+time_kernel_starts
@@ -0,0 +1,27 @@
+#!/bin/bash
+# Run tests/compiler_baseline with the optimizer at its defaults, with every
+# pass off, and with each pass on by itself, and print the LoonIt totals.
+# usage: scripts/optimizer_pass_matrix.sh [test dir]
+
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+METTALOG="${METTALOG:-$SCRIPT_DIR/../mettalog}"
+TESTS="${1:-$SCRIPT_DIR/../tests/compiler_baseline}"
+PASSES=(direct-calls constant-fold dead-assign inline-builtins tail-call)
+
+all_off=()
+for pass in "${PASSES[@]}"; do
+    all_off+=("--opt-$pass=false")
+done
+
+run_with() {
+    local label="$1"
+    shift
+    echo "== $label"
+    "$METTALOG" --test "$@" "$TESTS" 2>&1 | grep -E '^(Successes|Failures):' | sed 's/^/   /'
+}
+
+run_with "defaults"
+run_with "all passes off" "${all_off[@]}"
+for pass in "${PASSES[@]}"; do
+    run_with "only $pass" "${all_off[@]}" "--opt-$pass=true"
+done
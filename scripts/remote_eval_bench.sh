@@ -0,0 +1,28 @@
+#!/bin/bash
+# remote-eval! round trips per second against a local vspace service,
+# connecting per call vs through the connection pool.
+# usage: scripts/remote_eval_bench.sh [calls] [port]   (default 2000 3099)
+
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+METTALOG="${METTALOG:-$SCRIPT_DIR/../mettalog}"
+CALLS="${1:-2000}"
+PORT="${2:-3099}"
+DATA="$(mktemp --suffix=.metta)"
+trap 'rm -f "$DATA"' EXIT
+
+{
+    echo "!(start-vspace-service &self $PORT)"
+    for ((i = 0; i < CALLS; i++)); do
+        echo "!(remote-eval $PORT (+ $i 1))"
+    done
+} > "$DATA"
+echo "== $CALLS remote-eval calls to localhost:$PORT"
+
+for size in 0 4; do
+    echo "== --remote-pool-size=$size"
+    START=$(date +%s.%N)
+    "$METTALOG" --remote-pool-size=$size --aot-cache=false "$DATA" > /dev/null
+    END=$(date +%s.%N)
+    awk -v s="$START" -v e="$END" -v n="$CALLS" \
+        'BEGIN { printf("   %.2fs elapsed, %.0f calls/sec\n", e - s, n / (e - s)) }'
+done
@@ -0,0 +1,27 @@
+#!/bin/bash
+# Throughput of save-space! with the fast bulk writer vs write_src.
+# usage: scripts/write_src_bench.sh [atoms]   (default 1000000)
+
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+METTALOG="${METTALOG:-$SCRIPT_DIR/../mettalog}"
+ATOMS="${1:-1000000}"
+DATA="$(mktemp --suffix=.metta)"
+SAVE="$(mktemp --suffix=.metta)"
+OUT="$(mktemp --suffix=.metta)"
+trap 'rm -f "$DATA" "$SAVE" "$OUT"' EXIT
+
+awk -v n="$ATOMS" 'BEGIN { for (i = 0; i < n; i++) printf("(edge n%d \"label %d\" (w %d %d.5))\n", i, i % 89, i % 97, i % 13) }' > "$DATA"
+cp "$DATA" "$SAVE"
+echo "!(save-space! &self \"$OUT\")" >> "$SAVE"
+echo "== $ATOMS atoms in $DATA"
+
+echo "== load only"
+/usr/bin/time -f "   %es elapsed, %MKB maxrss" \
+    "$METTALOG" --aot-cache=false "$DATA" > /dev/null
+
+for mode in true false; do
+    echo "== load + save-space! --fast-print=$mode"
+    /usr/bin/time -f "   %es elapsed, %MKB maxrss" \
+        "$METTALOG" --fast-print=$mode --aot-cache=false "$SAVE" > /dev/null
+    echo "   $(wc -c < "$OUT") bytes written"
+done
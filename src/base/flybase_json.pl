@@ -102,13 +102,89 @@ process_json_file(File, MXFile):-
     throw(process_json_file(File, MXFile)).
 
 
+process_json_file_direct(File):- \+ option_value(fb_json_stream,false),!,
+    setup_call_cleanup(
+               open_fb_source(File, Stream,[encoding(utf8)]),
+               process_json_stream([],Stream),
+               close(Stream)).
 process_json_file_direct(File):-
     setup_call_cleanup(
-               open(File, read, Stream,[encoding(utf8)]),
+               open_fb_source(File, Stream,[encoding(utf8)]),
                json_read(Stream, JSONDict),
                close(Stream)),
     process_json([],JSONDict).
 
+% Walks the outer object/array of a JSON file and the arrays directly under
+% its keys one element at a time, handing each element to with_json1/2 just
+% as process_json/2 would.  Peak memory is bounded by the largest element
+% instead of the whole file.
+process_json_stream(O,In):- json_stream_walk(with_json1,O,In).
+
+json_stream_walk(Each,O,In):-
+  json_skip_ws(In), peek_char(In,C),
+  (C=='[' -> (get_char(In,_), json_stream_array(Each,O,In))
+  ;C=='{' -> (get_char(In,_), json_stream_object(Each,O,In))
+  ;C==end_of_file -> true
+  ; (json_read(In,Term), call(Each,O,Term))).
+
+json_stream_array(Each,O,In):-
+  json_skip_ws(In), peek_char(In,C),
+  (C==']' -> get_char(In,_)
+  ; (json_read_sep(In,Elem,Sep),
+     call(Each,O,Elem),
+     (Sep==',' -> json_stream_array(Each,O,In)
+     ;Sep==']' -> true
+     ; throw(error(syntax_error(json(expected(',]',Sep))),In))))).
+
+json_stream_object(Each,O,In):-
+  json_skip_ws(In), peek_char(In,C),
+  (C=='}' -> get_char(In,_)
+  ; (json_read_sep(In,Key0,Colon), (string(Key0)->atom_string(Key,Key0);Key=Key0),
+     (Colon==':' -> true ; throw(error(syntax_error(json(expected(':',Colon))),In))),
+     json_skip_ws(In), peek_char(In,V),
+     (V=='['
+       -> (get_char(In,_), (Key==driver -> KO=O ; KO=[Key|O]),
+           json_stream_array(Each,KO,In),
+           json_skip_ws(In), get_char(In,Sep))
+       ; (json_read_sep(In,Value,Sep), call(Each,O,Key=Value))),
+     (Sep==',' -> json_stream_object(Each,O,In)
+     ;Sep=='}' -> true
+     ; throw(error(syntax_error(json(expected(',}',Sep))),In))))).
+
+% json_read/2 reads one character past the value and throws it away, which
+% would eat the : or , that follows; json:json_value/4 hands it back instead
+json_read_sep(In,Term,Sep):-
+  json:make_json_options([],Options,_),
+  json:json_value(In,Term,Next,Options),
+  (Next == -1 -> Sep = end_of_file
+  ; code_type(Next,space) -> (json_skip_ws(In), get_char(In,Sep))
+  ; char_code(Sep,Next)).
+
+json_skip_ws(In):- peek_char(In,C), C\==end_of_file, char_type(C,space),!,
+  get_char(In,_), json_skip_ws(In).
+json_skip_ws(_).
+
+% The key paths the stream walker hands on, one per element, for checking
+% it against a small file:  !(fb-json-stream-paths! "some.json")
+fb_json_stream_paths(File,Paths):-
+  (exists_file(File) -> Path = File
+  ; (option_value(loading_file,Loading), atomic(Loading),
+     file_directory_name(Loading,Dir), directory_file_path(Dir,File,Path))),
+  setup_call_cleanup(
+     open_fb_source(Path,In,[encoding(utf8)]),
+     (nb_setval(fb_json_paths,[]),
+      json_stream_walk(note_json_stream_path,[],In),
+      nb_getval(fb_json_paths,Rev)),
+     close(In)),
+  reverse(Rev,Paths).
+
+note_json_stream_path(O,Elem):-
+  (Elem = (K=_) -> Path0 = [K|O] ; Path0 = O),
+  reverse(Path0,Path),
+  nb_getval(fb_json_paths,Paths), nb_setval(fb_json_paths,[Path|Paths]).
+
+'fb-json-stream-paths!'(File,Paths):- fb_json_stream_paths(File,Paths).
+
 process_json(JsonString):- process_json([],JsonString),!.
 
 
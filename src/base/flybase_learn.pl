@@ -277,7 +277,10 @@ fb_two_preds(Fn1,Nth1,Arity1,Fn2,Nth2,Arity2):-
   fb_pred_g(Fn1,Arity1), fb_pred_g(Fn2,Arity2),Fn1@>Fn2,
   mine_typelevel_overlaps(_,'ConceptMapFn'(_Type1,Nth1,Fn1/*Arity1*/),'ConceptMapFn'(_Type2,Nth2,Fn2/*Arity2*/)).
 
-table_colnum_type(Fn,Nth,Type):- table_n_type(Fn,Nth,TypeC,TypeB),(nonvar(TypeB)->Type=TypeB;Type=TypeC).
+table_colnum_type(Fn,Nth,Type):- table_n_type(Fn,Nth,TypeC,TypeB),
+  (nonvar(TypeB)->Type=TypeB
+  ; fb_column_type(Fn,_,Nth,fbid(Prefix))->Type=Prefix  % the FBid prefix seen while loading
+  ; Type=TypeC).
 
 synth_conj(QV,(Atom1),(Atom2)):-
   maybe_corisponds('ConceptMapFn'(Type1,Nth1,Fn1),'ConceptMapFn'(Type2,Nth2,Fn2)),
@@ -9,7 +9,7 @@
 :- ensure_loaded(swi_support).
 
 
-fb_stats:- metta_stats,!.
+fb_stats:- with_mutex(metta_stats,(metta_stats,fb_qlf_cache_stats)),!.
 
 '&flybase':for_metta('&flybase',P):- fb_pred_nr(F,A),current_predicate(F/A),length(L,A),P=[F|L],apply(F,L).
 
@@ -144,8 +144,12 @@ all_metta_done:-
 
 
 
-loaded_from_file_count(X):- flag(loaded_from_file_count,X,X).
-incr_file_count(X):- flag(loaded_from_file_count,X,X+1),  flag(total_loaded_symbols,TA,TA+1), flag(total_loaded_atoms,TA,TA+1).
+% worker threads of a parallel load count their current file under their own flag
+file_count_flag(Key):- nb_current(fb_count_flag,Key),Key\==[],!.
+file_count_flag(loaded_from_file_count).
+
+loaded_from_file_count(X):- file_count_flag(Key),flag(Key,X,X).
+incr_file_count(X):- file_count_flag(Key),flag(Key,X,X+1),  flag(total_loaded_symbols,TA,TA+1), flag(total_loaded_atoms,TB,TB+1).
 
 should_cache:- fail, loaded_from_file_count(X), option_else(max_disk_cache,Num,1000), X=<Num.
 reached_file_max:- option_value(max_per_file,Y),Y\==inf,Y\==0,loaded_from_file_count(X),X>=Y.
@@ -175,6 +179,7 @@ should_show_data(X):- nb_current(loading_file,F),F\==[],symbol_concat(_,'.obo',F
 %:- set_option_value(max_per_file,20_000_000_000_000_000_000_000_000_000_000_000).
 % load_flybase('./precomputed_files/insertions/fu_gal4_table_fb_*.json').
 :- set_option_value(max_disk_cache,1000).
+:- set_option_value(fb_threads,auto).
 :- set_option_value(samples_per_million,30).
 :- set_option_value(full_canon,true).
 
@@ -228,6 +233,10 @@ fbdead:- fb_pred_nr(F,A),functor(P,F,A),arg(_,P,xxxxxxxxxxxxxxxxx),no_repeats(P,
 fbdead.
 
 :- use_module(library(csv)).
+:- use_module(library(thread)).
+:- use_module(library(sha)).
+:- use_module(library(zlib)).
+:- use_module(library(process)).
 
 %:- current_prolog_flag(libswipl,_)->use_module(library(logicmoo_utils)); true.
 
@@ -300,6 +309,7 @@ load_flybase_files:-
 
 load_flybase_das_11:-
   % DAS''s 11 tsv and 1 json file
+ load_flybase_goals([
   load_flybase('./precomputed_files/*/ncRNA_genes_fb_*.json'),
   load_flybase('./precomputed_files/*/fbgn_fbtr_fbpp_expanded*.tsv'),
   load_flybase('./precomputed_files/*/physical_interactions_mitab*.tsv'),
@@ -315,7 +325,7 @@ load_flybase_das_11:-
 
   load_flybase('./precomputed_files/*/disease_model_annotations*.tsv'),
   load_flybase('./precomputed_files/*/dmel_human_orthologs_disease*.tsv'),
-  load_flybase('./precomputed_files/*/fbrf_pmid_pmcid_doi*.tsv'),
+  load_flybase('./precomputed_files/*/fbrf_pmid_pmcid_doi*.tsv')]),
   format("~n================================================================================================="),
   format("~n=====================================Das Checkpoint=============================================="),
   format("~n================================================================================================="),
@@ -326,7 +336,7 @@ load_flybase_das_11:-
   !.
 
 load_flybase_files_ftp:-
- maplist(must_det_ll,[
+ load_flybase_goals([
   load_flybase('./precomputed_files/collaborators/pmid_fbgn_uniprot*.tsv'),
 
  %% load_flybase_obo_files,
@@ -380,6 +390,90 @@ load_flybase_files_ftp:-
   load_fbase_after_17]),
   !.
 
+
+% ==============================
+% Parallel multi-file loading
+% ==============================
+% load_flybase_goals(+Goals) runs a list of load steps in order.  Plain
+% load_flybase/1,2 steps (optionally inside with_option/2) are expanded to
+% their files up front and loaded on a pool of fb_threads worker threads;
+% any other goal is a barrier that runs in the calling thread once the files
+% queued before it are loaded.  Files that feed the same predicate stay on
+% one worker in their original order, so every predicate ends up with the
+% same clauses in the same order as a sequential load.
+load_flybase_goals(Goals):- \+ use_parallel_load,!, maplist(must_det_ll,Goals).
+load_flybase_goals(Goals):- load_flybase_goals(Goals,[]).
+
+load_flybase_goals([],Jobs):- !, load_flybase_jobs(Jobs).
+load_flybase_goals([G|Goals],Jobs):- fb_goal_jobs([],G,GJobs),!,
+  append(Jobs,GJobs,NewJobs), load_flybase_goals(Goals,NewJobs).
+load_flybase_goals([G|Goals],Jobs):-
+  load_flybase_jobs(Jobs), must_det_ll(G), load_flybase_goals(Goals,[]).
+
+% converting writes through per-file output streams held in the main thread
+use_parallel_load:- \+ is_converting, fb_thread_count(N), N>1.
+
+fb_thread_count(N):- option_value(fb_threads,V), integer(V),!, N=V.
+fb_thread_count(N):- option_value(fb_threads,V), atom(V), atom_number(V,N), integer(N),!.
+fb_thread_count(N):- current_prolog_flag(cpu_count,N).
+
+:- dynamic(fb_parallel_job/4).
+fb_goal_jobs(Opts,with_option(More,G),Jobs):- !,
+  (is_list(More)->MoreL=More;MoreL=[More]),
+  append(Opts,MoreL,AllOpts), fb_goal_jobs(AllOpts,G,Jobs).
+fb_goal_jobs(Opts,must_det_ll(G),Jobs):- !, fb_goal_jobs(Opts,G,Jobs).
+fb_goal_jobs(Opts,load_flybase(File),Jobs):- symbol(File),
+  file_name_extension(_,Ext,File),!, fb_goal_jobs(Opts,load_flybase(File,Ext),Jobs).
+fb_goal_jobs(Opts,load_flybase(File,Ext),Jobs):- symbol(File),
+  retractall(fb_parallel_job(_,_,_,_)),
+  with_wild_path(note_parallel_job(Opts,Ext),File),
+  findall(fb_job(Fn,O,E,F),retract(fb_parallel_job(Fn,O,E,F)),Jobs).
+
+% same file to predicate mapping as load_flybase0/2
+note_parallel_job(Opts,Ext,File):-
+  ((Ext=='',file_name_extension(_,Ext2,File),Ext2\=='')->E=Ext2;E=Ext),
+  fb_source_name(E,File,_,Name), data_pred(Name,Fn),
+  assertz(fb_parallel_job(Fn,Opts,E,File)).
+
+load_flybase_jobs([]):- !.
+load_flybase_jobs(Jobs):-
+  fb_job_groups(Jobs,Groups),
+  fb_thread_count(N0), length(Groups,NG), N is max(1,min(N0,NG)),
+  fb_option_snapshot(Snap),
+  maplist(fb_group_goal(Snap),Groups,Goals),
+  get_time(T0),
+  concurrent(N,Goals,[]),
+  get_time(T1), Secs is T1-T0,
+  length(Jobs,NF),
+  with_mutex(metta_stats,(
+    pl_stats('Files loaded in parallel',NF),
+    pl_stats('Loader threads',N),
+    pl_stats('Wall time (secs)',Secs),nl)).
+
+fb_job_groups([],[]).
+fb_job_groups([Job|Jobs],[[Job|Same]|Groups]):- Job = fb_job(Fn,_,_,_),
+  partition(same_fb_job_pred(Fn),Jobs,Same,Rest),
+  fb_job_groups(Rest,Groups).
+
+same_fb_job_pred(Fn,fb_job(Fn2,_,_,_)):- Fn2==Fn.
+
+% global variables are thread local, so workers start from a copy of the caller's options
+fb_option_snapshot(Snap):-
+  findall(N=V,(nb_current(N,V),atom(N),\+ sub_atom(N,0,_,_,'$'),atomic(V),
+     \+ memberchk(N,[fb_count_flag,tracking_file,last_printed_time])),Snap).
+
+fb_group_goal(Snap,Group,load_flybase_group(Snap,Group)).
+
+load_flybase_group(Snap,Group):-
+  forall(member(N=V,Snap),nb_setval(N,V)),
+  thread_self(Me), thread_property(Me,id(Id)),
+  atom_concat(loaded_from_file_count_,Id,Key),
+  nb_setval(fb_count_flag,Key),
+  maplist(load_flybase_job,Group).
+
+load_flybase_job(fb_job(_Fn,Opts,Ext,File)):-
+  with_option(Opts,must_det_ll(load_flybase0(Ext,File))).
+
  gene_sequences:-
     load_flybase('./dmel_r6.55/gff/dmel-all-r6.55.gff'),
     load_flybase('./dmel_r6.55/fasta/*.fasta'),
@@ -989,10 +1083,11 @@ track_load_into_file0(Filename,Goal):-
   nb_setval(tracking_file,Filename),
   start_html_of(Filename),
   fbug(track_load_into_file(Filename)),
-  flag(loaded_from_file_count,Was,0))),
+  file_count_flag(Key),
+  flag(Key,Was,0))),
   must_det_ll(with_option(loading_file, Filename, time(must_det_ll(Goal)))),
   must_det_ll((
-  flag(loaded_from_file_count,New,Was),
+  flag(Key,New,Was),
   ((New>0 ; \+ is_loaded_from_file_count(Filename,_))->assert(is_loaded_from_file_count(Filename,New));true),
   fbug(Filename=New),
   rename_tmp_files(Filename),
@@ -1035,7 +1130,7 @@ load_fb_gff(Fn,Filename):-
     assert_OBO(pathname(Id,Filename)),!,
     assert_OBO(basename(Id,BaseName)),!,
     assert_OBO(directory(Id,Directory)),!,
-    setup_call_cleanup(open(Filename,read,In), (repeat,load_fb_gff_read(Id,In)), close(In))))).
+    setup_call_cleanup(open_fb_source(Filename,In,[]), (repeat,load_fb_gff_read(Id,In)), close(In))))).
  % Main predicate to parse a GFF line and store it as facts
 load_fb_gff_read(_Fn,In):- (at_end_of_stream(In);reached_file_max),!.
 load_fb_gff_read(Fn,In):- read_line_to_string(In,Line), load_fb_gff_line(Fn,Line),!,fail.
@@ -1096,7 +1191,7 @@ load_fb_fa(Fn,Filename):-
     assert_OBO(pathname(Id,Filename)),!,
     assert_OBO(basename(Id,BaseName)),!,
     assert_OBO(directory(Id,Directory)),!,
-    setup_call_cleanup(open(Filename,read,In,[encoding(utf8)]), load_fb_fa_read(Id,In,_,0), close(In))))).
+    setup_call_cleanup(open_fb_source(Filename,In,[encoding(utf8)]), load_fb_fa_read(Id,In,_,0), close(In))))).
 load_fb_fa_read(_Fn,In, _, _):- (at_end_of_stream(In);reached_file_max),!.
 load_fb_fa_read(Fn,In,FBTe,At):- read_line_to_string(In,Str), load_fb_fa_read_str(Fn,In,FBTe,Str,At).
 
@@ -1118,7 +1213,9 @@ maybe_sample( Fn, Args):- assert_arg_samples(Fn,1,Args).
 
 :- dynamic(fb_arg/1).
 :- dynamic(fb_arg_table_n/3).
-assert_arg_table_n(A,Fn,N):-    assert_new(fb_arg(A)), assert_new(fb_arg_table_n(A,Fn,N)).
+% parallel loads sample into the same tables; fb_assert_side is check-then-assert
+assert_arg_table_n(A,Fn,N):-
+   with_mutex(fb_side_tables,(fb_assert_side(fb_arg(A)), fb_assert_side(fb_arg_table_n(A,Fn,N)))).
 
 assert_arg_samples(Fn,N,[A|Args]):-
    (dont_sample(A)->true;assert_arg_table_n(A,Fn,N)),
@@ -1193,6 +1290,212 @@ use_metta_x:- fail.
 load_fb_cache(_File,OutputFile,_Fn):- exists_file(OutputFile),!,ensure_loaded(OutputFile),!.
 load_fb_cache(File,_OutputFile,_Fn):- load_files([File],[qcompile(large)]).
 
+% ==============================
+% Per-file .qlf cache
+% ==============================
+% The rows a tsv/json file adds are saved to <fb-cache-dir>/<sha1>.qlf, where
+% the key hashes the file's path, size, mtime and content together with the
+% row-shaping options (max_per_file, pred_va, fb_bulk_rows).  Nothing else
+% changes the rows: column profiles only feed lookups.
+% The entries the load added to the side tables (fb_assert_side/1) are
+% saved with the rows and put back on a hit.  A later load of the same file
+% maps the .qlf in instead of parsing it again.  --fb_qlf_cache=false
+% disables, --fb_cache_dir=DIR relocates.
+fb_qlf_cache_version('2').
+
+:- dynamic(fb_cached_pred/3).
+:- dynamic(fb_cached_row/2).
+:- dynamic(fb_cached_side/2).
+:- dynamic(fb_cached_count/2).
+:- multifile(fb_cached_pred/3).
+:- multifile(fb_cached_row/2).
+:- multifile(fb_cached_side/2).
+:- multifile(fb_cached_count/2).
+
+% Side tables (fb_arg/1, fb_arg_table_n/3, fb_arg_type/1, table_n_type/3 and
+% t_h_n/3) are shared by the loader threads, so their clause counts cannot
+% tell which entries a file added.  Each thread logs the entries it adds in
+% fb_side_added/1 instead; callers hold the fb_side_tables mutex.
+:- thread_local(fb_side_added/1).
+
+fb_assert_side(Fact):- fb_assert_side(Fact,_).
+
+fb_assert_side(Fact,Ref):- copy_term(Fact,Copy), clause(Copy,true), Copy=@=Fact,!, Ref=none.
+fb_assert_side(Fact,Ref):- assertz(Fact,Ref), assertz(fb_side_added(Fact)).
+
+use_fb_qlf_cache(Ext):- (Ext==tsv;Ext==json),
+  \+ is_converting, \+ option_value(fb_qlf_cache,false).
+
+fb_cache_dir(Dir):- option_value(fb_cache_dir,Dir), atomic(Dir), Dir\==[], Dir\=='', !.
+fb_cache_dir(Dir):- getenv('METTALOG_CACHE_DIR',Root), Root\=='', !, atom_concat(Root,'/flybase',Dir).
+fb_cache_dir(Dir):- expand_file_name('~/.cache/mettalog/flybase',[Dir]).
+
+fb_qlf_cache_file(Filename,Key,QlfFile):-
+  fb_qlf_cache_version(CV),
+  current_prolog_flag(version,PV),
+  size_file(Filename,Size),
+  time_file(Filename,MTime),
+  fb_content_hash(Filename,Size,MTime,ContentHash),
+  (option_value(max_per_file,Max)->true;Max=[]),
+  (nb_current(pred_va,PredVA)->true;PredVA=[]),
+  (use_fb_bulk_rows->Bulk=bulk;Bulk=rows),
+  format(string(Salted),'~w:~w:~w:~w:~w:~w:~w:~w:~w',
+     [CV,PV,Filename,Size,MTime,Max,PredVA,Bulk,ContentHash]),
+  sha_hash(Salted,Hash,[algorithm(sha1),encoding(utf8)]),
+  hash_atom(Hash,Key),
+  fb_cache_dir(Dir),
+  atomic_list_concat([Dir,'/',Key,'.qlf'],QlfFile).
+
+:- dynamic(fb_file_hash/4).
+% a miss hashes the file once for the lookup and again for the save
+fb_content_hash(Filename,Size,MTime,Hex):- fb_file_hash(Filename,Size,MTime,Hex),!.
+fb_content_hash(Filename,Size,MTime,Hex):-
+  fb_file_sha1(Filename,Hex),
+  retractall(fb_file_hash(Filename,_,_,_)),
+  assertz(fb_file_hash(Filename,Size,MTime,Hex)).
+
+% FlyBase files run to gigabytes, so hash them a block at a time
+fb_file_sha1(Filename,Hex):-
+  sha_new_ctx(Ctx0,[algorithm(sha1),encoding(octet)]),
+  setup_call_cleanup(open(Filename,read,In,[type(binary)]),
+     fb_sha1_stream(In,Ctx0,Hash),
+     close(In)),
+  hash_atom(Hash,Hex).
+
+fb_sha1_stream(In,Ctx0,Hash):-
+  read_string(In,1_048_576,Chunk),
+  (Chunk == "" -> sha_hash_ctx(Ctx0,"",_,Hash)
+   ; (sha_hash_ctx(Ctx0,Chunk,Ctx1,_), fb_sha1_stream(In,Ctx1,Hash))).
+
+load_flybase_ext_cached(_Ext,File,_Fn):- load_fb_qlf_cached(File),!.
+load_flybase_ext_cached(Ext,File,Fn):-
+  absolute_file_name(File,Filename),
+  fb_pred_counts(Before),
+  with_option(fb_qlf_cache,false,load_flybase_ext(Ext,File,Fn)),
+  ignore(save_fb_qlf_cache(Filename,Before)).
+
+load_fb_qlf_cached(File):-
+  absolute_file_name(File,Filename),
+  catch(fb_qlf_cache_file(Filename,Key,QlfFile),_,fail),
+  (exists_file(QlfFile)
+    -> true
+    ; (flag(fb_qlf_cache_misses,M,M+1), fail)),
+  catch(load_files(QlfFile,[silent(true)]),E,
+        (fbug(fb_qlf_cache_load_failed(QlfFile,E)),fail)),
+  \+ \+ fb_cached_count(Key,_),
+  track_load_into_file(Filename,restore_fb_qlf_cache(Key)),
+  unload_file(QlfFile),
+  note_fb_column_profile_current(Filename),
+  flag(fb_qlf_cache_hits,H,H+1),
+  fbug(fb_qlf_cache_hit(Filename)).
+
+% track_load_into_file/2 has set loading_file, so decl_fb_pred/2 records the source
+restore_fb_qlf_cache(Key):-
+  forall(fb_cached_pred(Key,F,A),decl_fb_pred(F,A)),
+  forall(fb_cached_row(Key,Row),assertz(Row)),
+  with_mutex(fb_side_tables,forall(fb_cached_side(Key,Fact),fb_assert_side(Fact))),
+  fb_restored_count(Key).
+
+% the same, but every clause it adds is noted in fb_restored_ref/1 so that
+% fb_rollback_restored/0 can take exactly those back out again
+restore_fb_qlf_cache_tracked(Key):-
+  forall(fb_cached_pred(Key,F,A),decl_fb_pred(F,A)),
+  forall(fb_cached_row(Key,Row),(assertz(Row,Ref),assertz(fb_restored_ref(Ref)))),
+  with_mutex(fb_side_tables,
+    forall((fb_cached_side(Key,Fact), fb_assert_side(Fact,Ref), Ref\==none),
+           (assertz(fb_restored_ref(Ref)),assertz(fb_restored_side(Fact))))),
+  fb_cached_count(Key,N),
+  assertz(fb_restored_rows(N)),
+  fb_restored_count(Key).
+
+fb_restored_count(Key):-
+  fb_cached_count(Key,N),
+  file_count_flag(CountKey),
+  flag(CountKey,X,X+N),
+  flag(total_loaded_symbols,TA,TA+N),
+  flag(total_loaded_atoms,TB,TB+N).
+
+% clause counts of the loaded predicates and the length of this thread's
+% side table log
+fb_pred_counts(Counts):-
+  findall(F/A-NC,(fb_pred(F,A),metta_stats(F,A,NC)),Rows),
+  aggregate_all(count,fb_side_added(_),NS),
+  append(Rows,[side-NS],Counts).
+
+save_fb_qlf_cache(Filename,Before):-
+  catch(save_fb_qlf_cache0(Filename,Before),E,
+        (fbug(fb_qlf_cache_save_failed(Filename,E)),fail)).
+
+save_fb_qlf_cache0(Filename,Before):-
+  findall(F/A,fb_pred_file(F,A,Filename),Preds),
+  Preds\==[],
+  fb_qlf_cache_file(Filename,Key,QlfFile),
+  write_fb_qlf(Key,Preds,Before,QlfFile,N),
+  fbug(fb_qlf_cache_saved(Filename,QlfFile,N)).
+
+% writes the clauses of Preds past their Before counts as a .qlf of fb_cached_row/2
+% facts, and the side table entries added since as fb_cached_side/2 facts
+write_fb_qlf(Key,Preds,Before,QlfFile,N):-
+  file_directory_name(QlfFile,Dir),
+  make_directory_path(Dir),
+  fb_cache_tmp_base(QlfFile,TmpBase),
+  file_name_extension(TmpBase,pl,SrcFile),
+  setup_call_cleanup(open(SrcFile,write,Src,[encoding(utf8)]),
+     (format(Src,':- encoding(utf8).~n',[]),
+      format(Src,':- set_prolog_flag(double_quotes,string).~n',[]),
+      forall(member(PI,[fb_cached_pred/3,fb_cached_row/2,fb_cached_side/2,fb_cached_count/2]),
+        format(Src,':- dynamic(user:~q).~n:- multifile(user:~q).~n',[PI,PI])),
+      nb_setval(fb_cache_rows,0),
+      forall(member(F/A,Preds),
+        ((memberchk(F/A-Skip,Before)->true;Skip=0),
+         write_fb_cached_rows(Src,Key,F,A,Skip))),
+      (memberchk(side-SideSkip,Before)->true;SideSkip=0),
+      write_fb_cached_sides(Src,Key,SideSkip),
+      nb_getval(fb_cache_rows,N),
+      write_fb_cached_fact(Src,fb_cached_count(Key,N))),
+     close(Src)),
+  % qcompile/1 also loads the rows just written; they are only wanted in the .qlf
+  call_cleanup(qcompile(SrcFile),unload_file(SrcFile)),
+  file_name_extension(TmpBase,qlf,TmpQlf),
+  rename_file(TmpQlf,QlfFile),
+  ignore(catch(delete_file(SrcFile),_,true)).
+
+% a temporary name next to File: renaming it into place never crosses file
+% systems, and concurrent writers of the same File don't share it
+fb_cache_tmp_base(File,TmpBase):-
+  current_prolog_flag(pid,Pid),
+  flag(fb_cache_tmp,I,I+1),
+  format(atom(TmpBase),'~w.~w_~w.tmp',[File,Pid,I]).
+
+% the side table entries this thread logged after the first Skip
+write_fb_cached_sides(Src,Key,Skip):-
+  nb_setval(fb_cache_nth,0),
+  forall((fb_side_added(Fact),
+          nb_getval(fb_cache_nth,I), I1 is I+1, nb_setval(fb_cache_nth,I1),
+          I>=Skip),
+     write_fb_cached_fact(Src,fb_cached_side(Key,Fact))).
+
+% rows are appended with assertz, so this file's rows follow the first Skip clauses
+write_fb_cached_rows(Src,Key,F,A,Skip):-
+  write_fb_cached_fact(Src,fb_cached_pred(Key,F,A)),
+  functor(Row,F,A),
+  nb_setval(fb_cache_nth,0),
+  forall((clause(Row,true),
+          nb_getval(fb_cache_nth,I), I1 is I+1, nb_setval(fb_cache_nth,I1),
+          I>=Skip),
+     (write_fb_cached_fact(Src,fb_cached_row(Key,Row)),
+      nb_getval(fb_cache_rows,R), R1 is R+1, nb_setval(fb_cache_rows,R1))).
+
+write_fb_cached_fact(Src,Fact):-
+  write_canonical(Src,user:Fact), write(Src,'.'), nl(Src).
+
+fb_qlf_cache_stats:-
+  flag(fb_qlf_cache_hits,H,H),
+  flag(fb_qlf_cache_misses,M,M),
+  ((H+M) =:= 0 -> true ;
+   (pl_stats('FlyBase qlf cache hits',H),
+    pl_stats('FlyBase qlf cache misses',M),nl)).
+
 
 'load_flybase_tiny':- load_flybase(20_000).
 'load_flybase_full':- load_flybase(1_000_000_000_000_000_000_000_000_000_000_000_000_000_000_000).
@@ -1213,6 +1516,9 @@ load_flybase(File,Ext):-
 exists_with_ext(File,Ext):- atom_concat(File,Ext,Res),exists_file(Res),!.
 
 load_flybase0(Ext,File):- Ext=='',file_name_extension(_,Ext2,File),Ext2\=='',!,load_flybase0(Ext2,File).
+load_flybase0(Ext,File):- fb_compressed_ext(Ext),!,
+  must_det_ll((fb_source_name(Ext,File,InnerExt,Name),
+  data_pred(Name,Fn),load_flybase(InnerExt,File,Fn))).
 load_flybase0(Ext,_File):-  Ext=='pl',!.
 load_flybase0(Ext,_File):-  Ext=='metta', is_converting,!.
 load_flybase0(Ext,_File):-  Ext=='datalog', is_converting,!.
@@ -1221,6 +1527,27 @@ load_flybase0(Ext,File):-
   must_det_ll((file_name_extension(Name,_,File),
   data_pred(Name,Fn),load_flybase(Ext,File,Fn))).
 
+% ==============================
+% Compressed sources
+% ==============================
+% foo.tsv.gz is read through zlib's inflate filter and foo.tsv.zst through a
+% `zstd -dc` pipe, so compressed releases load as foo.tsv would without
+% being unpacked to disk first.
+fb_compressed_ext(gz).
+fb_compressed_ext(zst).
+
+% the inner extension picks the loader, the name without either picks the predicate
+fb_source_name(Ext,File,InnerExt,Name):- fb_compressed_ext(Ext),!,
+  file_name_extension(Inner,_,File), file_name_extension(Name,InnerExt,Inner).
+fb_source_name(Ext,File,Ext,Name):- file_name_extension(Name,_,File).
+
+open_fb_source(File,In,Options):- file_name_extension(_,gz,File),!,
+  gzopen(File,read,In,Options).
+open_fb_source(File,In,Options):- file_name_extension(_,zst,File),!,
+  process_create(path(zstd),['-dc','--',File],[stdout(pipe(In))]),
+  forall(member(Opt,Options),set_stream(In,Opt)).
+open_fb_source(File,In,Options):- open(File,read,In,Options).
+
 :- dynamic(load_state/2).
 %load_flybase(_Ext,_File,OutputFile,_Fn):- exists_file(OutputFile),size_file(OutputFile,N),N>100,!.
 load_flybase(_Ext,File,_Fn):- load_state(File,_),!.
@@ -1240,6 +1567,7 @@ load_flybase_ext(_Ext,File,_Fn):-  fail, atom_concat(File,'.metta',MFile),
   exists_file(MFile), \+ is_converting, % Ext \== 'obo',
   \+ option_value(mettafiles,false),!,
   load_flybase_metta(MFile).
+load_flybase_ext(Ext,File, Fn):-  use_fb_qlf_cache(Ext),!,load_flybase_ext_cached(Ext,File,Fn).
 load_flybase_ext(Ext,File,_Fn):-  Ext==obo,current_predicate(load_obo/1),!,load_obo(File).
 load_flybase_ext(Ext,File,_Fn):-  Ext==scm,include_atomspace_1_0(File).
 load_flybase_ext(Ext,File, Fn):-  Ext==json,!,load_fb_json(Fn,File),!.
@@ -1250,7 +1578,7 @@ load_flybase_ext(Ext,File, Fn):-  Ext==fasta,!,load_fb_fa(Fn,File),!.
 load_flybase_ext(Ext,File,_Fn):-  Ext==metta,current_predicate(load_metta/2),!,load_flybase_metta(File).
 load_flybase_ext(Ext,File, Fn):-  file_to_sep(Ext,Sep),!,
   track_load_into_file(File,
-    setup_call_cleanup(open(File,read,Stream),
+    setup_call_cleanup(open_fb_source(File,Stream,[]),
        must_det_ll(load_flybase_sv(Sep,File,Stream,Fn)),
         close(Stream))),!.
 load_flybase_ext(Ext,File, Fn):-  fbug(missed_loading_flybase(Ext,File,Fn)),!.
@@ -1371,9 +1699,7 @@ into_number(Concept,Arg):- Concept=Arg,!.
 assert_type_of(_Term,_Fn,_N,_Type,_Arg):- \+ should_sample,!.
 assert_type_of(Term,Fn,N,Type,Arg):- is_list(Arg),!,maplist(assert_type_of(Term,Fn,N,Type),Arg).
 assert_type_of(_Term,Fn,N,_Type,Arg):-
- must_det_ll((
-   assert_new(fb_arg(Arg)),
-   assert_new(fb_arg_table_n(Arg,Fn,N)))).
+ must_det_ll(assert_arg_table_n(Arg,Fn,N)).
 
 :- dynamic(fb_arg_type/1).
 :- dynamic(table_n_type/3).
@@ -1382,8 +1708,7 @@ add_table_n_types(Fn,1,[N|ArgTypes]):- number(N),!,
    add_table_n_types(Fn,1,ArgTypes).
 add_table_n_types(Fn,N,[Type|ArgTypes]):-!,
   sub_term(Sub,Type),symbol(Sub),!,
-  assert_new(fb_arg_type(Sub)),
-  assert_new(table_n_type(Fn,N,Sub)),
+  with_mutex(fb_side_tables,(fb_assert_side(fb_arg_type(Sub)), fb_assert_side(table_n_type(Fn,N,Sub)))),
   N2 is N+1, add_table_n_types(Fn,N2,ArgTypes),!.
 add_table_n_types(_Fn,_,[]).
 
@@ -1393,7 +1718,10 @@ is_concept_type(Type):- fb_arg_type(Type).
 arg_table_n_type(Arg,Fn,N,Type):- table_n_type(Fn,N,Type),once((fb_pred(Fn,A),functor(G,Fn,A), arg(N,G,Arg),call(G),
   \+ is_list(Arg), \+ as_list(Arg,[]))).
 
-is_valuesymbol(Fn,N,Type):- arg_table_n_type(Arg,Fn,N,Type),symbol_number(Arg,_).
+% answered from the column profiles when the column has one, else from the first row
+is_valuesymbol(Fn,N,Type):- table_n_type(Fn,N,Type),
+  (fb_profiled_column(Fn,N) -> fb_column_numeric(Fn,N)
+   ; (arg_table_n_type(Arg,Fn,N,Type),symbol_number(Arg,_))).
 
 :- dynamic(numeric_value_p_n/3).
 fis_valuesymbol(PNList,Len):- findall(P-N,is_valuesymbol(P,N,_Type),PNList),length(PNList,Len).
@@ -1597,7 +1925,7 @@ load_flybase_sv(Sep,File,Stream,Fn):- at_end_of_stream(Stream),!,
 
 load_flybase_sv(Sep,File,Stream,Fn):-
  must_det_ll((
-  flag(loaded_from_file_count,_,0),
+  file_count_flag(Key),flag(Key,_,0),
   ignore(once((table_columns(File,Header);table_columns(Fn,Header)))),
   fix_header_names(Fn,Header,ArgTypes),
   forall((table_columns(File,ColInfo),ArgTypes\==ColInfo),pp_fb(odd_table_columns(File,ColInfo))),
@@ -1606,14 +1934,17 @@ load_flybase_sv(Sep,File,Stream,Fn):-
   if_t(is_list(ArgTypes),add_table_n_types(Fn,1,ArgTypes)),
   ground(NArgTypes),
   if_t(is_list(ArgTypes),ignore((length(ArgTypes,A),decl_fb_pred(Fn,A)))),
+  fb_profile_begin(Fn),
+  get_time(T0),
   time((repeat,
   read_line_to_chars(Stream, Chars),
   once(load_flybase_chars(NArgTypes,File,Stream,Fn,Sep,Chars)),
   once(reached_file_max;done_reading(File);at_end_of_stream(Stream)),!,
   once(load_fb_data(NArgTypes,File,Stream,Fn,Sep,end_of_file)))),
+  fb_profile_end(File),
   loaded_from_file_count(X),!,
-  metta_stats(Fn),
-  pl_stats(File,X))),!.
+  get_time(T1), RowsPerSec is round(X/max(T1-T0,0.001)),
+  with_mutex(metta_stats,(metta_stats(Fn),pl_stats(File,X),pl_stats('Rows/sec',RowsPerSec))))),!.
 
 
 %save_conversion_data(ArgTypes,Fn,OutputStream,Data):- maplist(write_flybase_data(ArgTypes,ArgTypes,Fn,OutputStream),Data).
@@ -1669,7 +2000,7 @@ load_flybase_chars([N|ArgTypes],File,Stream,Fn,Sep,Chars):-
   (format("~n ; Maybe Header: ~s",[Chars])),
   attempt_header_row(Sep,Chars,Fn,Header,ArgTypes),
   is_really_header_row(Header,ArgTypes),
-  (fbug(t_h_n(Fn,Header,ArgTypes)),fb_assert(t_h_n(Fn,Header,ArgTypes))),!,
+  (fbug(t_h_n(Fn,Header,ArgTypes)),with_mutex(fb_side_tables,fb_assert_side(t_h_n(Fn,Header,ArgTypes)))),!,
   load_fb_data([N|ArgTypes],File,Stream,Fn,Sep,is_swipl).
 
 load_flybase_chars([N|ArgTypes],File,Stream,Fn,Sep,Chars):- is_swipl,
@@ -1681,6 +2012,17 @@ load_flybase_chars([N|ArgTypes],File,Stream,Fn,Sep,Chars):- is_swipl,
 load_fb_data(_ArgTypes,File,_Stream,_Fn,_Sep,Data):-
   (Data == end_of_file;done_reading(File)),!.
 
+load_fb_data(ArgTypes,File,Stream,Fn,Sep, is_swipl):- use_fb_bulk_rows,!,
+  fbug(load_fb_data_bulk(ArgTypes,File,Fn,Sep)),
+  add_table_n_types(Fn,1,ArgTypes),!,
+  fb_column_converters(Fn,ArgTypes,Convs),
+  fb_checkpoint_begin(File,Stream),
+  fb_bulk_row_check(Fn,Check),
+  call_cleanup(load_fb_blocks(Stream,fb_bulk(Fn,Sep,Convs,Check),""),
+     fb_bulk_row_check_done(Check)),
+  fb_checkpoint_end,
+  assert(done_reading(File)).
+
 load_fb_data(ArgTypes,File,Stream,Fn,Sep, is_swipl):-  % \+ option_value(full_canon,[]), !,
   (option_value(max_per_file,Max)->true;Max=inf),
   fbug(load_fb_data(ArgTypes,File,Max,Fn,Sep)),
@@ -1689,7 +2031,7 @@ load_fb_data(ArgTypes,File,Stream,Fn,Sep, is_swipl):-  % \+ option_value(full_ca
      once(read_csv_stream(Sep,Stream,Data)),
      loaded_from_file_count(X),
       (((Data== end_of_file);reached_file_max;(X>Max)) -> assert(done_reading(File)) ;
-       (once(write_flybase_data(ArgTypes,Fn,Data)),fail)),!.
+       (once(write_flybase_data(ArgTypes,Fn,Data)),fb_profile_row(Fn,Data),fail)),!.
 
 load_fb_data(ArgTypes,File,Stream,Fn,Sep, is_swipl):- !,
    name(Sep,[SepCode]),
@@ -1702,7 +2044,435 @@ load_fb_data(ArgTypes,File,Stream,Fn,Sep, is_swipl):- !,
      loaded_from_file_count(X),
       (((RData== end_of_file);reached_file_max;(X>Max)) -> assert(done_reading(File)) ;
        (RData =..[_|Data],
-       once(write_flybase_data(ArgTypes,Fn,Data)),fail)),!.
+       once(write_flybase_data(ArgTypes,Fn,Data)),fb_profile_row(Fn,Data),fail)),!.
+
+% ==============================
+% Bulk row loading
+% ==============================
+% With --fb_bulk_rows=true the rest of a separated-values stream is read a
+% megabyte at a time and split into lines in one go instead of a line at a
+% time, and rows are built without the row reader's per-cell work:
+%  * each column gets a converter chosen once per file.  Columns that
+%    numeric_value_p_n/3 or column_description/4 call numeric hold numbers,
+%    when the number prints back the same (so 0001 stays a symbol); every
+%    other column keeps its symbols, as with the row reader.
+%  * the check for an existing clause (real_assert/1) is skipped when the
+%    predicate had no rows before the file: repeats within the file are
+%    caught by a trie of the rows added.  --fb_assume_unique=true drops the
+%    check altogether.
+% Because numeric columns differ, the flag is part of the .qlf cache key.
+use_fb_bulk_rows:- \+ is_converting, option_value(fb_bulk_rows,true).
+
+fb_column_converters(Fn,[_|ArgTypes],Convs-Len):- is_list(ArgTypes),!,
+  length(ArgTypes,Len), (Len>0 -> numlist(1,Len,Ns) ; Ns=[]),
+  maplist(fb_column_converter(Fn),Ns,ArgTypes,Convs).
+fb_column_converters(_Fn,_ArgTypes,[]-0).
+
+fb_column_converter(Fn,N,_Type,number):- numeric_value_p_n(Fn,N,_),!.
+fb_column_converter(_Fn,_N,Type,number):- sub_term(Sub,Type),symbol(Sub),column_description(Sub,_,numeric,_),!.
+fb_column_converter(_Fn,_N,_Type,symbol).
+
+% only numbers that print back the same, so identifiers like 0001 stay symbols
+fb_convert_cell(number,S,N):- atom_number(S,N), number_codes(N,Cs), atom_codes(S,Cs),!.
+fb_convert_cell(_,S,S).
+
+% rows echoed to --all_data_to/--all_metta_to files still need real_assert/1
+fb_bulk_row_check(_Fn,real_assert):- (is_all_data_to(_,_);is_all_metta_to(_,_)),!.
+fb_bulk_row_check(_Fn,none):- option_value(fb_assume_unique,true),!.
+fb_bulk_row_check(Fn,trie(Trie)):- \+ fb_has_rows(Fn),!, trie_new(Trie).
+fb_bulk_row_check(_Fn,real_assert).
+
+fb_bulk_row_check_done(trie(Trie)):- !, trie_destroy(Trie).
+fb_bulk_row_check_done(_).
+
+fb_has_rows(Fn):- fb_pred(Fn,A), functor(H,Fn,A),
+  predicate_property(H,number_of_clauses(N)), N>0,!.
+
+load_fb_blocks(Stream,Ctx,Carry):-
+  read_string(Stream,1_048_576,Block),
+  (Block == ""
+   -> (reached_file_max -> true ; load_fb_row_string(Ctx,Carry))
+   ; (string_concat(Carry,Block,Text),
+      split_string(Text,"\n","",Lines),
+      append(Rows,[Rest],Lines),
+      (load_fb_row_strings(Rows,Ctx)
+        -> (ignore(fb_checkpoint_maybe(Stream,Rows,Rest)), load_fb_blocks(Stream,Ctx,Rest))
+        ; true))).
+
+% fails once max_per_file is reached
+load_fb_row_strings([],_Ctx).
+load_fb_row_strings([Row|Rows],Ctx):- \+ reached_file_max,
+  load_fb_row_string(Ctx,Row), load_fb_row_strings(Rows,Ctx).
+
+load_fb_row_string(fb_bulk(Fn,Sep,Convs-Len,Check),Row0):-
+  (string_concat(Row,"\r",Row0) -> true ; Row = Row0),
+  symbolic_list_concat(Data,Sep,Row),
+  (Data = [_,_|_]  % write_flybase_data/3 skips empty and one-column rows
+   -> (((Len > 0, length(Data,Len)) -> maplist(fb_convert_cell,Convs,Data,Args) ; Args = Data),
+       into_datum(Fn,Args,Datum),
+       functor(Datum,F,A), decl_fb_pred(F,A),
+       fb_bulk_assert(Check,Datum),
+       incr_file_count(_),
+       fb_profile_row(Fn,Data))
+   ; true).
+
+fb_bulk_assert(real_assert,Datum):- real_assert(Datum).
+fb_bulk_assert(none,Datum):- assertz(Datum).
+fb_bulk_assert(trie(Trie),Datum):- (trie_insert(Trie,Datum) -> assertz(Datum) ; true).
+
+% ==============================
+% Checkpointed loads
+% ==============================
+% With --fb_checkpoint=true the bulk row reader saves a checkpoint every
+% fb_checkpoint_rows rows (default 1,000,000).  A checkpoint is a .qlf chunk
+% of the rows added since the previous one, plus a .ckpt record of the byte
+% offset, line count and row count reached.  A load of the same unchanged
+% file after a crash maps the chunks back in and continues from the offset.
+% Non-seekable sources such as .gz skip the recorded number of lines
+% instead.  The checkpoint is dropped once the file is finished; from then
+% on the per-file .qlf cache covers it.  max_per_file and pred_va are part
+% of the stamp, so a sampled load never resumes a full one or vice versa.
+use_fb_checkpoints:- option_value(fb_checkpoint,true).
+
+fb_checkpoint_rows(N):- option_value(fb_checkpoint_rows,N), integer(N), N>0,!.
+fb_checkpoint_rows(N):- option_value(fb_checkpoint_rows,V), atom(V), atom_number(V,N), integer(N), N>0,!.
+fb_checkpoint_rows(1_000_000).
+
+fb_checkpoint_file(Filename,CkptFile):-
+  sha_hash(Filename,Hash,[algorithm(sha1),encoding(utf8)]),
+  hash_atom(Hash,Key),
+  fb_cache_dir(Dir),
+  atomic_list_concat([Dir,'/checkpoints/',Key,'.ckpt'],CkptFile).
+
+fb_checkpoint_stamp(Filename,stamp(Size,MTime,Max,PredVA)):-
+  size_file(Filename,Size), time_file(Filename,MTime),
+  (option_value(max_per_file,Max)->true;Max=[]),
+  (nb_current(pred_va,PredVA)->true;PredVA=[]).
+
+fb_checkpoint_begin(_File,_Stream):- \+ use_fb_checkpoints,!, nb_setval(fb_ckpt,[]).
+fb_checkpoint_begin(File,Stream):-
+  absolute_file_name(File,Filename),
+  fb_checkpoint_file(Filename,CkptFile),
+  fb_checkpoint_stamp(Filename,Stamp),
+  (fb_checkpoint_resume(Filename,CkptFile,Stamp,Stream,Chunks,Lines)
+    -> true
+    ; (fb_checkpoint_discard(CkptFile), Chunks=[], Lines=0)),
+  fb_pred_counts(Marks),
+  loaded_from_file_count(Rows),
+  nb_setval(fb_ckpt,ckpt(Filename,CkptFile,Stamp,Chunks,Marks,Rows,Lines)).
+
+read_fb_checkpoint(CkptFile,Ckpt):-
+  exists_file(CkptFile),
+  catch(setup_call_cleanup(open(CkptFile,read,In),read_term(In,Ckpt,[]),close(In)),_,fail).
+
+% all or nothing: if a chunk cannot be restored, whatever the earlier ones
+% added is taken back out, so the reread from the start adds no duplicates.
+% Only the clauses this resume restored are erased: with fb_threads other
+% workers are appending to other predicates and to the side tables meanwhile.
+:- thread_local(fb_restored_ref/1).
+:- thread_local(fb_restored_rows/1).
+:- thread_local(fb_restored_side/1).
+
+fb_checkpoint_resume(Filename,CkptFile,Stamp,Stream,Chunks,Lines):-
+  read_fb_checkpoint(CkptFile,fb_ckpt(Filename,Stamp,Offset,Lines,Rows,Chunks)),
+  fb_forget_restored,
+  (catch((forall(member(Chunk,Chunks),restore_fb_chunk(Chunk)),
+          fb_skip_to(Stream,Offset,Lines)),
+         E,(fbug(fb_checkpoint_resume_failed(Filename,E)),fail))
+   -> fb_forget_restored
+   ; (fb_rollback_restored, fail)),
+  file_count_flag(Key), flag(Key,_,Rows),
+  fbug(fb_checkpoint_resumed(Filename,Rows,Offset)).
+
+restore_fb_chunk(Key-QlfFile):-
+  load_files(QlfFile,[silent(true)]),
+  call_cleanup(restore_fb_qlf_cache_tracked(Key),unload_file(QlfFile)).
+
+fb_forget_restored:-
+  retractall(fb_restored_ref(_)), retractall(fb_restored_rows(_)),
+  retractall(fb_restored_side(_)).
+
+% erases the clauses noted by restore_fb_qlf_cache_tracked/1 and takes their
+% rows back off the shared totals
+fb_rollback_restored:-
+  forall(retract(fb_restored_ref(Ref)),ignore(catch(erase(Ref),_,true))),
+  forall(retract(fb_restored_side(Fact)),ignore(retract(fb_side_added(Fact)))),
+  aggregate_all(sum(N),retract(fb_restored_rows(N)),Rows),
+  flag(total_loaded_symbols,TA,TA-Rows),
+  flag(total_loaded_atoms,TB,TB-Rows).
+
+fb_skip_to(Stream,Offset,_Lines):- stream_property(Stream,reposition(true)),!,
+  seek(Stream,Offset,bof,_).
+fb_skip_to(Stream,_Offset,Lines):-
+  forall(between(1,Lines,_),read_line_to_string(Stream,_)).
+
+fb_checkpoint_maybe(_Stream,_Rows,_Rest):- \+ nb_current(fb_ckpt,ckpt(_,_,_,_,_,_,_)),!.
+% a checkpoint that cannot be saved (no byte position, disk full ...) is
+% reported and skipped; the load itself carries on
+fb_checkpoint_maybe(Stream,Rows,Rest):-
+  nb_getval(fb_ckpt,ckpt(Filename,CkptFile,Stamp,Chunks,Marks,LastRows,Lines0)),
+  length(Rows,NL), Lines is Lines0+NL,
+  nb_setval(fb_ckpt,ckpt(Filename,CkptFile,Stamp,Chunks,Marks,LastRows,Lines)),
+  loaded_from_file_count(Now),
+  fb_checkpoint_rows(Every),
+  ignore((Now-LastRows >= Every,
+    catch((stream_property(Stream,position(Pos)), stream_position_data(byte_count,Pos,End),
+           fb_text_bytes(Stream,Rest,RestBytes), Offset is End-RestBytes,
+           save_fb_checkpoint(Filename,CkptFile,Stamp,Chunks,Marks,Offset,Lines,Now,NewChunks),
+           fb_pred_counts(NewMarks),
+           nb_setval(fb_ckpt,ckpt(Filename,CkptFile,Stamp,NewChunks,NewMarks,Now,Lines))),
+          E,(fbug(fb_checkpoint_save_failed(Filename,E)),fail)))).
+
+% the offset is where the unread partial line starts, so count its bytes
+fb_text_bytes(Stream,Text,Bytes):- stream_property(Stream,encoding(utf8)),!,
+  string_codes(Text,Codes), foldl(utf8_code_bytes,Codes,0,Bytes).
+fb_text_bytes(_Stream,Text,Bytes):- string_length(Text,Bytes).
+
+utf8_code_bytes(C,B0,B):- (C<0x80->N=1;C<0x800->N=2;C<0x10000->N=3;N=4), B is B0+N.
+
+save_fb_checkpoint(Filename,CkptFile,Stamp,Chunks,Marks,Offset,Lines,Rows,NewChunks):-
+  findall(F/A,fb_pred_file(F,A,Filename),Preds),
+  length(Chunks,I),
+  file_name_extension(Base,_,CkptFile),
+  file_base_name(Base,CkptKey),
+  atomic_list_concat([CkptKey,'_',I],Key),
+  atomic_list_concat([Base,'_',I,'.qlf'],QlfFile),
+  write_fb_qlf(Key,Preds,Marks,QlfFile,_),
+  append(Chunks,[Key-QlfFile],NewChunks),
+  fb_cache_tmp_base(CkptFile,TmpFile),
+  setup_call_cleanup(open(TmpFile,write,Out),
+     (write_canonical(Out,fb_ckpt(Filename,Stamp,Offset,Lines,Rows,NewChunks)),
+      write(Out,'.'),nl(Out)),
+     close(Out)),
+  rename_file(TmpFile,CkptFile),
+  fbug(fb_checkpoint_saved(Filename,Rows,Offset)).
+
+fb_checkpoint_end:- nb_current(fb_ckpt,ckpt(_,CkptFile,_,_,_,_,_)),!,
+  fb_checkpoint_discard(CkptFile),
+  nb_setval(fb_ckpt,[]).
+fb_checkpoint_end.
+
+fb_checkpoint_discard(CkptFile):-
+  ignore((read_fb_checkpoint(CkptFile,fb_ckpt(_,_,_,_,_,Chunks)),
+    forall(member(_-QlfFile,Chunks),ignore(catch(delete_file(QlfFile),_,true))))),
+  ignore(catch(delete_file(CkptFile),_,true)).
+
+% ==============================
+% Column profiles
+% ==============================
+% Profiles each Fn/Arity/Column while the rows of a separated-values file
+% are asserted: cells seen, empty cells, integers, floats, FlyBase ids by
+% prefix (FBgn, FBtr, ...), distinct values up to fb_profile_distinct_max
+% and the first few of them as samples.  The first fb_profile_rows rows of
+% a file are all profiled (default 10,000), after that one row in
+% fb_profile_stride.  Finished profiles are kept per source file in
+% fb_column_profile/6 and saved to <fb_cache_dir>/column_profiles.pl.
+% fb_column_type/4 and friends (and through them is_valuesymbol/3,
+% table_colnum_type/3 and guess_rest/4) only answer from the profiles of
+% files loaded by this process, profiled now or served from the .qlf cache
+% of an unchanged file, so what a run infers never depends on files some
+% earlier run loaded.  --fb_column_profiles=false turns it off.
+use_fb_column_profiles:- \+ option_value(fb_column_profiles,false).
+
+fb_profile_rows(N):- option_value(fb_profile_rows,N), integer(N), N>=0,!.
+fb_profile_rows(10_000).
+fb_profile_stride(64).
+fb_profile_distinct_max(1000).
+fb_profile_samples_max(5).
+
+:- dynamic(fb_column_profile/6).
+:- dynamic(fb_column_profiles_loaded/0).
+:- dynamic(fb_column_profile_current/1).  % Filename loaded by this process
+:- thread_local(fb_col_value/4).
+
+fb_column_profiles_file(File):-
+  fb_cache_dir(Dir), atom_concat(Dir,'/column_profiles.pl',File).
+
+load_fb_column_profiles:- fb_column_profiles_loaded,!.
+load_fb_column_profiles:- with_mutex(fb_column_profiles,load_fb_column_profiles0).
+
+load_fb_column_profiles0:- fb_column_profiles_loaded,!.
+load_fb_column_profiles0:-
+  assertz(fb_column_profiles_loaded),
+  fb_column_profiles_file(File),
+  (exists_file(File)
+    -> catch(setup_call_cleanup(open(File,read,In,[encoding(utf8)]),
+               read_fb_column_profiles(In),
+               close(In)),E,fbug(fb_column_profiles_load_failed(File,E)))
+    ; true).
+
+read_fb_column_profiles(In):-
+  read_term(In,Term,[]),
+  (Term == end_of_file -> true
+   ; (Term = fb_column_profile(_,_,_,_,_,_) -> assertz(Term) ; true),
+     read_fb_column_profiles(In)).
+
+save_fb_column_profiles:-
+  fb_column_profiles_file(File),
+  file_directory_name(File,Dir),
+  make_directory_path(Dir),
+  fb_cache_tmp_base(File,TmpFile),
+  setup_call_cleanup(open(TmpFile,write,Out,[encoding(utf8)]),
+     forall(fb_column_profile(Fn,A,N,Src,Type,Stats),
+       (write_canonical(Out,fb_column_profile(Fn,A,N,Src,Type,Stats)),
+        write(Out,'.'),nl(Out))),
+     close(Out)),
+  rename_file(TmpFile,File).
+
+% the profile of the file being loaded lives in the fb_colprof global,
+% colprof(Fn,Rows,FullRows,Arity,Cols), one col/9 term per column
+fb_profile_begin(_Fn):- \+ use_fb_column_profiles,!, nb_setval(fb_colprof,[]).
+fb_profile_begin(Fn):-
+  fb_profile_rows(Full),
+  nb_setval(fb_colprof,colprof(Fn,0,Full,0,[])).
+
+fb_profile_row(Fn,Args):-
+  nb_current(fb_colprof,P), P = colprof(Fn,R0,Full,_,_), Args = [_,_|_], !,
+  R is R0+1, nb_setarg(2,P,R),
+  fb_profile_stride(Stride),
+  ((R =< Full ; R mod Stride =:= 0) -> fb_profile_cells(P,Args) ; true).
+fb_profile_row(_Fn,_Args).
+
+fb_profile_cells(P,Args):- arg(5,P,[]),!,
+  length(Args,A),
+  functor(Cols,cols,A),
+  forall(between(1,A,N),nb_setarg(N,Cols,col(0,0,0,0,0,0,false,[],[]))),
+  nb_setarg(4,P,A), nb_setarg(5,P,Cols),
+  fb_profile_cells(P,Args).
+% ragged rows are asserted but left out of the profile
+fb_profile_cells(P,Args):-
+  arg(4,P,A), length(Args,A), !,
+  arg(1,P,Fn), arg(5,P,Cols),
+  fb_profile_cells(Args,1,Fn,A,Cols).
+fb_profile_cells(_P,_Args).
+
+fb_profile_cells([],_,_,_,_).
+fb_profile_cells([V|Vs],N,Fn,A,Cols):-
+  arg(N,Cols,Col),
+  fb_profile_cell(Fn,A,N,Col,V),
+  N2 is N+1, fb_profile_cells(Vs,N2,Fn,A,Cols).
+
+% col(Seen,Empty,Ints,Floats,FBids,Distinct,Capped,Samples,Prefixes)
+fb_profile_cell(Fn,A,N,Col,V0):-
+  (string(V0) -> atom_string(V,V0) ; V = V0),
+  fb_col_incr(1,Col),
+  fb_cell_kind(V,Kind),
+  fb_profile_kind(Kind,Col),
+  (Kind == empty -> true ; fb_profile_distinct(Fn,A,N,Col,V)).
+
+fb_profile_kind(empty,Col):- fb_col_incr(2,Col).
+fb_profile_kind(integer,Col):- fb_col_incr(3,Col).
+fb_profile_kind(float,Col):- fb_col_incr(4,Col).
+fb_profile_kind(fbid(Prefix),Col):- fb_col_incr(5,Col),
+  arg(9,Col,Ps),
+  (selectchk(Prefix-C,Ps,Rest) -> C1 is C+1 ; (C1 = 1, Rest = Ps)),
+  nb_setarg(9,Col,[Prefix-C1|Rest]).
+fb_profile_kind(symbol,_Col).
+
+fb_col_incr(I,Col):- arg(I,Col,X0), X is X0+1, nb_setarg(I,Col,X).
+
+fb_cell_kind(V,empty):- (V == '' ; V == '-' ; V == []),!.
+fb_cell_kind(V,Kind):- number(V),!, (integer(V) -> Kind = integer ; Kind = float).
+fb_cell_kind(V,Kind):- atom(V), atom_number(V,X), atom_number(V2,X), V2 == V,!,
+  (integer(X) -> Kind = integer ; Kind = float).
+fb_cell_kind(V,fbid(Prefix)):- fb_id_prefix(V,Prefix),!.
+fb_cell_kind(_,symbol).
+
+% FBgn0000001 -> 'FBgn'
+fb_id_prefix(V,Prefix):- atom(V),
+  sub_atom(V,0,2,_,'FB'), atom_length(V,L), L > 4,
+  sub_atom(V,4,1,_,D), char_type(D,digit(_)),
+  sub_atom(V,0,4,_,Prefix).
+
+fb_profile_distinct(_Fn,_A,_N,Col,_V):- arg(7,Col,true),!.
+fb_profile_distinct(Fn,A,N,_Col,V):- fb_col_value(Fn,A,N,V),!.
+fb_profile_distinct(Fn,A,N,Col,V):-
+  assertz(fb_col_value(Fn,A,N,V)),
+  fb_col_incr(6,Col),
+  arg(6,Col,D), fb_profile_distinct_max(Max),
+  (D >= Max -> nb_setarg(7,Col,true) ; true),
+  arg(8,Col,Samples), fb_profile_samples_max(SMax),
+  (length(Samples,SL), SL < SMax -> (append(Samples,[V],Samples2), nb_setarg(8,Col,Samples2)) ; true).
+
+fb_profile_end(File):-
+  nb_current(fb_colprof,colprof(Fn,Rows,_,A,Cols)), Cols \== [], !,
+  nb_setval(fb_colprof,[]),
+  retractall(fb_col_value(Fn,A,_,_)),
+  absolute_file_name(File,Filename),
+  findall(fb_column_profile(Fn,A,N,Filename,Type,Stats),
+    (between(1,A,N), arg(N,Cols,Col), fb_col_stats(Rows,Col,Stats), fb_col_stats_type(Stats,Type)),
+    Profiles),
+  ignore(catch(with_mutex(fb_column_profiles,
+     (load_fb_column_profiles0,
+      retractall(fb_column_profile(_,_,_,Filename,_,_)),
+      maplist(assertz,Profiles),
+      note_fb_column_profile_current(Filename),
+      save_fb_column_profiles)),E,fbug(fb_column_profiles_save_failed(Filename,E)))).
+fb_profile_end(_File):- nb_setval(fb_colprof,[]).
+
+fb_col_stats(Rows,col(Seen,Empty,Ints,Floats,FBids,Distinct,Capped,Samples,Ps),
+             stats(Rows,Seen,Empty,Ints,Floats,FBids,Distinct,Capped,Samples,Prefixes)):-
+  fb_prefix_histogram(Ps,Prefixes).
+
+fb_prefix_histogram(Ps,Prefixes):-
+  findall(C-P,member(P-C,Ps),CPs), keysort(CPs,Sorted), reverse(Sorted,Desc),
+  findall(P-C,member(C-P,Desc),Prefixes).
+
+% Distinct is exact unless Capped, then it is a lower bound
+fb_col_stats_type(stats(_,Seen,Empty,Ints,Floats,FBids,Distinct,Capped,_,Prefixes),Type):-
+  Vals is Seen-Empty,
+  (Vals =:= 0 -> Type = empty
+  ; Ints =:= Vals -> Type = integer
+  ; Ints+Floats =:= Vals -> Type = number
+  ; (FBids =:= Vals, Prefixes = [Prefix-_]) -> Type = fbid(Prefix)
+  ; FBids =:= Vals -> Type = fbid
+  ; (Capped == false, Distinct =< 32, Vals >= 4*Distinct) -> Type = category
+  ; Type = symbol).
+
+note_fb_column_profile_current(Filename):-
+  (fb_column_profile_current(Filename) -> true ; assertz(fb_column_profile_current(Filename))).
+
+% a profile of a file loaded in this process
+fb_current_column_profile(Fn,A,N,Stats):-
+  fb_column_profile(Fn,A,N,Src,_,Stats), fb_column_profile_current(Src).
+
+% merges the per-file profiles of Fn/A column N
+fb_column_stats(Fn,A,N,Stats):-
+  load_fb_column_profiles,
+  findall(Fn/A/N,fb_current_column_profile(Fn,A,N,_),Keys), sort(Keys,Cols),
+  member(Fn/A/N,Cols),
+  findall(S,fb_current_column_profile(Fn,A,N,S),[S1|Ss]),
+  foldl(merge_fb_col_stats,Ss,S1,Stats).
+
+merge_fb_col_stats(stats(R1,S1,E1,I1,F1,B1,D1,C1,Sa1,P1),stats(R2,S2,E2,I2,F2,B2,D2,C2,Sa2,P2),
+                   stats(R,S,E,I,F,B,D,C,Sa,P)):-
+  R is R1+R2, S is S1+S2, E is E1+E2, I is I1+I2, F is F1+F2, B is B1+B2,
+  D is max(D1,D2),
+  ((C1 == true ; C2 == true) -> C = true ; C = false),
+  append(Sa2,Sa1,SaAll), list_to_set(SaAll,SaSet),
+  fb_profile_samples_max(SMax), length(SaSet,SL), Take is min(SL,SMax),
+  length(Sa,Take), append(Sa,_,SaSet),
+  findall(Pre,(member(Pre-_,P1);member(Pre-_,P2)),Pres0), sort(Pres0,Pres),
+  findall(Pre-Sum,(member(Pre,Pres),
+     ((memberchk(Pre-X1,P1)->true;X1=0),(memberchk(Pre-X2,P2)->true;X2=0), Sum is X1+X2)),Ps),
+  fb_prefix_histogram(Ps,P).
+
+fb_column_type(Fn,A,N,Type):- fb_column_stats(Fn,A,N,Stats), fb_col_stats_type(Stats,Type).
+
+fb_column_samples(Fn,A,N,Samples):- fb_column_stats(Fn,A,N,Stats), arg(9,Stats,Samples).
+
+fb_column_cardinality(Fn,A,N,Card):- fb_column_stats(Fn,A,N,Stats),
+  arg(7,Stats,D), arg(8,Stats,Capped), (Capped == true -> Card = at_least(D) ; Card = D).
+
+fb_column_prefixes(Fn,A,N,Prefixes):- fb_column_stats(Fn,A,N,Stats), arg(10,Stats,Prefixes).
+
+fb_profiled_column(Fn,N):- load_fb_column_profiles, once(fb_current_column_profile(Fn,_,N,_)).
+
+fb_column_numeric(Fn,N):- fb_column_type(Fn,_,N,Type), memberchk(Type,[integer,number]),!.
+
+list_fb_column_profiles:-
+  forall(fb_column_stats(Fn,A,N,Stats),
+   (fb_col_stats_type(Stats,Type), pp_fb(fb_column_profile(Fn/A,N,Type,Stats)))).
 
 % recursion depth 16 million rows
 load_fb_data(ArgTypes,File,Stream,Fn,Sep, is_swipl):-
@@ -1712,7 +2482,7 @@ load_fb_data(ArgTypes,File,Stream,Fn,Sep, is_swipl):-
      once((csv_read_row(Stream, RData, CompiledOptions))),
      loaded_from_file_count(X),
       (((RData== end_of_file);(X>Max)) -> assert(done_reading(File)) ;
-       (RData =..[_|Data], once(write_flybase_data(ArgTypes,Fn,Data)),
+       (RData =..[_|Data], once(write_flybase_data(ArgTypes,Fn,Data)), fb_profile_row(Fn,Data),
          load_fb_data(ArgTypes,File,Stream,Fn,Sep, is_swipl))),!.
 
 
@@ -510,7 +510,7 @@ heartbeat :-
     % If the difference is greater than or equal to 60 seconds (1 minute)
     (   Diff >= 60
     ->  % Print the heartbeat message and update the last printed time
-        metta_stats
+        with_mutex(metta_stats,metta_stats)
     ;   % Otherwise, do nothing
         true
     ).
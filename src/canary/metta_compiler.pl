@@ -376,9 +376,226 @@ compile_metta_defn(KB,F,Len,Args,BodyFn,ClauseU):-
    must_det_ll((
         if_t(var(Len),length(Args,Len)),
         pfcAdd(metta_compiled_predicate(KB,F,Len)),
+        flag(metta_compiled_clauses,CC,CC+1),
         compile_for_assert([F|Args],BodyFn,Clause),
+        note_body_calls(F,Len,BodyFn),
+        forget_function_det(KB,F,Len),
         add_unnumbered_clause(KB,F,Len,Clause,ClauseU))).
 
+% ===============================
+%  Incremental recompilation
+% ===============================
+% When an (= ...) for an already compiled function is added or removed, only that
+% function is marked dirty, together with every function that calls or inlined
+% it (see note_body_calls/3 and note_inlined/2): a caller's compiled code bakes in
+% the callee's arity, return absorption and types.  Dirty functions are rebuilt
+% lazily, all together, by ensure_recompiled/3 the next time eval_20 dispatches
+% to any compiled function.
+
+:- dynamic(metta_inlined_into/3).      % metta_inlined_into(Callee,Caller,CallerLen)
+:- dynamic(metta_compiled_dirty/3).    % metta_compiled_dirty(KB,F,Len)
+
+note_inlined(HeadIs,Convert):-
+  ignore((as_functor_args(HeadIs,Caller,CLen,_),
+          as_functor_args(Convert,Callee,_,_),
+          note_depends(Callee,Caller,CLen))).
+
+% called from compile_metta_defn/6 for every clause it compiles
+note_body_calls(F,Len,BodyFn):-
+  forall(body_calls(BodyFn,Callee), note_depends(Callee,F,Len)).
+
+note_depends(Callee,Caller,CLen):-
+  ignore((symbol(Caller), symbol(Callee), Caller\==Callee,
+          \+ metta_inlined_into(Callee,Caller,CLen),
+          assert(metta_inlined_into(Callee,Caller,CLen)))).
+
+% only heads of (sub)expressions are calls, never argument symbols or list tails
+body_calls(Body,Callee):- is_list(Body), Body=[Callee|_], symbol(Callee).
+body_calls(Body,Callee):- is_list(Body), member(Sub,Body), body_calls(Sub,Callee).
+
+% called from load_hook0/2 before the changed (= ...) is (un)asserted
+note_changed_defn(KB,F,Len):-
+  metta_compiled_predicate(KB,F,Len), !,
+  mark_compiled_dirty(KB,F,Len).
+note_changed_defn(_,_,_).
+
+mark_compiled_dirty(KB,F,Len):- metta_compiled_dirty(KB,F,Len),!.
+mark_compiled_dirty(KB,F,Len):-
+  assert(metta_compiled_dirty(KB,F,Len)),
+  retractall(metta_function_det(KB,F,Len,_)),
+  flag(metta_compile_invalidations,N,N+1),
+  forall((metta_inlined_into(F,Caller,CLen);metta_det_depends(F,Caller,CLen)),
+         mark_compiled_dirty(KB,Caller,CLen)).
+
+% Compiled callers call their callees' predicates directly, so rebuilding only
+% the function being dispatched would leave a dirty callee running its old
+% clauses: every dirty function is rebuilt before the dispatch goes ahead.
+ensure_recompiled(_KB,_F,_Len):- \+ metta_compiled_dirty(_,_,_),!.
+ensure_recompiled(_KB,_F,_Len):- nb_current(metta_recompiling,true),!.
+ensure_recompiled(_KB,_F,_Len):-
+  setup_call_cleanup(nb_setval(metta_recompiling,true),
+                     recompile_all_dirty,
+                     nb_setval(metta_recompiling,false)).
+
+recompile_all_dirty:-
+  findall(KB-F-Len,metta_compiled_dirty(KB,F,Len),Dirty),
+  ( Dirty==[] -> true
+  ; forall((member(KB-F-Len,Dirty), metta_compiled_dirty(KB,F,Len)),
+           recompile_metta_defn(KB,F,Len)),
+    recompile_all_dirty).
+
+recompile_metta_defn(KB,F,Len):-
+  retractall(metta_compiled_dirty(KB,F,Len)),
+  statistics(cputime,T0),
+  forall((Arity is Len + 1, member(A,[Len,Arity]), functor(H,F,A),
+          predicate_property(H,dynamic)),
+         abolish(F/A)),
+  retractall(metta_inlined_into(_,F,Len)),
+  retractall(metta_det_depends(_,F,Len)),
+  forall((length(Args,Len), metta_defn(KB,[F|Args],BodyFn)),
+         compile_metta_defn(KB,F,Len,Args,BodyFn,_Clause)),
+  apply_det_cuts(KB,F,Len),
+  statistics(cputime,T1),
+  Ms is round((T1-T0)*1000),
+  flag(metta_recompiled_preds,N,N+1),
+  flag(metta_recompile_ms,MS,MS+Ms).
+
+% ===============================
+%  Determinism inference
+% ===============================
+% A function is proven deterministic when its (= ...) heads are pairwise
+% non-unifiable (or there is only one) and every call in every body is itself
+% deterministic: a known det builtin, a recursive call to the function itself,
+% a function already proven det, or a grounded operator whose declared return
+% type is Number/Bool/String.  Anything else, including operators not known
+% yet, counts as nondeterministic.  The compiled clauses of such a function
+% end in a cut so no choicepoint outlives the call.
+%
+% Clauses are compiled one (= ...) at a time, so nothing is decided while a
+% function may still gain clauses: apply_det_cuts/1,3 runs after compile!,
+% after a recompile and at the end of each file load, and compiling another
+% clause for a function takes its cuts (and those of callers relying on it)
+% back off until the next apply_det_cuts.
+% --det-cuts=false turns the cut off; metta_det_report/0 lists the results.
+
+:- dynamic(metta_function_det/4).      % metta_function_det(KB,F,Len,TF)
+:- dynamic(metta_det_depends/3).       % metta_det_depends(Callee,Caller,CallerLen)
+
+apply_det_cuts(KB):- forall(metta_compiled_predicate(KB,F,Len), apply_det_cuts(KB,F,Len)).
+
+apply_det_cuts(_KB,_F,_Len):- option_value('det-cuts',false),!.
+apply_det_cuts(_KB,F,_Len):- needs_tabled(F,_),!.
+apply_det_cuts(KB,F,Len):- metta_function_is_det(KB,F,Len),!,
+   forall(compiled_det_head(F,Len,H), rewrite_compiled_clauses(H,add_det_cut)).
+apply_det_cuts(_KB,_F,_Len).
+
+% a new clause for F: F (and anything whose cut relied on F) is no longer proven
+forget_function_det(KB,F,Len):- \+ metta_function_det(KB,F,Len,_),!.
+forget_function_det(KB,F,Len):-
+   retractall(metta_function_det(KB,F,Len,_)),
+   forall(compiled_det_head(F,Len,H), rewrite_compiled_clauses(H,strip_det_cut)),
+   forall(retract(metta_det_depends(F,Caller,CLen)), forget_function_det(KB,Caller,CLen)).
+
+compiled_det_head(F,Len,H):-
+   Arity is Len + 1, member(A,[Len,Arity]), functor(H,F,A),
+   predicate_property(H,dynamic).
+
+rewrite_compiled_clauses(H,How):-
+   findall(H-B,clause(H,B),Clauses),
+   (   \+ (member(_-B0,Clauses), call(How,B0,B1), B1 \== B0)
+   ->  true
+   ;   retractall(H),
+       forall(member(H1-B0,Clauses), (call(How,B0,B1), assertz((H1:-B1)))),
+       if_t(How==add_det_cut, (length(Clauses,N), flag(metta_det_cuts,C,C+N)))).
+
+add_det_cut(B,B):- B = (_,Cut), Cut == !, !.
+add_det_cut(B,(B,!)).
+
+strip_det_cut(B0,B):- B0 = (B,Cut), Cut == !, !.
+strip_det_cut(B,B).
+
+metta_function_is_det(KB,F,Len):- metta_function_is_det([],KB,F,Len).
+
+metta_function_is_det(_Stack,KB,F,Len):- metta_function_det(KB,F,Len,TF),!,TF==true.
+% mutual recursion stays unproven so nothing is memoized on an assumption
+metta_function_is_det(Stack,_KB,F,Len):- memberchk(F/Len,Stack),!,fail.
+metta_function_is_det(Stack,KB,F,Len):-
+   (infer_function_det([F/Len|Stack],KB,F,Len) -> TF = true ; TF = false),
+   assertz(metta_function_det(KB,F,Len,TF)),
+   TF == true.
+
+infer_function_det(Stack,KB,F,Len):-
+   findall(Args-Body,(length(Args,Len),metta_defn(KB,[F|Args],Body)),Defs),
+   Defs \== [],
+   det_clause_heads(Defs),
+   forall(member(_-Body,Defs),det_body(Stack,KB,Body)).
+
+det_clause_heads([_]):- !.
+det_clause_heads(Defs):-
+   \+ (append(_,[A1-_|Rest],Defs), member(A2-_,Rest), \+ A1 \= A2).
+
+det_body(_Stack,_KB,Body):- \+ is_list(Body),!.
+det_body(_Stack,_KB,[]):- !.
+det_body(_Stack,_KB,[Quote,_]):- Quote == quote,!.
+det_body(Stack,KB,[Op|Args]):- symbol(Op),!,
+   length(Args,N),
+   det_op(Stack,KB,Op,N),
+   maplist(det_body(Stack,KB),Args).
+det_body(Stack,KB,List):- maplist(det_body(Stack,KB),List).
+
+det_op(_Stack,_KB,Op,_N):- nondet_metta_op(Op),!,fail.
+det_op(_Stack,_KB,Op,_N):- det_metta_op(Op),!.
+det_op([F/N|_],_KB,F,N):- !.
+det_op([Caller/CLen|Stack],KB,Op,N):- metta_defn(KB,[Op|Args],_), length(Args,N),!,
+   metta_function_is_det([Caller/CLen|Stack],KB,Op,N),
+   (metta_det_depends(Op,Caller,CLen) -> true ; assert(metta_det_depends(Op,Caller,CLen))).
+det_op(_Stack,KB,Op,N):- metta_type(KB,Op,['->'|Types]),!,
+   length(Types,NT), NT is N + 1,
+   last(Types,RetType), nonvar(RetType),
+   memberchk(RetType,['Number','Bool','String']).
+% anything else may still get clauses or is not known to be det
+det_op(_Stack,_KB,_Op,_N):- fail.
+
+nondet_metta_op(superpose). nondet_metta_op(match). nondet_metta_op('get-atoms').
+nondet_metta_op(unify). nondet_metta_op('superpose-bind'). nondet_metta_op(hyperpose).
+nondet_metta_op('new-state'). nondet_metta_op('change-state!'). nondet_metta_op('get-state').
+nondet_metta_op('random-int'). nondet_metta_op('random-float').
+nondet_metta_op(eval). nondet_metta_op(evalc). nondet_metta_op(call).
+
+det_metta_op('+'). det_metta_op('-'). det_metta_op('*'). det_metta_op('/'). det_metta_op('%').
+det_metta_op('<'). det_metta_op('>'). det_metta_op('<='). det_metta_op('>='). det_metta_op('==').
+det_metta_op(and). det_metta_op(or). det_metta_op(not). det_metta_op(xor).
+det_metta_op(if). det_metta_op(let). det_metta_op('let*'). det_metta_op(case).
+det_metta_op(collapse). det_metta_op('car-atom'). det_metta_op('cdr-atom').
+det_metta_op('cons-atom'). det_metta_op('decons-atom'). det_metta_op('size-atom').
+det_metta_op('index-atom'). det_metta_op('min-atom'). det_metta_op('max-atom').
+det_metta_op('get-type'). det_metta_op('get-metatype'). det_metta_op(empty).
+
+metta_det_report:-
+   forall(member(TF-Label,[true-'Deterministic',false-'Not proven deterministic']),
+     (findall(F/Len,metta_function_det(_,F,Len,TF),Fs),
+      length(Fs,Count),
+      format('~N; ~w (~w):~n',[Label,Count]),
+      forall(member(F/Len,Fs),format(';\t~q/~w~n',[F,Len])))),
+   flag(metta_det_cuts,Cuts,Cuts),
+   pl_stats('Clauses given a det cut',Cuts),
+   nl.
+
+metta_compile_stats:-
+  flag(metta_compiled_clauses,CC,CC),
+  flag(metta_recompiled_preds,RP,RP),
+  flag(metta_recompile_ms,MS,MS),
+  flag(metta_compile_invalidations,CI,CI),
+  aggregate_all(count,metta_compiled_dirty(_,_,_),Dirty),
+  aggregate_all(count,metta_inlined_into(_,_,_),Edges),
+  pl_stats('Compiled clauses',CC),
+  pl_stats('Incremental recompiles',RP),
+  pl_stats('Incremental recompile ms',MS),
+  pl_stats('Functions invalidated',CI),
+  pl_stats('Functions pending recompile',Dirty),
+  pl_stats('Inlining dependency edges',Edges),
+  nl.
+
 add_unnumbered_clause(KB,F,Len,ClauseN,Clause):-
     must_det_ll((
        unnumbervars_clause(ClauseN,Clause),
@@ -277,6 +277,7 @@ compile_this_s('do-all').
 
 f2q(Depth,HeadIs,RetType,RetResult,Convert, Converted) :- fail,  dif_functors(HeadIs,Convert),
   get_inline_def(Convert,NewDef),!,
+  note_inlined(HeadIs,Convert),
   must_det_ll((f2p(Depth,HeadIs,RetType,RetResult,NewDef,Converted))).
 
 f2q(Depth,HeadIs,RetType,RetResult,Convert, do(Converted)) :- % dif_functors(HeadIs,Convert),
@@ -695,6 +696,7 @@ f2q(Depth,HeadIs,RetType,RetResult,Convert, call_cleanup(BodyCode,HandlerCode))
 
 f2q(Depth,HeadIs,RetType,RetResult,Convert, Converted) :- fail, dif_functors(HeadIs,Convert),
   get_inline_def(Convert,InlineDef),!,
+  note_inlined(HeadIs,Convert),
   must_det_ll((f2p(Depth,HeadIs,RetType,RetResult,InlineDef,Converted))).
 
 
@@ -760,6 +762,7 @@ f2q(Depth,HeadIs,RetType,RetResult,Convert, Converted) :- fail,
   as_functor_args(Quot,quot,A,NewArgs),
   as_functor_args(QConvert,quot,A,Args))),
   get_inline_case_list([F|NewArgs],Quot,DefList),!,
+  note_inlined(HeadIs,Convert),
   must_det_ll((f2p(Depth,HeadIs,RetType,RetResult,case(QConvert,DefList),Converted))).
 
 is_non_evaluatable(S):- \+ compound(S),!.
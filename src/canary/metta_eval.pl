@@ -1572,6 +1572,7 @@ eval_20(_Eq,_RetType,_Depth,_Self,['compile!',Space],Res):- !,
     if_t( \+ current_predicate(X/_),
        (ignore(nortrace),forall(metta_defn(KB,[X | Args] ,BodyFn),
        (trace,compile_metta_defn(KB,X,Len,Args,BodyFn,_ClauseU))))),
+    forall(metta_compiled_predicate(KB,X,XLen),apply_det_cuts(KB,X,XLen)),
     % pfcNoWatch,
     true,!,
      notrace(catch((wdmsg(?-listing(X)),listing(X)),E,
@@ -1589,6 +1590,7 @@ minus(A,B,C):- plus(B,C,A).
 eval_20(Eq,RetType,Depth,Self,[AE|More],Res):-
     metta_compiled_predicate(Self,AE,Len),
     len_or_unbound(More,Len), Pred = AE,
+    ensure_recompiled(Self,AE,Len),
     current_predicate(AE/Arity),
     maplist(as_prolog, More , Adjusted),!,
     eval_201(Eq,RetType,Depth,Self,Pred,Adjusted,Arity,Len,Res),
@@ -315,6 +315,15 @@ option_value_def('compile',false).
 %option_value_def('compile',full).
 option_value_def('tabling',true).
 option_value_def('optimize',true).
+% individual optimizer passes (see metta_mizer.pl), 'auto' follows --optimize=full
+option_value_def('opt-direct-calls',auto).
+option_value_def('opt-constant-fold',auto).
+option_value_def('opt-dead-assign',auto).
+option_value_def('opt-inline-builtins',auto).
+option_value_def('opt-tail-call',auto).
+option_value_def('det-cuts',true).
+option_value_def('type-cache',true).
+option_value_def('aot-cache',true).
 option_value_def(no_repeats,false).
 %option_value_def('time',false).
 option_value_def('test',false).
@@ -341,12 +350,30 @@ option_value_def('exec',true). % vs skip
 
 option_value_def('trace-on-load',false).
 option_value_def('load','silent').
+option_value_def('load-stream',auto).
+option_value_def('load-stream-min-size',1048576).
+option_value_def('data-reader',auto).
 
 option_value_def('trace-on-eval',false).
 option_value_def('eval',silent).
 
 option_value_def('transpiler',silent).
 option_value_def('result',show).
+option_value_def('fast-print',auto).
+option_value_def('fast-print-min',1000).
+option_value_def('remote-pool-size',4).
+option_value_def('remote-pool-idle',60).
+option_value_def('remote-chunk',100).
+option_value_def('remote-wire',binary).
+option_value_def('remote-space-batch',100).
+option_value_def('remote-space-ttl',5).
+option_value_def('remote-space-cache-max',1000).
+option_value_def('shard-key',arg).
+option_value_def('shard-base-port',3100).
+option_value_def('vspace-workers',auto).
+option_value_def('vspace-backlog',64).
+option_value_def('vspace-queue',256).
+option_value_def('vspace-stream-idle',30).
 
 option_value_def('maximum-result-count',inf). % infinate answers
 
@@ -1009,6 +1036,10 @@ load_hook0(Load,Assertion):- fail,
      rtrace_on_error(compile_for_assert_eq(Eq, H, B, Preds)),!,
      rtrace_on_error(assert_preds(Self,Load,Preds)).
 load_hook0(_,_):- \+ current_prolog_flag(metta_interp,ready),!.
+load_hook0(_Load,Assertion):-
+     assertion_hb(Assertion,Self,Eq,H,_B), Eq=='=',
+     is_list(H), H=[F|Args], symbol(F), length(Args,Len),!,
+     note_changed_defn(Self,F,Len).
 /*
 load_hook0(Load,get_metta_atom(Eq,Self,H)):- B = 'True',
        H\=[':'|_], functs_to_preds([=,H,B],Preds),
@@ -1050,6 +1081,8 @@ get_metta_atom(Eq,Space, Atom):- metta_atom(Space, Atom), \+ (Atom =[EQ,_,_], EQ
 metta_atom(Atom):- current_self(KB),metta_atom(KB,Atom).
 %metta_atom([Superpose,ListOf], Atom):- Superpose == 'superpose',is_list(ListOf),!,member(KB,ListOf),get_metta_atom_from(KB,Atom).
 metta_atom(Space, Atom):- typed_list(Space,_,L),!, member(Atom,L).
+metta_atom(KB,Atom):- atom(KB), is_nonlocal_space(KB),!,
+  once((space_type_method(Type,atom_iter,Method),call(Type,KB))), call(Method,KB,Atom).
 metta_atom(KB, [F, A| List]):- KB=='&flybase',fb_pred_nr(F, Len),current_predicate(F/Len), length([A|List],Len),apply(F,[A|List]).
 metta_atom(KB,Atom):- KB=='&corelib',!, metta_atom_corelib(Atom).
 metta_atom(KB,Atom):- metta_atom_in_file( KB,Atom).
@@ -162,6 +162,8 @@ extension_search_order(['']).
 
 :- if( \+ current_predicate(load_metta_file/2)).
 load_metta_file(Self,Filemask):- symbol_concat(_,'.metta',Filemask),!, load_metta(Self,Filemask).
+load_metta_file(Self,Filemask):- metta_compressed_file(Filemask),
+   file_name_extension(Inner,_,Filemask), symbol_concat(_,'.metta',Inner),!, load_metta(Self,Filemask).
 load_metta_file(_Slf,Filemask):- load_flybase(Filemask).
 :- endif.
 
@@ -261,6 +263,7 @@ include_metta(Self,RelFilename):-
      pfcAdd_Now(user:loaded_into_kb(Self,Filename)),
      include_metta_directory_file(Self,Directory, Filename))),
      pfcAdd_Now(user:loaded_into_kb(Self,Filename)),
+     apply_det_cuts(Self),
      nop(listing(user:loaded_into_kb/2)).
 
 
@@ -326,6 +329,10 @@ include_metta_directory_file_prebuilt(Self,_Directory, Filename):-
 
 
 
+include_metta_directory_file(Self,Directory,Filename):- metta_compressed_file(Filename),!,
+  with_cwd(Directory,must_det_ll(setup_call_cleanup(open_metta_source(Filename,In,[encoding(utf8)]),
+    must_det_ll( load_metta_file_stream(Filename,Self,In)),
+    close(In)))).
 include_metta_directory_file(Self,Directory, Filename):-
   include_metta_directory_file_prebuilt(Self,Directory, Filename),!.
 include_metta_directory_file(Self,_Directory, Filename):-
@@ -536,14 +543,137 @@ convert_metta_to_loadable(Filename,_):-
   sformat(S,'~w/cheap_convert.sh --verbose=1 ~w',[Dir,Filename]),
   shell(S,Ret),!,Ret==0.
 
-accept_line(_Self,end_of_file):-!.
-accept_line(Self,I):- normalize_space(string(Str),I),!,accept_line2(Self,Str),!.
-
-accept_line2(_Self,S):- string_concat(";",_,S),!,writeln(S).
-accept_line2(Self,S):- string_concat('(',RS,S),string_concat(M,')',RS),!,
-  symbolic_list_concat([F|LL],' ',M),PL =..[F,Self|LL],pfcAdd_Now(PL),!,flag(next_assert,X,X+1),
-  if_t((0 is X mod 10_000_000),(writeln(X=PL),statistics)).
-accept_line2(Self,S):- fbug(accept_line2(Self,S)),!.
+% ===============================
+%  Datalog-shaped fast reader
+% ===============================
+% Files made of one flat ground expression per line, e.g. (pred a 12 c), skip
+% the S-expression reader: each line is split on blanks and asserted straight
+% into metta_atom_asserted/2.  Duplicates are dropped as 'add-atom' drops
+% them, through a trie of the rows this load has added (datalog_add_atom/2).
+% A line is only taken once a peek shows it is flat; anything else (strings,
+% comments, several forms on a line, forms over several lines) is left in
+% the stream for the generic reader.
+%   --data-reader=true   always use it
+%   --data-reader=false  never
+%   --data-reader=auto   use it when the first 'data-reader-sample' lines are all flat
+
+use_datalog_reader(Size,In):-
+   option_value('data-reader',Mode), Mode\==[],
+   use_datalog_reader(Mode,Size,In).
+
+use_datalog_reader(Mode,_Size,_In):- is_tRuE(Mode),!.
+use_datalog_reader(auto,Size,In):- integer(Size), Size > 65536,
+   stream_property(In,reposition(true)),
+   stream_property(In,position(Pos)),
+   (option_value('data-reader-sample',N), integer(N) -> true ; N = 200),
+   call_cleanup(datalog_sample_ok(In,N,0,Flat),set_stream_position(In,Pos)),
+   Flat > 0.
+
+datalog_sample_ok(_In,0,Flat,Flat):- !.
+datalog_sample_ok(In,N,Flat0,Flat):-
+   read_line_to_string(In,Line),
+   (Line == end_of_file -> Flat = Flat0 ;
+    (normalize_space(string(Str),Line),
+     (datalog_skip_line(Str) -> Flat1 = Flat0
+     ; (datalog_line_atom(Str,_), Flat1 is Flat0 + 1)),
+     N1 is N - 1,
+     datalog_sample_ok(In,N1,Flat1,Flat))).
+
+datalog_skip_line("").
+datalog_skip_line(Str):- string_concat(";",_,Str).
+
+datalog_line_atom(Str,[F|Args]):-
+   string_concat("(",Rest,Str), string_concat(Mid,")",Rest),
+   \+ (sub_string(Mid,_,1,_,C), datalog_special_char(C)),
+   split_string(Mid," ","",[FS|ArgSs]),
+   FS \== "",
+   atom_string(F,FS),
+   maplist(datalog_token,ArgSs,Args).
+
+datalog_special_char("(").  datalog_special_char(")").  datalog_special_char("\"").
+datalog_special_char("$").  datalog_special_char("'").  datalog_special_char("`").
+datalog_special_char(";").
+
+% only plain decimals are numbers: number_string/2 would also take 0x1F, 1_000, 0'a ...
+datalog_token(S,N):- string_codes(S,Cs), phrase(datalog_number,Cs), number_string(N,S),!.
+datalog_token(S,A):- atom_string(A,S).
+
+datalog_number --> ("-" -> [] ; []), datalog_digits,
+   ("." -> datalog_digits ; []),
+   (("e" ; "E") -> ("-" -> [] ; "+" -> [] ; []), datalog_digits ; []).
+
+datalog_digits --> [C], { between(0'0,0'9,C) }, datalog_digits0.
+datalog_digits0 --> [C], { between(0'0,0'9,C) }, !, datalog_digits0.
+datalog_digits0 --> [].
+
+load_metta_datalog_stream(Filename,Self,In):-
+   set_exec_num(Filename,1),
+   load_answer_file(Filename),
+   set_exec_num(Filename,0),
+   pfcAdd_Now(user:loaded_into_kb(Self,Filename)),
+   decl_m_fb_pred(user,metta_atom_asserted,2),
+   get_time(T0),
+   flag(datalog_rows,_,0),
+   with_datalog_dedupe(Self,
+     (repeat,
+        datalog_next(Filename,Self,In,Done),
+      Done == true,!)),
+   get_time(T1),
+   flag(datalog_rows,Rows,Rows),
+   Secs is max(T1-T0,0.000001),
+   Rate is round(Rows/Secs),
+   maybe_invalidate_type_cache([':']),
+   if_verbose(load,format(user_error,'~N; ~w: ~D atoms in ~3f secs (~D atoms/sec)~n',[Filename,Rows,Secs,Rate])).
+
+datalog_next(Filename,Self,In,Done):-
+   (datalog_peek_line(In,256,Line) -> normalize_space(string(Str),Line) ; Str = none),
+   (Str == "" , at_end_of_stream(In) -> Done = true
+   ; datalog_take_line(Str,Self,In) -> Done = false
+   ; datalog_read_form(Filename,Self,In,Done)).
+
+% the next line, without consuming it; fails past Max chars so long lines
+% are left to the generic reader
+datalog_peek_line(In,Len,Line):-
+   peek_string(In,Len,Peek),
+   (sub_string(Peek,Before,_,_,"\n") -> sub_string(Peek,0,Before,_,Line)
+   ; string_length(Peek,Got), Got < Len -> Line = Peek
+   ; Len < 16384, Len2 is Len*4, datalog_peek_line(In,Len2,Line)).
+
+datalog_take_line(Str,_Self,In):- datalog_skip_line(Str),!, read_line_to_string(In,_).
+datalog_take_line(Str,Self,In):- datalog_line_atom(Str,Atom),
+   read_line_to_string(In,_),
+   datalog_add_atom(Self,Atom).
+
+datalog_read_form(Filename,Self,In,Done):-
+   current_read_mode(file,Mode),
+   must_det_ll(read_metta2(In,Expr)),
+   (Expr == end_of_file -> Done = true
+   ; (Done = false,
+      subst_vars(Expr,Term,[],NamedVarsList),
+      do_metta_file_form(Self,Filename,Mode,Term,NamedVarsList))).
+
+% what 'add-atom' does per atom; other kinds of space get the real 'add-atom'.
+% Rows are ground, so a trie of the ones this load added catches repeats in
+% the file; the space itself is only searched if it had atoms before the load.
+datalog_add_atom(Self,Atom):- is_asserted_space(Self),!,
+   (datalog_seen(Self,Atom) -> true
+   ; (assertz(metta_atom_asserted(Self,Atom)),
+      note_defined_symbol(Atom),
+      flag(datalog_rows,X,X+1))).
+datalog_add_atom(Self,Atom):- 'add-atom'(Self,Atom), flag(datalog_rows,X,X+1).
+
+datalog_seen(Self,Atom):-
+   nb_getval(datalog_dedupe,dedupe(Self,Trie,Prior)),
+   (trie_insert(Trie,Atom) -> (Prior == true, metta_atom_asserted(Self,Atom)) ; true),!.
+
+% an import! inside the file may run a nested datalog load, so the caller's
+% trie is put back afterwards
+with_datalog_dedupe(Self,Goal):-
+   (nb_current(datalog_dedupe,Old) -> true ; Old = []),
+   (metta_atom_asserted(Self,_) -> Prior = true ; Prior = false),
+   setup_call_cleanup((trie_new(Trie), nb_setval(datalog_dedupe,dedupe(Self,Trie,Prior))),
+      Goal,
+      (nb_setval(datalog_dedupe,Old), trie_destroy(Trie))).
 
 
 load_metta_file_stream(Filename,Self,In):-
@@ -560,17 +690,25 @@ load_metta_file_stream(Filename,Self,In):-
   load_metta_file_stream_fast(Size,P2,Filename,Self,In)))).
 
 
-load_metta_file_stream_fast(_Size,_P2,Filename,Self,S):- fail,
- symbolic_list_concat([_,_,_|_],'.',Filename),
+load_metta_file_stream_fast(Size,_P2,Filename,Self,S):-
   \+ option_value(html,true),
-  atomic(S),is_stream(S),stream_property(S,input),!,
-  repeat,
-  read_line_to_string(S,I),
-  accept_line(Self,I),
-  I==end_of_file,!.
+  atomic(S),is_stream(S),stream_property(S,input),
+  use_datalog_reader(Size,S),!,
+  load_metta_datalog_stream(Filename,Self,S).
 
 :- dynamic(metta_file_buffer/5).
+load_metta_file_stream_fast(Size,P2,Filename,Self,In):-
+      (metta_compressed_file(Filename) ; use_streaming_load(Size)),!,
+      load_metta_file_streaming(P2,Filename,Self,In).
+load_metta_file_stream_fast(_Size,_P2,Filename,Self,_In):-
+      load_metta_file_cached(Filename),!,
+      load_metta_buffer(Self,Filename).
 load_metta_file_stream_fast(_Size,P2,Filename,Self,In):-
+      read_metta_file_buffer(P2,Filename,In),
+      ignore(save_metta_file_cache(Filename)),
+      load_metta_buffer(Self,Filename).
+
+read_metta_file_buffer(P2,Filename,In):-
       repeat,
             my_line_count(In, LineCount),
             current_read_mode(file,Mode),
@@ -578,9 +716,143 @@ load_metta_file_stream_fast(_Size,P2,Filename,Self,In):-
             subst_vars(Expr, Term, [], NamedVarsList),
             assertz(metta_file_buffer(Mode,Term,NamedVarsList,Filename,LineCount)),
       flush_output,
-      at_end_of_stream(In),!,
+      at_end_of_stream(In),!.
       %listing(metta_file_buffer/5),
-      load_metta_buffer(Self,Filename).
+
+% ===============================
+%  Compressed sources
+% ===============================
+% foo.metta.gz is read through zlib's inflate filter and foo.metta.zst through
+% a `zstd -dc` pipe, so neither is unpacked to disk.  Such streams cannot be
+% repositioned or hashed cheaply, so they always take the streaming loader.
+
+:- use_module(library(zlib)).
+:- use_module(library(process)).
+
+metta_compressed_file(Filename):- atomic(Filename),
+   file_name_extension(_,Ext,Filename), compressed_file_ext(Ext),!.
+
+compressed_file_ext(gz).
+compressed_file_ext(zst).
+
+open_metta_source(Filename,In,Options):- file_name_extension(_,gz,Filename),!,
+   gzopen(Filename,read,In,Options).
+open_metta_source(Filename,In,Options):- file_name_extension(_,zst,Filename),!,
+   process_create(path(zstd),['-dc','--',Filename],[stdout(pipe(In))]),
+   forall(member(Opt,Options),set_stream(In,Opt)).
+open_metta_source(Filename,In,Options):- open(Filename,read,In,Options).
+
+% ===============================
+%  Ahead-of-time .qlf cache
+% ===============================
+% The parsed contents of each loaded .metta file (its metta_file_buffer/5 rows)
+% are written to <cache-dir>/<sha1>.qlf, where the key hashes the file content
+% together with metta_cache_version/1 and the SWI-Prolog version.  A later load
+% of an identical file -- by this or any other process -- skips the reader.
+% Only parsing is cached: the replayed rows are compiled and asserted as on a
+% first load, since what they compile to depends on the options, types and
+% definitions in force at the time.  The .qlf is unloaded once replayed.
+% Files are published with rename_file/2 so concurrent writers never expose a
+% partial artifact.  --aot-cache=false disables, --cache-dir=DIR relocates.
+
+:- use_module(library(sha)).
+
+metta_cache_version('1').
+
+:- dynamic(metta_cached_buffer/5).
+:- multifile(metta_cached_buffer/5).
+
+metta_aot_cache_enabled:- \+ option_value('aot-cache',false).
+
+metta_cache_dir(Dir):- option_value('cache-dir',Dir), atomic(Dir), Dir\==[], Dir\=='', !.
+metta_cache_dir(Dir):- getenv('METTALOG_CACHE_DIR',Dir), Dir\=='', !.
+metta_cache_dir(Dir):- expand_file_name('~/.cache/mettalog',[Dir]).
+
+metta_file_cache_key(Filename,Key):-
+  metta_cache_version(CV),
+  current_prolog_flag(version,PV),
+  read_file_to_string(Filename,Content,[encoding(utf8)]),
+  format(string(Salted),'~w:~w:~s',[CV,PV,Content]),
+  sha_hash(Salted,Hash,[algorithm(sha1),encoding(utf8)]),
+  hash_atom(Hash,Key).
+
+metta_file_cache_qlf(Filename,Key,QlfFile):-
+  metta_file_cache_key(Filename,Key),
+  metta_cache_dir(Dir),
+  atomic_list_concat([Dir,'/',Key,'.qlf'],QlfFile).
+
+load_metta_file_cached(Filename):-
+  metta_aot_cache_enabled,
+  atomic(Filename), exists_file(Filename),
+  statistics(cputime,T0),
+  catch(metta_file_cache_qlf(Filename,Key,QlfFile),_,fail),
+  (exists_file(QlfFile)
+    -> true
+    ; (flag(metta_cache_misses,M,M+1), fail)),
+  catch(load_files(QlfFile,[silent(true)]),E,
+        (fbug(metta_cache_load_failed(QlfFile,E)),fail)),
+  call_cleanup(
+    (\+ \+ metta_cached_buffer(Key,_,_,_,_),
+     forall(metta_cached_buffer(Key,Mode,Term,NamedVarsList,LineCount),
+            assertz(metta_file_buffer(Mode,Term,NamedVarsList,Filename,LineCount)))),
+    unload_file(QlfFile)),
+  statistics(cputime,T1),
+  flag(metta_cache_hits,H,H+1),
+  note_metta_cache_time(warm,Filename,T1-T0).
+
+save_metta_file_cache(Filename):-
+  metta_aot_cache_enabled,
+  atomic(Filename), exists_file(Filename),
+  statistics(cputime,T0),
+  catch(save_metta_file_cache(Filename,T0),E,
+        (fbug(metta_cache_save_failed(Filename,E)),fail)).
+
+save_metta_file_cache(Filename,T0):-
+  metta_file_cache_qlf(Filename,Key,QlfFile),
+  file_directory_name(QlfFile,Dir),
+  make_directory_path(Dir),
+  % build next to the cache file so the final rename never crosses file systems
+  metta_cache_tmp_base(QlfFile,TmpBase),
+  atom_concat(TmpBase,'.pl',SrcFile),
+  setup_call_cleanup(open(SrcFile,write,Src,[encoding(utf8)]),
+     (format(Src,':- encoding(utf8).~n',[]),
+      format(Src,':- set_prolog_flag(double_quotes,string).~n',[]),
+      format(Src,':- dynamic(user:metta_cached_buffer/5).~n',[]),
+      format(Src,':- multifile(user:metta_cached_buffer/5).~n',[]),
+      forall(metta_file_buffer(Mode,Term,NamedVarsList,Filename,LineCount),
+        (write_canonical(Src,user:metta_cached_buffer(Key,Mode,Term,NamedVarsList,LineCount)),
+         write(Src,'.'), nl(Src)))),
+     close(Src)),
+  % qcompile/1 also loads the rows; only the .qlf should keep them
+  call_cleanup(qcompile(SrcFile),unload_file(SrcFile)),
+  file_name_extension(TmpBase,'qlf',TmpQlf),
+  rename_file(TmpQlf,QlfFile),
+  ignore(catch(delete_file(SrcFile),_,true)),
+  statistics(cputime,T1),
+  note_metta_cache_time(cold,Filename,T1-T0).
+
+metta_cache_tmp_base(File,TmpBase):-
+  current_prolog_flag(pid,Pid),
+  flag(metta_cache_tmp,I,I+1),
+  format(atom(TmpBase),'~w.~w_~w.tmp',[File,Pid,I]).
+
+note_metta_cache_time(ColdWarm,Filename,Expr):-
+  Secs is Expr,
+  flag(metta_cache_ms(ColdWarm),MS,MS+round(Secs*1000)),
+  if_verbose(load,fbug(metta_cache(ColdWarm,Filename,Secs))).
+
+metta_file_cache_stats:-
+  flag(metta_cache_hits,H,H),
+  flag(metta_cache_misses,M,M),
+  flag(metta_cache_ms(cold),Cold,Cold),
+  flag(metta_cache_ms(warm),Warm,Warm),
+  metta_cache_dir(Dir),
+  pl_stats('AOT cache dir',Dir),
+  pl_stats('AOT cache hits',H),
+  pl_stats('AOT cache misses',M),
+  pl_stats('AOT cache write ms (cold)',Cold),
+  pl_stats('AOT cache read ms (warm)',Warm),
+  nl.
 
 
 my_line_count(In, seek($,0,current,CC)):-
@@ -596,10 +868,55 @@ load_metta_buffer(Self,Filename):-
    set_exec_num(Filename,0),
    pfcAdd_Now(user:loaded_into_kb(Self,Filename)),
    forall(metta_file_buffer(Mode,Expr,NamedVarsList,Filename,_LineCount),
-       (maplist(maybe_assign,NamedVarsList),
-        must_det_ll((((do_metta(file(Filename),Mode,Self,Expr,_O)))
-             ->true
-              ; (trace,pp_m(unknown_do_metta(file(Filename),Mode,Self,Expr))))))).
+       do_metta_file_form(Self,Filename,Mode,Expr,NamedVarsList)).
+
+do_metta_file_form(Self,Filename,Mode,Expr,NamedVarsList):-
+   maplist(maybe_assign,NamedVarsList),
+   must_det_ll((((do_metta(file(Filename),Mode,Self,Expr,_O)))
+        ->true
+         ; (trace,pp_m(unknown_do_metta(file(Filename),Mode,Self,Expr))))).
+
+% ===============================
+%  Streaming load
+% ===============================
+% Parses one top-level form, runs it, and forgets it before reading the next,
+% so memory stays flat and execution starts with the first form.  Nothing is
+% staged in metta_file_buffer/5, which means the compiler's look-ahead
+% (metta_atom_file_buffer/1) only sees what was already loaded: that is why
+% --compile keeps the buffered loader.
+%   --load-stream=true   always stream
+%   --load-stream=false  always buffer
+%   --load-stream=auto   stream files over 'load-stream-min-size' bytes when not compiling
+
+use_streaming_load(Size):-
+   option_value('load-stream',Mode), Mode\==[],
+   use_streaming_load(Mode,Size).
+
+use_streaming_load(Mode,_Size):- is_tRuE(Mode),!.
+use_streaming_load(auto,Size):- integer(Size),
+   option_value('compile',false),
+   load_stream_min_size(Min),
+   Size >= Min.
+
+load_stream_min_size(Min):- option_value('load-stream-min-size',V), integer(V),!, Min = V.
+load_stream_min_size(Min):- option_value('load-stream-min-size',V), atomic(V), atom_number(V,Min),!.
+load_stream_min_size(1048576).
+
+load_metta_file_streaming(P2,Filename,Self,In):-
+   set_exec_num(Filename,1),
+   load_answer_file(Filename),
+   set_exec_num(Filename,0),
+   pfcAdd_Now(user:loaded_into_kb(Self,Filename)),
+   repeat,
+      line_count(In,LineNo),
+      current_read_mode(file,Mode),
+      must_det_ll(call(P2,In,Expr)),
+      (Expr == end_of_file -> true ;
+        (subst_vars(Expr,Term,[],NamedVarsList),
+         catch_err(do_metta_file_form(Self,Filename,Mode,Term,NamedVarsList),E,
+           (fbug(load_error(Filename:LineNo,E)),throw(E))))),
+      flush_output,
+   (Expr == end_of_file ; at_end_of_stream(In)),!.
 
 
 
@@ -1,13 +1,59 @@
 
-disable_optimizer:- false.
-disable_optimizer.
+% ===============================
+%  Optimizer pass manager
+% ===============================
+% Each pass is switched with --opt-<pass>=true|false ; --optimize=full turns on
+% every pass that has not been set explicitly.  Left on auto, a pass runs only if
+% it is an optimizer_pass_default/1 (direct_calls, which was always on), so the
+% default output is what it was before the pass manager.  Rewrites are counted
+% per loading file and pass, see optimizer_report/0.
+% scripts/optimizer_pass_matrix.sh runs tests/compiler_baseline with each pass.
+
+optimizer_pass(direct_calls,    'opt-direct-calls',    'call a predicate of the right arity directly instead of through u_assign').
+optimizer_pass(constant_fold,   'opt-constant-fold',   'fold arithmetic/comparisons on numeric literals').
+optimizer_pass(dead_assign,     'opt-dead-assign',     'drop u_assign/unifications whose result is never used').
+optimizer_pass(inline_builtins, 'opt-inline-builtins', 'call deterministic builtins directly instead of through u_assign').
+optimizer_pass(tail_call,       'opt-tail-call',       'move the result unification in front of the last call').
+
+optimizer_pass_enabled(Pass):-
+  optimizer_pass(Pass,Opt,_),
+  (option_value(Opt,Value), Value\==[], Value\==auto
+    -> is_tRuE(Value)
+    ;  (option_value('optimize',full) ; optimizer_pass_default(Pass))).
+
+optimizer_pass_default(direct_calls).
+
+optimizer_rewrote(Pass):-
+  ((option_value(loading_file,File), atomic(File), File\==[]) -> true ; File = user),
+  (optimizer_file(File) -> true ; assert(optimizer_file(File))),
+  flag(optimizer_rewrites(File,Pass),N,N+1).
+
+:- dynamic(optimizer_file/1).
+optimizer_report:-
+  forall(optimizer_pass(Pass,Opt,Desc),
+    ((optimizer_pass_enabled(Pass)->OnOff=on;OnOff=off),
+     format('~N; ~w (--~w) ~w: ~w~n',[Pass,Opt,OnOff,Desc]))),
+  forall(optimizer_file(File),
+    (format('~N; ~w~n',[File]),
+     forall(optimizer_pass(Pass,_,_),
+       (flag(optimizer_rewrites(File,Pass),N,N),
+        pl_stats(Pass,N))),
+     nl)).
+
+optimizer_reset_counts:-
+  forall(optimizer_file(File),
+     forall(optimizer_pass(Pass,_,_),flag(optimizer_rewrites(File,Pass),_,0))),
+  retractall(optimizer_file(_)).
+
+% The legacy rewrites below predate the pass manager; each is now owned by a pass.
+% Those that were disabled stay so until a pass that is off by default is on.
+disable_optimizer:- \+ (optimizer_pass_enabled(Pass), \+ optimizer_pass_default(Pass)).
 
 :- op(700,xfx,'=~').
 :- op(690,xfx, =~ ).
 
 
-% disables
-assumed_true(_,_):- disable_optimizer, !, fail.
+assumed_true(_,_):- \+ optimizer_pass_enabled(dead_assign), !, fail.
 assumed_true(_ ,B2):- var(B2),!,fail.
 assumed_true(HB,eval_true(B2)):-!,assumed_true(HB,B2).
 assumed_true(_ ,B2):- B2==is_True('True').
@@ -25,27 +71,32 @@ assumed_true(HB,X=Y):- is_nsVar(X),is_nsVar(Y),
   (count_var_gte(HB,Y,2);count_var_gte(HB,X,2)),
   X=Y,!.
 
-% disables
- optimize_u_assign_1(_,_):- disable_optimizer,!, fail.
 optimize_u_assign_1(_,Var,_,_):- is_nsVar(Var),!,fail.
-optimize_u_assign_1(_HB,[H|T],R,Code):- symbol(H),length([H|T],Arity),
+optimize_u_assign_1(_,Expr,R,Code):- optimizer_pass_enabled(constant_fold),
+   optimize_constant_fold(Expr,R,Code),!, optimizer_rewrote(constant_fold).
+% each clause checks (and counts) the pass it belongs to, so turning
+% direct_calls off leaves inline_builtins working and vice versa
+optimize_u_assign_1(_HB,[H|T],R,Code):- optimizer_pass_enabled(direct_calls),
+   symbol(H),length([H|T],Arity),
    predicate_arity(F,A),Arity==A, \+ (predicate_arity(F,A2),A2\=A),
-    append([H|T],[R],ArgsR),Code=..ArgsR,!.
-optimize_u_assign_1(HB,Compound,R,Code):- \+ compound(Compound),!, optimize_u_assign(HB,Compound,R,Code).
-optimize_u_assign_1(HB,[H|T],R,Code):- !, optimize_u_assign(HB,[H|T],R,Code).
-optimize_u_assign_1(_ ,Compound,R,Code):-
+    append([H|T],[R],ArgsR),Code=..ArgsR,!, optimizer_rewrote(direct_calls).
+optimize_u_assign_1(HB,Compound,R,Code):- \+ compound(Compound),!, inline_builtin(HB,Compound,R,Code).
+optimize_u_assign_1(HB,[H|T],R,Code):- !, inline_builtin(HB,[H|T],R,Code).
+optimize_u_assign_1(_ ,Compound,R,Code):- optimizer_pass_enabled(direct_calls),
    is_list(R),var(Compound),
-   into_u_assign(R,Compound,Code),!.
+   into_u_assign(R,Compound,Code),!, optimizer_rewrote(direct_calls).
 
 %optimize_u_assign_1(_,Compound,R,Code):- f2p(Compound,R,Code),!.
-optimize_u_assign_1(_,Compound,R,Code):-
+optimize_u_assign_1(_,Compound,R,Code):- optimizer_pass_enabled(direct_calls),
   compound(Compound),
   as_functor_args(Compound,F,N0), N is N0 +1,
   (predicate_arity(F,N); functional_predicate_arg(F, N, N)),
-   append_term_or_call(Compound,R,Code).
-optimize_u_assign_1(HB,Compound,R,Code):- p2s(Compound,MeTTa),   optimize_u_assign(HB,MeTTa,R,Code).
+   append_term_or_call(Compound,R,Code), optimizer_rewrote(direct_calls).
+optimize_u_assign_1(HB,Compound,R,Code):- p2s(Compound,MeTTa),   inline_builtin(HB,MeTTa,R,Code).
 %optimize_u_assign_1(_,[Pred| ArgsL], R, u_assign([Pred| ArgsL],R)).
 
+inline_builtin(HB,Expr,R,Code):- optimize_u_assign(HB,Expr,R,Code), optimizer_rewrote(inline_builtins).
+
 
 
 % disables
@@ -78,8 +129,7 @@ optimize_unit11(eval_true([GM0, [GM, Eval], Val]), call(GM,Eval,Val)):-
 optimize_unit11(I,true):- I=eval_for(_,'%Undefined%', A, C), \+ iz_conz(A),\+ iz_conz(C), A=C.
 
 
-% disables
-optimize_unit1(_,_):- disable_optimizer, !, fail.
+optimize_unit1(_,_):- \+ optimizer_pass_enabled(dead_assign), !, fail.
 optimize_unit1(Var,_):- var(Var),!,fail.
 optimize_unit1(true,true):-!.
 optimize_unit1(I,O):- fail, \+ is_list(I), I\=(_,_), compound(I),
@@ -90,8 +140,6 @@ optimize_unit1(I,O):- fail, \+ is_list(I), I\=(_,_), compound(I),
 optimize_unit1(eval_for(b_6,'Atom', A,B), A=B):- \+ iz_conz(A),\+ iz_conz(B),  \+ \+ (A=B).
 optimize_unit1(B1,eval_true(A)):- B1 = eval_for(_,NonEval, A, B),NonEval=='Bool', B=='True',!.
 
-% disables
-optimize_unit1(_,_):- disable_optimizer, !, fail.
 optimize_unit1(eval_for(b_6,Atom,A,B),eval(A,B)):- 'Atom' == Atom,!.
 optimize_unit1(eval_for(_,Atom,A,B),print(A=B)):- 'Atom' == Atom, freeze(A, A=B),freeze(B, A=B), \+ \+ (A=B).
 optimize_unit1(B=True, B=True):- B='True','True'==True.
@@ -124,8 +172,7 @@ optimize_unit1( ==([GM,Eval],Val,C), call(GM,Eval,Val)):- C==Eval,
 
 
 
-% disables
-optimize_u_assign(_,_,_,_):- disable_optimizer, !, fail.
+optimize_u_assign(_,_,_,_):- \+ optimizer_pass_enabled(inline_builtins), !, fail.
 
 optimize_u_assign(_,[Var|_],_,_):- is_nsVar(Var),!,fail.
 optimize_u_assign(_,[Empty], _, (!,fail)):-  Empty == empty,!.
@@ -162,25 +209,32 @@ optimize_u_assign((H:-_),[Pred| ArgsL], R, Code):- var(R), symbol(Pred), ok_to_a
   (H=..[Pred|_] -> nop(set_option_value('tabling',true)) ; current_predicate(_,Code)),!.
 
 
-% disables
 optimize_conj(_, _, _, _):- disable_optimizer, !, fail.
 
-optimize_conj(_Head, B1,B2,eval_true(E)):-
-        B2 = is_True(True_Eval),
-        B1 = eval(E,True_Eval1),
-        True_Eval1 == True_Eval,!.
+% tail_call: a trailing eval_for(ret,Type,..) with an unknown Type is a plain
+% unification; expose it so the clause below can fold it into the last call
+optimize_conj(_, RR, eval_for(ret,Type,C,A), (RR,C=A)):-
+   optimizer_pass_enabled(tail_call), is_ftVar(Type), compound(RR), RR\=(_,_), !,
+   optimizer_rewrote(tail_call).
 
-optimize_conj(HB, RR, C=A, RR):- compound(RR),is_nsVar(C),is_nsVar(A),
+optimize_conj(HB, RR, C=A, RR):- optimizer_pass_enabled(tail_call),
+  compound(RR),is_nsVar(C),is_nsVar(A),
   as_functor_args(RR,_,_,Args),is_list(Args), member(CC,Args),var(CC), CC==C,
-    count_var(HB,C,N),N=2,C=A,!.
-
-optimize_conj(_, u_assign(Term, C), u_assign(True,CC), eval_true(Term)):-
-   'True'==True, CC==C.
-optimize_conj(_, u_assign(Term, C), is_True(CC), eval_true(Term)):- CC==C, !.
-optimize_conj(HB, u_assign(Term, C), C=A, u_assign(Term,A)):- is_ftVar(C),is_ftVar(A),count_var(HB,C,N),N=2,!.
-optimize_conj(_, u_assign(Term, C), is_True(CC), eval_true(Term)):- CC==C, !.
-optimize_conj(HB, B1,BT,B1):- assumed_true(HB,BT),!.
-optimize_conj(HB, BT,B1,B1):- assumed_true(HB,BT),!.
+    count_var(HB,C,N),N=2,C=A,!, optimizer_rewrote(tail_call).
+
+optimize_conj(_Head, B1,B2,eval_true(E)):- optimizer_pass_enabled(dead_assign),
+        B2 = is_True(True_Eval),
+        B1 = eval(E,True_Eval1),
+        True_Eval1 == True_Eval,!, optimizer_rewrote(dead_assign).
+
+optimize_conj(_, u_assign(Term, C), u_assign(True,CC), eval_true(Term)):- optimizer_pass_enabled(dead_assign),
+   'True'==True, CC==C, optimizer_rewrote(dead_assign).
+optimize_conj(_, u_assign(Term, C), is_True(CC), eval_true(Term)):- optimizer_pass_enabled(dead_assign),
+   CC==C, !, optimizer_rewrote(dead_assign).
+optimize_conj(HB, u_assign(Term, C), C=A, u_assign(Term,A)):- optimizer_pass_enabled(dead_assign),
+   is_ftVar(C),is_ftVar(A),count_var(HB,C,N),N=2,!, optimizer_rewrote(dead_assign).
+optimize_conj(HB, B1,BT,B1):- assumed_true(HB,BT),!, optimizer_rewrote(dead_assign).
+optimize_conj(HB, BT,B1,B1):- assumed_true(HB,BT),!, optimizer_rewrote(dead_assign).
 %optimize_conj(Head, u_assign(Term, C), u_assign(True,CC), Term):- 'True'==True,
 %     optimize_conj(Head, u_assign(Term, C), is_True(CC), CTerm).
 %optimize_conj(Head,B1,BT,BN1):- assumed_true(HB,BT),!, optimize_body(Head,B1,BN1).
@@ -286,6 +340,20 @@ optimize_body_unit(O,O).
 ok_to_append('$VAR'):- !, fail.
 ok_to_append(_).
 
+% constant_fold: (+ 1 2) => 3 when both operands are numeric literals
+optimize_constant_fold([Op,A,B],R,R=V):-
+   symbol(Op), number(A), number(B),
+   catch(constant_fold_op(Op,A,B,V),_,fail),!.
+
+constant_fold_op('+',A,B,V):- V is A + B.
+constant_fold_op('-',A,B,V):- V is A - B.
+constant_fold_op('*',A,B,V):- V is A * B.
+constant_fold_op('<',A,B,TF):- (A < B -> TF='True' ; TF='False').
+constant_fold_op('>',A,B,TF):- (A > B -> TF='True' ; TF='False').
+constant_fold_op('<=',A,B,TF):- (A =< B -> TF='True' ; TF='False').
+constant_fold_op('>=',A,B,TF):- (A >= B -> TF='True' ; TF='False').
+constant_fold_op('==',A,B,TF):- (A == B -> TF='True' ; TF='False').
+
 number_wang(A,B,C):-
   (numeric(C);numeric(A);numeric(B)),!,
   maplist(numeric_or_var,[A,B,C]),
@@ -264,6 +264,47 @@ pp_sexi_c(Term) :-
 
 pp_sexi(2,Result):- write('\t\t'),pp_sex(Result).
 
+% ===============================
+%       FAST BULK OUTPUT
+% ===============================
+% write_src_fast/1,2 writes what write_src/1 writes for the shapes bulk
+% output is made of (symbols, numbers, strings, variables and proper lists
+% of them) but skips indentation, colouring and variable-name recovery and
+% writes straight to the stream.  Anything else goes through write_src/1.
+% Used by 'save-space!' and, with --fast-print, for printing results;
+% --fast-print=auto only takes it for lists of fast-print-min or more.
+use_fast_src(_):- option_value('fast-print',true),!.
+use_fast_src(V):- option_value('fast-print',auto), is_list(V),
+  length(V,Len), option_else('fast-print-min',Min,1000), Len >= Min.
+
+write_src_fast(V):- current_output(Out), write_src_fast(Out,V).
+
+write_src_fast(Out,V):- var(V),!, write(Out,'$'), write(Out,V).
+write_src_fast(Out,[]):- !, write(Out,'()').
+write_src_fast(Out,V):- atom(V),!, write_symbol_fast(Out,V).
+write_src_fast(Out,V):- number(V),!, writeq(Out,V).
+write_src_fast(Out,V):- string(V),!, writeq(Out,V).
+write_src_fast(Out,[H|T]):- \+ write_mobj_head(H), is_list(T),!,
+  write(Out,'('), write_src_fast(Out,H), write_args_fast(Out,T), write(Out,')').
+write_src_fast(Out,V):- with_output_to(Out,write_src(V)).
+
+write_args_fast(_Out,[]).
+write_args_fast(Out,[H|T]):- write(Out,' '), write_src_fast(Out,H), write_args_fast(Out,T).
+
+% should_quote/1 only says yes for symbols holding one of these
+write_symbol_fast(Out,V):- \+ special_symbol_write(V),
+  \+ sub_atom(V,_,_,_,' '), \+ sub_atom(V,_,_,_,'"'),
+  \+ sub_atom(V,_,_,_,''''), \+ sub_atom(V,_,_,_,','),!,
+  write(Out,V).
+write_symbol_fast(Out,V):- with_output_to(Out,write_src(V)).
+
+special_symbol_write('').
+special_symbol_write('Empty').
+special_symbol_write('[|]').
+
+% heads that write_mobj/2 prints specially
+write_mobj_head(H):- atom(H), memberchk(H,['$VAR',exec,'$OBJ','{}','{...}','[...]','$STRING']).
+
 
 current_column(Column) :- current_output(Stream), line_position(Stream, Column),!.
 current_column(Column) :- stream_property(current_output, position(Position)), stream_position_data(column, Position, Column).
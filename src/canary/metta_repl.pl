@@ -373,6 +373,7 @@ write_asrc(Var):- Var=='Empty',is_compatio,!.
 write_asrc(Var):- write_bsrc(Var),!.
 
 write_bsrc(Var):- Var=='Empty',!,write(Var).
+write_bsrc(Var):- use_fast_src(Var), term_attvars(Var,[]),!,write_src_fast(Var).
 write_bsrc(Var):- ground(Var),!,write_src(Var).
 write_bsrc(Var):- copy_term(Var,Copy,Goals),Var=Copy,write_bsrc(Var,Goals).
 write_bsrc(Var,[]):- write_src(Var).
@@ -53,12 +53,16 @@
 
 :- use_module(library(socket)).
 :- use_module(library(thread)).
+:- use_module(library(solution_sequences)).
+:- use_module(library(process)).
 
 call_wdet(Goal,WasDet):- call(Goal),deterministic(WasDet).
 % Helper to parse Server and Port
 parse_service_port(Peer,DefaultPort, Server, Port) :-
     (   Peer = Server:Port -> true
     ;   integer(Peer) -> Server = localhost, Port = Peer
+    ;   ((atom(Peer);string(Peer)), text_to_string(Peer,S), split_string(S,":","",[H,P]), number_string(Port,P))
+        -> atom_string(Server,H)  % "localhost:3021" as written in MeTTa
     ;   Server = Peer, Port = DefaultPort  % Default port if none specified
     ).
 
@@ -94,11 +98,15 @@ run_vspace_service(MSpace,Port):-
 run_vspace_service_unsafe(MSpace,Port) :-
     tcp_socket(Socket),
     tcp_bind(Socket, Port),
-    tcp_listen(Socket, 5), tcp_open_socket(Socket, ListenFd),
+    vspace_backlog(Backlog),
+    tcp_listen(Socket, Backlog), tcp_open_socket(Socket, ListenFd),
     not_compatio(fbugio(run_vspace_service(MSpace,Port))),
     retractall(vspace_port(_)),
     assert(vspace_port(Port)),
-    accept_vspace_connections(MSpace,ListenFd).
+    vspace_workers(Workers),
+    (   Workers > 0
+    ->  serve_vspace_pool(MSpace,Port,Workers,ListenFd)
+    ;   accept_vspace_connections(MSpace,ListenFd)).
 
 accept_vspace_connections(MSpace,ListenFd) :-
     tcp_accept(ListenFd, RemoteFd, RemoteAddr),
@@ -108,16 +116,174 @@ accept_vspace_connections(MSpace,ListenFd) :-
     thread_create(setup_call_cleanup(
             tcp_open_socket(RemoteFd, Stream),
             ignore(handle_vspace_peer(Stream)),
-            catch(close(Stream),_,true)), _, [detached(true), alias(ThreadAlias)] ),
+            close_connection(Stream)), _, [detached(true), alias(ThreadAlias)] ),
     accept_vspace_connections(MSpace,ListenFd).
 
+% ===============================
+%  Worker pool server
+% ===============================
+% With vspace-workers > 0 (default: one per CPU) the service runs a fixed
+% pool of worker threads instead of a thread per connection.  The thread
+% that accepts connections also watches the idle ones; when one has a
+% request waiting it is put on a message queue (at most vspace-queue
+% entries, after which accepting pauses and clients wait in the listen
+% backlog of vspace-backlog).  A worker answers every request already sent
+% on the connection, so pipelined requests are served back to back, and
+% then hands the connection back to be watched.  vspace_metrics/2 reports
+% queue depth, request counts and queue-wait and service latencies.
+% vspace-workers=0 keeps the thread per connection.
+
+:- dynamic(vspace_pool/4).  % Service, Queue, ReturnQueue, Workers
+
+vspace_workers(N):- option_else('vspace-workers',V,auto), V \== auto, any_to_i(V,N),!.
+vspace_workers(N):- current_prolog_flag(cpu_count,N).
+
+vspace_backlog(N):- option_else('vspace-backlog',V,64), any_to_i(V,N),!.
+vspace_backlog(64).
+
+vspace_queue_max(N):- option_else('vspace-queue',V,256), any_to_i(V,N),!.
+vspace_queue_max(256).
+
+vspace_service_name(MSpace,Port,Service):- symbolic_list_concat([vspace,MSpace,Port],'_',Service).
+
+serve_vspace_pool(MSpace,Port,Workers,ListenFd):-
+    vspace_service_name(MSpace,Port,Service),
+    vspace_queue_max(Max),
+    message_queue_create(Queue,[max_size(Max)]),
+    message_queue_create(ReturnQ),
+    retractall(vspace_pool(Service,_,_,_)),
+    assertz(vspace_pool(Service,Queue,ReturnQ,Workers)),
+    reset_vspace_metrics(Service),
+    forall(between(1,Workers,N),
+       (symbolic_list_concat([Service,worker,N],'_',WorkerAlias),
+        thread_create(vspace_worker(Service,MSpace,Queue,ReturnQ),_,[detached(true),alias(WorkerAlias)]))),
+    stream_pair(ListenFd,ListenIn,_),
+    dispatch_vspace_connections(Service,ListenIn,Queue,ReturnQ,[]).
+
+% Idle is the list of connections waiting for their next request
+dispatch_vspace_connections(Service,ListenIn,Queue,ReturnQ,Idle0):-
+    findall(S, thread_get_message(ReturnQ,returned(S),[timeout(0)]), Returned),
+    append(Returned,Idle0,Idle1),
+    maplist(vspace_input,Idle1,Ins),
+    catch(wait_for_input([ListenIn|Ins],Ready,0.01),_,Ready=[]),
+    (   memberchk(ListenIn,Ready)
+    ->  (   tcp_accept(ListenIn,RemoteFd,_RemoteAddr),
+            tcp_open_socket(RemoteFd,Conn),
+            Idle2 = [Conn|Idle1])
+    ;   Idle2 = Idle1),
+    partition(vspace_ready(Ready),Idle2,Busy,Idle),
+    get_time(Now),
+    forall(member(Conn,Busy),thread_send_message(Queue,conn(Conn,Now))),
+    dispatch_vspace_connections(Service,ListenIn,Queue,ReturnQ,Idle).
+
+vspace_input(Conn,In):- stream_pair(Conn,In,_).
+vspace_ready(Ready,Conn):- vspace_input(Conn,In), memberchk(In,Ready).
+
+vspace_worker(Service,MSpace,Queue,ReturnQ):-
+    nb_setval(self_space,MSpace),
+    repeat,
+      thread_get_message(Queue,conn(Conn,Queued)),
+      get_time(Start), Wait is Start-Queued,
+      note_vspace_metric(Service,wait,Wait),
+      catch(serve_vspace_connection(Service,Conn,Status),_,Status=closed),
+      (   Status == open
+      ->  thread_send_message(ReturnQ,returned(Conn))
+      ;   close_connection(Conn)),
+      fail.
+
+% answers requests while more are already waiting on the connection
+serve_vspace_connection(Service,Conn,Status):-
+    recv_term(Conn,Goal),
+    (   Goal == end_of_file
+    ->  Status = closed
+    ;   (   get_time(T0),
+            handle_vspace_request(Conn,Goal),
+            get_time(T1), Latency is T1-T0,
+            note_vspace_metric(Service,latency,Latency),
+            vspace_input(Conn,In),
+            (   (wait_for_input([In],[_],0))
+            ->  serve_vspace_connection(Service,Conn,Status)
+            ;   Status = open))).
+
+reset_vspace_metrics(Service):-
+    forall(member(M,[requests,latency_us,latency_max_us,waits,wait_us,wait_max_us]),
+       (vspace_metric_flag(Service,M,Key),flag(Key,_,0))).
+
+vspace_metric_flag(Service,M,Key):- symbolic_list_concat([Service,M],'__',Key).
+
+note_vspace_metric(Service,latency,Secs):- !, Us is round(Secs*1000000),
+    vspace_metric_flag(Service,requests,R), flag(R,N,N+1),
+    vspace_metric_flag(Service,latency_us,L), flag(L,T,T+Us),
+    vspace_metric_flag(Service,latency_max_us,X), flag(X,M,max(M,Us)).
+note_vspace_metric(Service,wait,Secs):- Us is round(Secs*1000000),
+    vspace_metric_flag(Service,waits,R), flag(R,N,N+1),
+    vspace_metric_flag(Service,wait_us,L), flag(L,T,T+Us),
+    vspace_metric_flag(Service,wait_max_us,X), flag(X,M,max(M,Us)).
+
+% vspace_metrics(?Service,-Metrics) Metrics is a list of Name=Value, times in milliseconds
+vspace_metrics(Service,Metrics):-
+    vspace_pool(Service,Queue,_,Workers),
+    message_queue_property(Queue,size(Depth)),
+    findall(M=V,(member(M,[requests,latency_us,latency_max_us,waits,wait_us,wait_max_us]),
+                 vspace_metric_flag(Service,M,Key),flag(Key,V,V)),Raw),
+    memberchk(requests=Reqs,Raw), memberchk(latency_us=LUs,Raw), memberchk(latency_max_us=LMax,Raw),
+    memberchk(waits=Waits,Raw), memberchk(wait_us=WUs,Raw), memberchk(wait_max_us=WMax,Raw),
+    LMean is LUs/max(Reqs,1)/1000, WMean is WUs/max(Waits,1)/1000,
+    LMaxMs is LMax/1000, WMaxMs is WMax/1000,
+    Metrics = [workers=Workers, queue_depth=Depth, requests=Reqs,
+               latency_mean_ms=LMean, latency_max_ms=LMaxMs,
+               queue_wait_mean_ms=WMean, queue_wait_max_ms=WMaxMs].
+
+vspace_metrics:-
+    forall(vspace_metrics(Service,Metrics),
+       (format("~N; ~w~n",[Service]), forall(member(N=V,Metrics),pl_stats(N,V)), nl)).
+
 handle_vspace_peer(Stream) :-
+    repeat,
     recv_term(Stream, Goal),
-    (   Goal \= end_of_file
-    ->  (   catch(call_wdet(Goal,WasDet), Error, true)
-             *->  (   var(Error) ->  send_term(Stream, success(Goal,WasDet)) ;   send_term(Stream,error(Error)))
-             ;send_term(Stream, 'failed'))),
-        handle_vspace_peer(Stream).
+    (   Goal == end_of_file
+    ->  !
+    ;   (handle_vspace_request(Stream, Goal), fail)).
+
+% solutions(Template,Goal,Chunk,Limit) streams the Template instances of
+% at most Limit solutions as answers(List,more) messages of Chunk answers,
+% each one waiting for the client to send next or cancel, and a final
+% answers(List,done).  Only the template crosses the wire, and the goal's
+% choice points are dropped as soon as the client cancels.  A client that
+% sends neither within vspace-stream-idle seconds (default 30) has its
+% connection closed, so it cannot keep a pool worker waiting.
+handle_vspace_request(Stream, solutions(Template,Goal,Chunk,Limit)) :- !,
+    (   Limit == inf -> Goal1 = Goal ; Goal1 = limit(Limit,Goal) ),
+    (   (   catch(call_wdet(findnsols(Chunk,Template,Goal1,List),Det), Error, true),
+            (   nonvar(Error) ->  send_term(Stream,error(Error))
+            ;   Det == true ->  send_term(Stream,answers(List,done))
+            ;   (   send_term(Stream,answers(List,more)),
+                    recv_stream_control(Stream,Control),
+                    Control \== next )))
+    ->  true
+    ;   send_term(Stream,answers([],done))).
+handle_vspace_request(Stream, '$wire'(Format)) :- !,
+    (   memberchk(Format,[binary,text])
+    ->  (send_term(Stream, '$wire'(Format)), set_wire_format(Stream, Format))
+    ;   send_term(Stream, '$wire'(text))).
+% Sends every answer, ending with success(Goal,true), failed or error(E)
+% so the connection is ready for the next request once the client has read it.
+handle_vspace_request(Stream, Goal) :-
+    (   (   catch(call_wdet(Goal,WasDet), Error, true),
+            (   var(Error) ->  send_term(Stream, success(Goal,WasDet)) ;   send_term(Stream,error(Error))),
+            (   nonvar(Error) ; WasDet == true ))
+    ->  true
+    ;   send_term(Stream, 'failed')).
+
+recv_stream_control(Stream,Control):-
+    vspace_stream_idle(Secs),
+    vspace_input(Stream,In),
+    (   wait_for_input([In],[_],Secs)
+    ->  recv_term(Stream,Control)
+    ;   throw(error(timeout_error(read,Stream),context(solutions/4,'no next or cancel from client')))).
+
+vspace_stream_idle(Secs):- option_else('vspace-stream-idle',V,30), (number(V)->Secs=V;atom_number(V,Secs)), Secs > 0, !.
+vspace_stream_idle(30).
 
 any_to_i(A,I):- integer(A),I=A.
 any_to_i(A,I):- format(atom(Ay),'~w',[A]),atom_number(Ay,I).
@@ -137,32 +303,556 @@ connect_to_service(HostPort, Stream) :-
     parse_service_port(HostPort, 3023, Host, Port),
     tcp_socket(Socket),
     tcp_connect(Socket, Host:Port),
-    tcp_open_socket(Socket, Stream).
+    tcp_open_socket(Socket, Stream),
+    negotiate_wire_format(Stream).
 
 % Helper to send goal and receive response
+send_term(Stream, MeTTa) :- stream_wire_format(Stream,binary), !, send_frame(Stream, MeTTa).
 send_term(Stream, MeTTa) :-  write_canonical(Stream, MeTTa),writeln(Stream, '.'), flush_output(Stream).
+recv_term(Stream, MeTTa) :- stream_wire_format(Stream,binary), !, recv_frame(Stream, MeTTa).
 recv_term(Stream, MeTTa) :-  read_term(Stream, MeTTa, []).
 
+% ===============================
+%  Binary wire format
+% ===============================
+% A new connection asks for the binary format by sending '$wire'(binary) as
+% text.  A peer that knows it answers '$wire'(binary) and both sides then
+% send each term as a 4-byte big-endian length followed by its
+% fast_term_serialized/2 bytes, which skips write_canonical/read_term for
+% large results.  An older peer answers with an error and the connection
+% stays in text.  --remote-wire=text keeps the readable format for debugging.
+
+:- dynamic(stream_wire_format/2).
+
+remote_wire_format(Format):- option_else('remote-wire',V,binary), memberchk(V,[binary,text]), !, Format = V.
+remote_wire_format(binary).
+
+negotiate_wire_format(Stream):- remote_wire_format(binary), !,
+    send_term(Stream, '$wire'(binary)),
+    recv_term(Stream, Reply),
+    (   Reply == '$wire'(binary)
+    ->  set_wire_format(Stream, binary)
+    ;   true).
+negotiate_wire_format(_Stream).
+
+set_wire_format(Stream, Format):-
+    retractall(stream_wire_format(Stream,_)),
+    (   Format == binary
+    ->  (   forall(wire_side(Stream,S), set_stream(S,encoding(octet))),
+            assertz(stream_wire_format(Stream,binary)))
+    ;   true).
+
+wire_side(Stream, S):- stream_pair(Stream, In, Out), !, (S = In ; S = Out), nonvar(S).
+wire_side(Stream, Stream).
+
+send_frame(Stream, Term):-
+    fast_term_serialized(Term, Bytes),
+    string_length(Bytes, Len),
+    forall(member(Shift,[24,16,8,0]), (B is (Len >> Shift) /\ 255, put_code(Stream, B))),
+    write(Stream, Bytes),
+    flush_output(Stream).
+
+recv_frame(Stream, Term):-
+    get_code(Stream, B1),
+    (   B1 == -1
+    ->  Term = end_of_file
+    ;   (   get_code(Stream, B2), get_code(Stream, B3), get_code(Stream, B4),
+            Len is (B1 << 24) \/ (B2 << 16) \/ (B3 << 8) \/ B4,
+            read_string(Stream, Len, Bytes),
+            (   string_length(Bytes, Len)
+            ->  fast_term_serialized(Term, Bytes)
+            ;   Term = end_of_file ))).
+
+% Payload size and encode/decode time of both formats for result lists of
+% 1k, 100k and 1M atoms, through memory files.
+% swipl -l src/canary/metta_interp.pl -g wire_format_bench -t halt
+wire_format_bench:- forall(member(N,[1000,100000,1000000]), wire_format_bench(N)).
+
+wire_format_bench(N):-
+    numlist(1, N, Ns),
+    findall([edge,I,"label",1.5], member(I,Ns), Atoms),
+    forall(member(Format,[text,binary]), wire_format_bench(Format, N, answers(Atoms,done))).
+
+wire_format_bench(Format, N, Term):-
+    (Format == binary -> Enc = octet ; Enc = utf8),
+    new_memory_file(MF),
+    open_memory_file(MF, write, Out, [encoding(Enc)]),
+    set_wire_format(Out, Format),
+    get_time(T0), send_term(Out, Term), close_connection(Out), get_time(T1),
+    size_memory_file(MF, Bytes, octet),
+    open_memory_file(MF, read, In, [encoding(Enc)]),
+    set_wire_format(In, Format),
+    get_time(T2), recv_term(In, Read), close_connection(In), get_time(T3),
+    free_memory_file(MF),
+    must_det_ll(Read =@= Term),
+    Write is T1-T0, Parse is T3-T2,
+    MBs is Bytes/1048576/max(Write+Parse,0.000001),
+    format("~N; ~w ~D atoms: ~D bytes, write ~3f s, read ~3f s, ~1f MB/s~n",
+           [Format, N, Bytes, Write, Parse, MBs]).
+
 
 % Read and process the service's response
 read_response(Stream,Goal) :-
    flush_output(Stream),
     repeat, recv_term(Stream,Response),
+    (Response == end_of_file -> (!,throw(error(io_error(read,Stream),context(remote_call/2,'connection closed by peer')))) ;
     (Response == failed -> (!,fail) ;
        (Response = error(Throw) -> throw(Throw) ;
          ((Response = success(Goal,WasDet)),
-            (WasDet==true-> (!, true) ; true)))).
+            (WasDet==true-> (!, true) ; true))))).
 
 % Connects to the service and sends the goal
 % ?- remote_call('localhost', member(X, [1,2,3])).
-remote_call(Peer, Goal) :-
+remote_call(Peer, Goal) :- remote_pool_size(Max), Max =< 0, !,
     setup_call_cleanup(
         (connect_to_service(Peer, Stream),send_term(Stream, Goal)),
         read_response(Stream,Goal),
-        close(Stream)).
+        close_connection(Stream)).
+remote_call(Peer, Goal) :-
+    setup_call_catcher_cleanup(
+        open_remote_request(Peer, Key, Stream, Goal),
+        read_response(Stream,Goal),
+        Catcher,
+        release_connection(Key, Stream, Catcher)).
+
+% ===============================
+%  Connection pool
+% ===============================
+% remote_call/2 borrows a keep-alive connection to the peer instead of
+% connecting for every goal.  Up to remote-pool-size idle connections are
+% kept per peer (default 4, 0 connects per call).  An idle connection is
+% dropped when it is next looked at if it has been idle longer than
+% remote-pool-idle seconds (default 60) or has input waiting, which means
+% the peer closed it.  A call that is cut before the peer's last answer
+% closes its connection, since the remaining answers are still in flight.
+
+:- dynamic(pooled_connection/3).  % Host:Port, Stream, time last released
+
+remote_pool_size(N):- option_else('remote-pool-size',V,4), any_to_i(V,N),!.
+remote_pool_size(4).
+
+remote_pool_idle(Secs):- option_else('remote-pool-idle',V,60), (number(V)->Secs=V;atom_number(V,Secs)),!.
+remote_pool_idle(60).
+
+peer_key(Peer, Host:Port):- parse_service_port(Peer, 3023, Host, Port).
+
+open_remote_request(Peer, Key, Stream, Goal):-
+    checkout_connection(Peer, Key, S0),
+    (   catch(send_term(S0, Goal),_,fail)
+    ->  Stream = S0
+    ;   (close_connection(S0), connect_to_service(Key, Stream), send_term(Stream, Goal))).
+
+checkout_connection(Peer, Key, Stream):-
+    peer_key(Peer, Key),
+    (   take_pooled_connection(Key, Stream)
+    ->  flag(remote_pool_hits,H,H+1)
+    ;   (flag(remote_pool_misses,M,M+1), connect_to_service(Key, Stream))).
+
+take_pooled_connection(Key, Stream):-
+    with_mutex(remote_pool, retract(pooled_connection(Key, S, Last))),
+    (   healthy_connection(S, Last)
+    ->  Stream = S
+    ;   (flag(remote_pool_evicted,E,E+1), close_connection(S), take_pooled_connection(Key, Stream))).
+
+healthy_connection(Stream, Last):-
+    remote_pool_idle(Idle), get_time(Now), Now - Last =< Idle,
+    catch(wait_for_input([Stream], Ready, 0), _, fail),
+    Ready == [].
+
+release_connection(Key, Stream, Catcher):-
+    (Catcher == exit ; Catcher == fail),
+    remote_pool_size(Max), get_time(Now),
+    with_mutex(remote_pool,
+       (aggregate_all(count, pooled_connection(Key,_,_), N), N < Max,
+        assertz(pooled_connection(Key, Stream, Now)))), !,
+    evict_idle_connections.
+release_connection(_Key, Stream, _Catcher):- close_connection(Stream).
+
+evict_idle_connections:-
+    remote_pool_idle(Idle), get_time(Now), Oldest is Now - Idle,
+    with_mutex(remote_pool,
+       findall(S, (pooled_connection(K,S,Last), Last < Oldest, retract(pooled_connection(K,S,Last))), Stale)),
+    length(Stale, N), flag(remote_pool_evicted,E,E+N),
+    maplist(close_connection, Stale).
+
+close_connection(Stream):-
+    retractall(stream_wire_format(Stream,_)),
+    catch(close(Stream, [force(true)]),_,true).
+
+close_remote_pool:-
+    findall(S, retract(pooled_connection(_,S,_)), Streams),
+    maplist(close_connection, Streams).
+:- at_halt(close_remote_pool).
+
+remote_pool_stats:-
+    flag(remote_pool_hits,H,H), flag(remote_pool_misses,M,M), flag(remote_pool_evicted,E,E),
+    aggregate_all(count, pooled_connection(_,_,_), Idle),
+    pl_stats('Remote pool hits',H), pl_stats('Remote pool misses',M),
+    pl_stats('Remote pool evicted',E), pl_stats('Remote pool idle',Idle), nl.
+
+% Sends all of Goals before reading any answer, so the peer can serve them
+% back to back; AnswerLists holds the instantiations of each goal, in order.
+remote_pipeline(Peer, Goals, AnswerLists) :-
+    peer_key(Peer, Key),
+    setup_call_catcher_cleanup(
+        (checkout_connection(Key, Key, Stream), maplist(send_term(Stream), Goals)),
+        maplist(read_all_responses(Stream), Goals, AnswerLists),
+        Catcher,
+        release_connection(Key, Stream, Catcher)).
+
+read_all_responses(Stream, Goal, Answers) :-
+    findall(Goal, read_response(Stream, Goal), Answers).
 
 remote_eval(Peer, MeTTa, Result) :-
-   remote_call(Peer, eval(MeTTa,Result)).
+   remote_solutions(Peer, Result, eval(MeTTa,Result), []).
+
+% remote_solutions(+Peer, ?Template, :Goal, +Options)
+% Nondeterministically yields the Template instances of Goal run on Peer.
+% Answers are fetched chunk(N) at a time (remote-chunk, default 100) and
+% limit(N) caps them on the server.  Cutting the call cancels the rest.
+% ?- remote_solutions(3023, X, member(X,[1,2,3]), [chunk(2)]).
+remote_solutions(Peer, Template, Goal, Options) :-
+    remote_chunk_size(DefChunk),
+    option(chunk(Chunk), Options, DefChunk),
+    option(limit(Limit), Options, inf),
+    State = stream_state(more),
+    setup_call_catcher_cleanup(
+        open_remote_request(Peer, Key, Stream, solutions(Template,Goal,Chunk,Limit)),
+        read_answer_chunks(Stream, State, Template),
+        Catcher,
+        release_streamed_connection(Key, Stream, State, Catcher)).
+
+remote_chunk_size(N):- option_else('remote-chunk',V,100), any_to_i(V,N), N > 0, !.
+remote_chunk_size(100).
+
+read_answer_chunks(Stream, State, Template) :-
+    recv_term(Stream, Response),
+    (   Response = answers(List,More)
+    ->  (   nb_setarg(1,State,More),
+            (   member(Template,List)
+            ;   (More == more, send_term(Stream,next), read_answer_chunks(Stream,State,Template))))
+    ;   Response = error(Throw)
+    ->  (nb_setarg(1,State,done), throw(Throw))
+    ;   throw(error(io_error(read,Stream),context(remote_solutions/4,'connection closed by peer')))).
+
+% a cut while the server still holds answers tells it to drop them
+release_streamed_connection(Key, Stream, State, !):- arg(1,State,more), !,
+    (   catch(send_term(Stream,cancel),_,fail)
+    ->  release_connection(Key, Stream, exit)
+    ;   close_connection(Stream)).
+release_streamed_connection(Key, Stream, _State, !):- !,
+    release_connection(Key, Stream, exit).
+release_streamed_connection(Key, Stream, _State, Catcher):-
+    release_connection(Key, Stream, Catcher).
+
+% ===============================
+%  Remote spaces
+% ===============================
+% A remote space stands for a space served by another MeTTaLog's vspace
+% service, so it can be matched and edited in place instead of copied:
+%   !(bind! &remote (remote-space! "localhost:3021" &self))
+%   !(match &remote (Mars is $x) $x)
+% add-atom and remove-atom are queued and sent to the peer
+% remote-space-batch at a time (default 100), and always before a read so
+% reads see earlier writes.  match answers are cached per pattern for
+% remote-space-ttl seconds (default 5, 0 turns the cache off); any write
+% sent to the peer drops the cache of that space.  A miss streams its
+% answers straight from the peer, and is only cached once all of them were
+% read and there were no more than remote-space-cache-max (default 1000).
+
+:- dynamic(remote_space_peer/3).     % Name, Host:Port, space on the peer
+:- dynamic(remote_space_pending/2).  % Name, add(Atom) or remove(Atom), oldest first
+:- dynamic(remote_space_cache/4).    % Name, variant_sha1 of pattern, Answers, expiry time
+
+is_nonlocal_space(Name):- is_remote_space(Name).
+
+is_remote_space(Name):- atom(Name), remote_space_peer(Name,_,_).
+
+:- register_space_type(is_remote_space,
+     [clear_space-remote_space_clear, add_atom-remote_space_add,
+      remove_atom-remote_space_remove, replace_atom-remote_space_replace,
+      atom_count-remote_space_count, get_atoms-remote_space_get_atoms,
+      atom_iter-remote_space_atom]).
+
+% remote_space(+Peer, +RemoteSpace, -Name)
+remote_space(Peer, RemoteSpace, Name):-
+    peer_key(Peer, Host:Port),
+    format(atom(Name), '&remote:~w:~w/~w', [Host,Port,RemoteSpace]),
+    (   remote_space_peer(Name,_,_)
+    ->  true
+    ;   assertz(remote_space_peer(Name, Host:Port, RemoteSpace))).
+
+% (remote-space! Peer Space) in MeTTa
+'remote-space!'(Peer, RemoteSpace, Name):- remote_space(Peer, RemoteSpace, Name).
+
+remote_space_batch(N):- option_else('remote-space-batch',V,100), any_to_i(V,N), N > 0, !.
+remote_space_batch(100).
+
+remote_space_ttl(Secs):- option_else('remote-space-ttl',V,5), (number(V)->Secs=V;atom_number(V,Secs)), !.
+remote_space_ttl(5).
+
+remote_space_add(Name, Atom):- queue_remote_space_op(Name, add(Atom)).
+remote_space_remove(Name, Atom):- queue_remote_space_op(Name, remove(Atom)).
+remote_space_replace(Name, Old, New):-
+    queue_remote_space_op(Name, remove(Old)),
+    queue_remote_space_op(Name, add(New)).
+
+queue_remote_space_op(Name, Op):-
+    with_mutex(remote_space,
+       (assertz(remote_space_pending(Name, Op)),
+        aggregate_all(count, remote_space_pending(Name,_), N))),
+    remote_space_batch(Max),
+    (N >= Max -> remote_space_flush(Name) ; true).
+
+remote_space_flush(Name):-
+    with_mutex(remote_space,
+       findall(Op, retract(remote_space_pending(Name,Op)), Ops)),
+    (   Ops == []
+    ->  true
+    ;   (   remote_space_peer(Name, Peer, RemoteSpace),
+            retractall(remote_space_cache(Name,_,_,_)),
+            remote_call(Peer, remote_space_apply(RemoteSpace, Ops)))).
+
+remote_space_flush_all:- forall(remote_space_peer(Name,_,_), ignore(catch(remote_space_flush(Name),_,true))).
+:- at_halt(remote_space_flush_all).
+
+% runs on the peer
+remote_space_apply(Space, Ops):- maplist(remote_space_apply_op(Space), Ops).
+remote_space_apply_op(Space, add(Atom)):- 'add-atom'(Space, Atom).
+remote_space_apply_op(Space, remove(Atom)):- ignore('remove-atom'(Space, Atom)).
+
+remote_space_clear(Name):-
+    with_mutex(remote_space, retractall(remote_space_pending(Name,_))),
+    retractall(remote_space_cache(Name,_,_,_)),
+    remote_space_peer(Name, Peer, RemoteSpace),
+    remote_call(Peer, 'clear-atoms'(RemoteSpace)).
+
+remote_space_count(Name, Count):-
+    remote_space_flush(Name),
+    remote_space_peer(Name, Peer, RemoteSpace),
+    remote_call(Peer, 'atom-count'(RemoteSpace, Count)).
+
+remote_space_get_atoms(Name, Atoms):- findall(Atom, remote_space_atom(Name, Atom), Atoms).
+
+remote_space_atom(Name, Atom):-
+    remote_space_flush(Name),
+    remote_space_peer(Name, Peer, RemoteSpace),
+    remote_space_ttl(TTL),
+    (   TTL =< 0
+    ->  remote_solutions(Peer, Atom, metta_atom(RemoteSpace, Atom), [])
+    ;   (   variant_sha1(Atom, Key),
+            get_time(Now),
+            (   (remote_space_cache(Name, Key, Answers, Expires), Expires > Now)
+            ->  (   flag(remote_space_cache_hits,H,H+1),
+                    member(Atom, Answers))
+            ;   (   flag(remote_space_cache_misses,M,M+1),
+                    remote_space_cache_max(Max),
+                    Seen = seen(0,[]),
+                    (   remote_solutions(Peer, Atom, metta_atom(RemoteSpace, Atom), []),
+                        remote_space_seen(Seen, Max, Atom)
+                    ;   remote_space_cache_store(Name, Key, Seen, Max, Now, TTL),
+                        fail))))).
+
+remote_space_cache_max(N):- option_else('remote-space-cache-max',V,1000), any_to_i(V,N), N >= 0, !.
+remote_space_cache_max(1000).
+
+% keeps a copy of each answer while it is handed on, until there are more
+% than Max of them; past that the pattern is not worth caching
+remote_space_seen(Seen, Max, Atom):- arg(1, Seen, N), N1 is N + 1,
+    nb_setarg(1, Seen, N1),
+    (   N1 > Max
+    ->  nb_setarg(2, Seen, [])
+    ;   arg(2, Seen, Got), nb_setarg(2, Seen, [Atom|Got])).
+
+% only reached once the caller has taken every answer
+remote_space_cache_store(Name, Key, seen(N,Got), Max, Now, TTL):-
+    (   N > Max
+    ->  true
+    ;   reverse(Got, Answers),
+        Expires is Now + TTL,
+        retractall(remote_space_cache(Name, Key, _, _)),
+        assertz(remote_space_cache(Name, Key, Answers, Expires))).
+
+% ===============================
+%  Sharded spaces
+% ===============================
+% A sharded space spreads its atoms over several remote spaces, one per
+% worker process, so a KB too large for one process can still be loaded
+% and matched as one space:
+%   !(bind! &fb (sharded-space! 4))                     ; spawns 4 workers
+%   !(bind! &fb (sharded-space! ("localhost:3100" "localhost:3101")))
+% Each atom goes to the shard picked by hashing its first argument
+% (shard-key arg, the default) or its leading symbol (shard-key head);
+% atoms without one are hashed whole.  Atoms whose key is not ground could
+% match any key, so they are kept on the first shard and every match asks
+% it too.  A match whose key is bound is sent to its own shard (and the
+% first one, once it holds such atoms), any other match is asked of every
+% shard at once.
+
+:- dynamic(sharded_space_shards/2).  % Name, shards(Shard1,...,ShardN)
+:- dynamic(sharded_space_loose/1).   % Name: its first shard holds atoms with an unbound key
+:- dynamic(shard_worker/2).          % Port, process id
+
+is_nonlocal_space(Name):- is_sharded_space(Name).
+
+is_sharded_space(Name):- atom(Name), sharded_space_shards(Name,_).
+
+:- register_space_type(is_sharded_space,
+     [clear_space-sharded_space_clear, add_atom-sharded_space_add,
+      remove_atom-sharded_space_remove, replace_atom-sharded_space_replace,
+      atom_count-sharded_space_count, get_atoms-sharded_space_get_atoms,
+      atom_iter-sharded_space_atom]).
+
+% sharded_space(+CountOrPeers, -Name)
+sharded_space(N, Name):- integer(N), !,
+    spawn_shard_workers(N, Peers),
+    sharded_space(Peers, Name).
+sharded_space(Peers, Name):-
+    maplist(peer_key, Peers, Keys),
+    maplist(shard_remote_space, Keys, ShardList),
+    maplist(term_to_atom, Keys, Ps),
+    atomic_list_concat(Ps, ',', Joined),
+    format(atom(Name), '&sharded:~w', [Joined]),
+    Shards =.. [shards|ShardList],
+    retractall(sharded_space_shards(Name,_)),
+    assertz(sharded_space_shards(Name, Shards)).
+
+% (sharded-space! CountOrPeers) in MeTTa
+'sharded-space!'(CountOrPeers, Name):- sharded_space(CountOrPeers, Name).
+
+shard_remote_space(Key, Shard):- remote_space(Key, '&self', Shard).
+
+shard_key_mode(Mode):- option_else('shard-key',Mode,arg).
+
+% shard_key(+Atom, -Key): fails when Atom could live on any shard
+shard_key(Atom, Key):- shard_key_mode(Mode), shard_key(Mode, Atom, Key0), ground(Key0), Key = Key0.
+
+shard_key(_, Atom, _):- var(Atom), !, fail.
+shard_key(head, [H|_], H):- !.
+shard_key(arg, [_,A|_], A):- !.
+shard_key(_, Atom, Atom).
+
+shard_for(Shards, Atom, Shard):-
+    functor(Shards, _, N),
+    (   shard_key(Atom, Key)
+    ->  term_hash(Key, Hash), I is Hash mod N + 1
+    ;   I = 1),
+    arg(I, Shards, Shard).
+
+shard_list(Name, ShardList):- sharded_space_shards(Name, Shards), Shards =.. [_|ShardList].
+
+sharded_space_add(Name, Atom):-
+    sharded_space_shards(Name, Shards),
+    (   (shard_key(Atom, _) ; sharded_space_loose(Name))
+    ->  true
+    ;   assertz(sharded_space_loose(Name))),
+    shard_for(Shards, Atom, Shard),
+    'add-atom'(Shard, Atom).
+
+sharded_space_remove(Name, Atom):-
+    sharded_space_shards(Name, Shards),
+    (   shard_key(Atom, _)
+    ->  shard_for(Shards, Atom, Shard), 'remove-atom'(Shard, Atom)
+    ;   shard_list(Name, ShardList), forall(member(Shard, ShardList), 'remove-atom'(Shard, Atom))).
+
+sharded_space_replace(Name, Old, New):-
+    sharded_space_remove(Name, Old),
+    sharded_space_add(Name, New).
+
+sharded_space_clear(Name):-
+    retractall(sharded_space_loose(Name)),
+    shard_list(Name, ShardList),
+    forall(member(Shard, ShardList), 'clear-atoms'(Shard)).
+
+sharded_space_count(Name, Count):-
+    shard_list(Name, ShardList),
+    concurrent_maplist('atom-count', ShardList, Counts),
+    sum_list(Counts, Count).
+
+sharded_space_get_atoms(Name, Atoms):- findall(Atom, sharded_space_atom(Name, Atom), Atoms).
+
+sharded_space_atom(Name, Atom):-
+    sharded_space_shards(Name, Shards),
+    (   shard_key(Atom, _)
+    ->  shard_for(Shards, Atom, Shard),
+        (   metta_atom(Shard, Atom)
+        ;   sharded_space_loose(Name), arg(1, Shards, First), First \== Shard,
+            metta_atom(First, Atom))
+    ;   Shards =.. [_|ShardList],
+        shard_scatter(Atom, ShardList)).
+
+% Asks every shard at once, one feeder thread per shard, and hands on the
+% answers as they arrive.  The feeders share a queue of at most remote-chunk
+% answers per shard, so a slow caller holds back the shards instead of
+% piling up their answers, and cutting the match stops them all.  Scatter
+% queries skip the remote-space read cache: their answers would be cached
+% by every shard at once.
+shard_scatter(Pattern, ShardList):-
+    length(ShardList, N),
+    remote_chunk_size(Chunk),
+    Max is Chunk * N,
+    setup_call_cleanup(
+        (   message_queue_create(Queue, [max_size(Max)]),
+            findall(Id, (member(Shard, ShardList),
+                         thread_create(shard_feed(Queue, Pattern, Shard), Id, [])), Ids)),
+        shard_gather(Queue, N, Pattern),
+        (   message_queue_destroy(Queue),
+            forall(member(Id, Ids), catch(thread_join(Id, _), _, true)))).
+
+shard_feed(Queue, Pattern, Shard):-
+    catch(( remote_space_flush(Shard),
+            remote_space_peer(Shard, Peer, RemoteSpace),
+            forall(remote_solutions(Peer, Pattern, metta_atom(RemoteSpace, Pattern), []),
+                   thread_send_message(Queue, answer(Pattern))),
+            thread_send_message(Queue, done)),
+          Error,
+          catch(thread_send_message(Queue, error(Error)), _, true)).
+
+shard_gather(Queue, N, Pattern):-
+    Left = left(N),
+    repeat,
+    (   arg(1, Left, 0)
+    ->  !, fail
+    ;   thread_get_message(Queue, Msg),
+        shard_message(Msg, Left, Pattern)).
+
+shard_message(answer(Pattern), _, Pattern).
+shard_message(done, Left, _):- arg(1, Left, N), N1 is N - 1, nb_setarg(1, Left, N1), fail.
+shard_message(error(Error), _, _):- throw(Error).
+
+% Starts N worker processes, each serving its own &self on the ports
+% after shard-base-port (default 3100), and waits for them to listen.
+% The service is started by a -g after --, which run_cmd_args/0 runs during
+% start-up like any other command line goal; a swipl -g would only run
+% after loon/1 has already halted a --repl=false process.
+spawn_shard_workers(N, Peers):-
+    option_else('shard-base-port', B, 3100), any_to_i(B, Base),
+    Last is Base + N - 1,
+    numlist(Base, Last, Ports),
+    maplist(spawn_shard_worker, Ports),
+    maplist(await_shard_worker(600), Ports),
+    maplist(local_peer, Ports, Peers).
+
+local_peer(Port, localhost:Port).
+
+spawn_shard_worker(Port):- shard_worker(Port, _), !.
+spawn_shard_worker(Port):-
+    interpreter_source_file(File),
+    format(atom(Goal), 'start_vspace_service(~w),thread_get_message(_)', [Port]),
+    process_create(path(swipl), [File, '--', '--repl=false', '-g', Goal],
+                   [stdin(null), process(Pid), detached(true)]),
+    assertz(shard_worker(Port, Pid)).
+
+await_shard_worker(Tries, Port):-
+    (   catch((connect_to_service(localhost:Port, Stream), close_connection(Stream)), _, fail)
+    ->  true
+    ;   Tries > 0
+    ->  sleep(0.1), Left is Tries - 1, await_shard_worker(Left, Port)
+    ;   throw(error(shard_worker_not_listening(Port), _))).
+
+stop_shard_workers:-
+    forall(retract(shard_worker(_, Pid)), catch(process_kill(Pid), _, true)).
+:- at_halt(stop_shard_workers).
 
 /*
 ;; Example usage (from MeTTa)
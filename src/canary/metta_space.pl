@@ -76,11 +76,17 @@ call_match(G):- call(G).
 
 'save-space!'(Space,File):-
  setup_call_cleanup(
-  open(File,write,Out,[]),
+  open(File,write,Out,[buffer(full)]),
+  save_space_atoms(Space,Out),
+  close(Out)).
+
+save_space_atoms(Space,Out):- option_value('fast-print',false),!,
   with_output_to(Out,
    forall(get_atoms(Space,Atom),
-      write_src(Atom))),
-  close(Out)).
+      write_src(Atom))).
+save_space_atoms(Space,Out):-
+  forall(get_atoms(Space,Atom),
+     (write_src_fast(Out,Atom),nl(Out))).
 
 
 :- dynamic(repeats/1).
@@ -133,17 +139,36 @@ skip(_).
  ((   space_type_method(Type,add_atom,Method), call(Type,SpaceNameOrInstance),!,
     if_t((SpaceNameOrInstance\=='&self' ; Type\=='is_asserted_space'),
        dout(space,['type-method',Type,Method,SpaceNameOrInstance,Atom])),
-    call(Method,SpaceNameOrInstance,Atom))).
+    call(Method,SpaceNameOrInstance,Atom),
+    maybe_invalidate_type_cache(Atom),
+    note_defined_symbol(Atom))).
 % Add Atom
 'add-atom'(Environment, AtomDeclaration, Result):-
       eval_args(['add-atom', Environment, AtomDeclaration], Result).
 
+% Heads of definitions and type declarations, numbered in the order they
+% were first added, so front ends (REPL and Jupyter completion) can ask for
+% just the names defined since they last looked.
+:- dynamic(metta_defined_symbol/2).
+note_defined_symbol([Eq,[S|_]|_]):- Eq == '=', symbol(S), !, note_defined_symbol1(S).
+note_defined_symbol([Colon,S,_]):- Colon == ':', symbol(S), !, note_defined_symbol1(S).
+note_defined_symbol(_).
+
+note_defined_symbol1(S):- metta_defined_symbol(_,S),!.
+note_defined_symbol1(S):- flag(metta_defined_symbols,N,N+1), assertz(metta_defined_symbol(N,S)).
+
+% Symbols numbered From up to (not including) Next
+metta_defined_symbols_since(From,Symbols,Next):-
+    flag(metta_defined_symbols,Next,Next), Last is Next-1,
+    findall(S,(between(From,Last,N),metta_defined_symbol(N,S)),Symbols).
+
 % remove an atom from the space
 'remove-atom'(SpaceNameOrInstance, Atom) :-
     dout(space,['remove-atom',SpaceNameOrInstance, Atom]),
     space_type_method(Type,remove_atom,Method), call(Type,SpaceNameOrInstance),!,
     dout(space,['type-method',Type,Method]),
-    call(Method,SpaceNameOrInstance,Atom).
+    call(Method,SpaceNameOrInstance,Atom),
+    maybe_invalidate_type_cache(Atom).
 % Remove Atom
 'remove-atom'(Environment, AtomDeclaration, Result):- eval_args(['remove-atom', Environment, AtomDeclaration], Result).
 
@@ -152,7 +177,9 @@ skip(_).
     dout(space,['replace-atom',SpaceNameOrInstance, Atom, New]),
     space_type_method(Type,replace_atom,Method), call(Type,SpaceNameOrInstance),!,
     dout(space,['type-method',Type,Method]),
-    call(Method,SpaceNameOrInstance,Atom, New).
+    call(Method,SpaceNameOrInstance,Atom, New),
+    maybe_invalidate_type_cache(Atom),
+    maybe_invalidate_type_cache(New).
 % Replace Atom
 'atom-replace'(Environment, OldAtom, NewAtom, Result):- eval_args(['atom-replace', Environment, OldAtom, NewAtom], Result).
 
@@ -220,7 +247,11 @@ was_asserted_space('&concepts').
 was_asserted_space('&belief_events').
 */
 is_asserted_space(X):- was_asserted_space(X).
-is_asserted_space(X):-          \+ is_as_nb_space(X), \+ py_named_space(X),!.
+is_asserted_space(X):-          \+ is_as_nb_space(X), \+ py_named_space(X), \+ is_nonlocal_space(X),!.
+
+% Spaces whose atoms live in another process (see metta_server.pl)
+:- multifile(is_nonlocal_space/1).
+:- dynamic(is_nonlocal_space/1).
 
 is_python_space_not_prolog(X):- \+ is_as_nb_space(X), \+ is_asserted_space(X).
 
@@ -260,6 +291,13 @@ is_nb_space(G):- nonvar(G), is_as_nb_space(G).
 
 :- multifile(space_type_method/3).
 :- dynamic(space_type_method/3).
+% Puts Type's Method-Pred pairs ahead of the other types, since
+% is_asserted_space/1 claims any space it is asked about.
+register_space_type(Type,Methods):-
+    retractall(space_type_method(Type,_,_)),
+    reverse(Methods,Reversed),
+    forall(member(Method-Pred,Reversed),asserta(space_type_method(Type,Method,Pred))).
+
 space_type_method(is_as_nb_space,new_space,init_space).
 space_type_method(is_as_nb_space,clear_space,clear_nb_atoms).
 space_type_method(is_as_nb_space,add_atom,add_nb_atom).
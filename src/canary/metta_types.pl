@@ -410,25 +410,71 @@ get_operator_typedef(Self,Op,ParamTypes,RetType):-
   len_or_unbound(ParamTypes,Len),
   get_operator_typedef(Self,Op,Len,ParamTypes,RetType).
 
-reset_cache:- retractall(get_operator_typedef0(_,_,_,_,_)).
+% ===============================
+% Type-check cache
+% ===============================
+% Resolved operator signatures (get_operator_typedef0/5) are memoized and
+% dropped whenever a (: ...) atom is added to or removed from a space.
+% can_assign/2 is two unifications, cheaper than any lookup, so it is not.
+% Turn off with --type-cache=false, report with type_cache_stats/0.
+
+type_cache_enabled:- \+ option_value('type-cache',false).
+
+type_cache_hit(Which):- flag(type_cache_hit(Which),N,N+1).
+type_cache_miss(Which):- flag(type_cache_miss(Which),N,N+1).
+
+reset_cache:- type_cache_invalidate.
 
 :- dynamic(get_operator_typedef0/5).
+type_cache_invalidate:-
+  retractall(get_operator_typedef0(_,_,_,_,_)),
+  flag(type_cache_invalidations,N,N+1).
+
+% called from 'add-atom'/'remove-atom'/'replace-atom'
+maybe_invalidate_type_cache(Atom):- is_list(Atom), Atom=[Colon|_], Colon==':', !, type_cache_invalidate.
+maybe_invalidate_type_cache(_).
+
+type_cache_stats:-
+  flag(type_cache_hit(typedef),Hits,Hits),
+  flag(type_cache_miss(typedef),Misses,Misses),
+  Total is Hits + Misses,
+  (Total > 0 -> Rate is 100.0 * Hits / Total ; Rate = 0.0),
+  pl_stats(type_cache_hits(typedef),Hits),
+  pl_stats(type_cache_misses(typedef),Misses),
+  pl_stats(type_cache_hit_rate(typedef),Rate),
+  flag(type_cache_invalidations,Inv,Inv),
+  pl_stats('Type cache invalidations',Inv),
+  nl.
+
+type_cache_reset_stats:-
+  flag(type_cache_hit(typedef),_,0), flag(type_cache_miss(typedef),_,0),
+  flag(type_cache_invalidations,_,0).
+
 get_operator_typedef(Self,Op,Len,ParamTypes,RetType):-
  len_or_unbound(ParamTypes,Len),
- if_or_else(get_operator_typedef0(Self,Op,Len,ParamTypes,RetType),
+ if_or_else(cached_operator_typedef(Self,Op,Len,ParamTypes,RetType),
  if_or_else(get_operator_typedef1(Self,Op,Len,ParamTypes,RetType),
             get_operator_typedef2(Self,Op,Len,ParamTypes,RetType))).
 
+cached_operator_typedef(Self,Op,Len,ParamTypes,RetType):-
+  type_cache_enabled,
+  (\+ \+ get_operator_typedef0(Self,Op,Len,ParamTypes,RetType)
+    -> (type_cache_hit(typedef), get_operator_typedef0(Self,Op,Len,ParamTypes,RetType))
+    ;  (type_cache_miss(typedef), fail)).
+
+cache_operator_typedef(Self,Op,Len,ParamTypes,RetType):-
+  if_t(type_cache_enabled, assert(get_operator_typedef0(Self,Op,Len,ParamTypes,RetType))).
+
 get_operator_typedef1(Self,Op,Len,ParamTypes,RetType):-
    len_or_unbound(ParamTypes,Len),
    if_t(nonvar(ParamTypes),append(ParamTypes,[RetType],List)),
    metta_type(Self,Op,['->'|List]),
    if_t(var(ParamTypes),append(ParamTypes,[RetType],List)),
-   assert(get_operator_typedef0(Self,Op,Len,ParamTypes,RetType)).
+   cache_operator_typedef(Self,Op,Len,ParamTypes,RetType).
 get_operator_typedef2(Self,Op,Len,ParamTypes,RetType):-
   ignore('AnyRet'=RetType),
   maplist(is_eval_kind,ParamTypes),
-  assert(get_operator_typedef0(Self,Op,Len,ParamTypes,RetType)).
+  cache_operator_typedef(Self,Op,Len,ParamTypes,RetType).
   %nop(wdmsg(missing(get_operator_typedef2(Self,Op,ParamTypes,RetType)))),!,fail.
 
 
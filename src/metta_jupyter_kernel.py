@@ -10,11 +10,15 @@ from ipykernel.kernelbase import Kernel
 from pexpect import replwrap, EOF
 from subprocess import check_output
 from mettalog  import ExtendedMeTTa
+from mettalog.completion import symbol_trie, refresh_from_prolog
+from mettalog.forms import split_toplevel_forms
 
 import re
 import signal
-
-crlf_pat = re.compile(r'[\r\n]+')
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from time import monotonic_ns
 
 def flush_console():
     try:
@@ -24,6 +28,17 @@ def flush_console():
       sys.stderr.flush()
     except Exception: ""
 
+# An interpreter built ahead of time by metta_kernel_pool, used by the
+# first kernel started in this process instead of building a new one.
+WARM_METTA = None
+
+def format_elapsed(elapsed_ns):
+    if elapsed_ns >= 1e9:
+        return f"{elapsed_ns / 1e9:.3f} s"
+    if elapsed_ns >= 1e6:
+        return f"{elapsed_ns / 1e6:.1f} ms"
+    return f"{elapsed_ns / 1e3:.0f} us"
+
 class MeTTaKernel(Kernel):
     implementation = 'MeTTa'
     implementation_version = '0.16'
@@ -39,11 +54,25 @@ class MeTTaKernel(Kernel):
 
     banner = "An Jupyter kernel for MeTTa - version %s" % implementation_version
 
+    # set METTA_KERNEL_TIMING=0 to hide the time taken by each form
+    show_timing = os.environ.get('METTA_KERNEL_TIMING', '1') != '0'
+
     def __init__(self, **kwargs):
         super(MeTTaKernel,self).__init__(**kwargs)
         self._start_MeTTa()
+        # Every form runs on this one thread, so it keeps a single Prolog
+        # engine and the kernel stays free to answer while a cell runs.
+        self._worker_tid = None
+        self._interrupted = threading.Event()
+        self._worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix='metta-eval',
+                                          initializer=self._attach_worker)
+        self._worker.submit(refresh_from_prolog)
 
     def _start_MeTTa(self):
+        global WARM_METTA
+        if WARM_METTA is not None:
+            self.MeTTa, WARM_METTA = WARM_METTA, None
+            return
         sig = signal.signal(signal.SIGINT, signal.SIG_DFL)
         try:
             #self.MeTTa = replwrap.REPLWrapper("MeTTa", "MeTTa> ", None)
@@ -51,37 +80,95 @@ class MeTTaKernel(Kernel):
         finally:
             signal.signal(signal.SIGINT, sig)
 
-    def do_execute(self, code, silent, store_history=True,
-                   user_expressions=None, allow_stdin=False):
-        code = crlf_pat.sub(' ', code.strip())
-        if not code:
+    def _attach_worker(self):
+        try:
+            from pyswip.prolog import Prolog
+            Prolog._init_prolog_thread()
+            self._worker_tid = list(Prolog.query("thread_self(T)"))[0]["T"]
+        except Exception as e:
+            print(f"metta-eval: no Prolog thread id, interrupts disabled ({e})", file=sys.stderr)
+
+    def _interrupt_worker(self, signum=None, frame=None):
+        self._interrupted.set()
+        if self._worker_tid is None:
+            return
+        try:
+            from pyswip.prolog import Prolog
+            list(Prolog.query(f"thread_signal({self._worker_tid}, throw(interrupted))"))
+        except Exception as e:
+            print(f"metta-eval: interrupt failed ({e})", file=sys.stderr)
+
+    def _drain_interrupt(self):
+        """Takes an interrupt signalled after the last form had already finished."""
+        # it is still queued on the worker's Prolog thread and would
+        # otherwise be thrown into the first form of the next cell
+        try:
+            from pyswip.prolog import Prolog
+            list(Prolog.query("catch(true, interrupted, true)"))
+        except Exception:
+            pass
+
+    def _stream(self, name, text):
+        self.send_response(self.iopub_socket, 'stream', {'name': name, 'text': text})
+
+    def _eval_form(self, form, silent):
+        """Runs one form on the worker thread, streaming each answer as it arrives."""
+        t0 = monotonic_ns()
+        for result in self.MeTTa.run(form):
+            if isinstance(result, tuple):
+                result = result[-1]
+            if not silent:
+                self._stream('stdout', f"{result}\n")
+        elapsed_ns = monotonic_ns() - t0
+        refresh_from_prolog()  # names the form defined, for do_complete
+        flush_console()
+        return elapsed_ns
+
+    def do_complete(self, code, cursor_pos):
+        start = cursor_pos
+        while start > 0 and not code[start - 1].isspace() and code[start - 1] not in '()"':
+            start -= 1
+        return {'status': 'ok', 'matches': symbol_trie.complete(code[start:cursor_pos]),
+                'cursor_start': start, 'cursor_end': cursor_pos, 'metadata': {}}
+
+    async def do_execute(self, code, silent, store_history=True,
+                         user_expressions=None, allow_stdin=False):
+        forms = split_toplevel_forms(code)
+        if not forms:
             return {'status': 'ok', 'execution_count': self.execution_count,
                     'payload': [], 'user_expressions': {}}
 
-        interrupted = False
-        outputM = self.MeTTa.run(code)
+        self._interrupted.clear()
+        await asyncio.wrap_future(self._worker.submit(self._drain_interrupt))
+        saved_sigint = signal.signal(signal.SIGINT, self._interrupt_worker)
         try:
-            output = f"{outputM}"
-            print("output="+output, file=sys.stderr)
-            if sys.__stdout__ is not None: print("output="+output, file=sys.__stdout__)
-            flush_console()
-            #output = self.MeTTa.run_command(code, timeout=None)
-        except KeyboardInterrupt:
-            self.MeTTa.child.sendintr()
-            interrupted = True
-            self.MeTTa._expect_prompt()
-            output = self.MeTTa.child.before
-        except EOF:
-            output = self.MeTTa.child.before + 'Restarting MeTTa, use CRTL+D to exit'
-            self._start_MeTTa()
-
-        if not silent:
-            # Send standard output
-            stream_content = {'name': 'stdout', 'text': "\r\n".join(output.splitlines()[1:])}
-            self.send_response(self.iopub_socket, 'stream', stream_content)
-
-        if interrupted:
-            return {'status': 'abort', 'execution_count': self.execution_count}
+            for form in forms:
+                if self._interrupted.is_set():
+                    # arrived between two forms, so no form saw it
+                    if not silent:
+                        self._stream('stderr', f"Interrupted before: {form}\n")
+                    return {'status': 'abort', 'execution_count': self.execution_count}
+                try:
+                    elapsed_ns = await asyncio.wrap_future(self._worker.submit(self._eval_form, form, silent))
+                except Exception as e:
+                    if self._interrupted.is_set():
+                        if not silent:
+                            self._stream('stderr', f"Interrupted: {form}\n")
+                        return {'status': 'abort', 'execution_count': self.execution_count}
+                    ename, evalue = type(e).__name__, str(e)
+                    if not silent:
+                        self._stream('stderr', f"{form}\n{ename}: {evalue}\n")
+                    return {'status': 'error', 'execution_count': self.execution_count,
+                            'ename': ename, 'evalue': evalue, 'traceback': [form, f"{ename}: {evalue}"]}
+                if self.show_timing and not silent:
+                    self._stream('stdout', f"; {form[:60]} ({format_elapsed(elapsed_ns)})\n")
+            if self._interrupted.is_set():
+                # arrived while the last form was finishing
+                if not silent:
+                    self._stream('stderr', f"Interrupted: {forms[-1]}\n")
+                return {'status': 'abort', 'execution_count': self.execution_count}
+        finally:
+            signal.signal(signal.SIGINT, saved_sigint)
 
         return {'status': 'ok', 'execution_count': self.execution_count,
                 'payload': [], 'user_expressions': {}}
@@ -258,20 +345,8 @@ MAIN FEATURES
         matches = latex_matches(token)
         if matches:
             return matches
-        # from the language environment:
-        slist = metta.execute_string_rm("(get-completions)")
-        if not metta.exception_q(slist):
-            for item in slist:
-                item_str = str(item)
-                if item_str.startswith(token) and item_str not in matches:
-                    matches.append(item_str)
-        # special forms and constants:
-        for item in ["add-atom", "remove-atom", "match", "let", "let*",
-                     "!", "=", ":", "&",
-                     "superpose", "collapse", "&self", "if", "case", "nop",
-                     "init-state", "bind!", "init-space"]:
-            if item.startswith(token) and item not in matches:
-                matches.append(item)
+        # from the language environment, special forms included:
+        matches = symbol_trie.complete(token)
         # add items from ENVIRONMENT
         for item in ENVIRONMENT:
             if item.startswith(token) and item not in matches:
@@ -0,0 +1,267 @@
+# -*- coding: utf-8 -*-
+"""
+Warm-pool startup for the MeTTa Jupyter kernel.
+
+    python3 -m metta_kernel_pool --serve      # template process
+    python3 -m metta_kernel_pool -f conn.json # what kernel.json runs
+
+The template imports mettalog, builds an ExtendedMeTTa and runs one query,
+then waits on a unix socket.  Each kernel launch connects, passes its
+stdio, argv, cwd and environment, and the template forks a child that
+becomes the kernel with the interpreter already loaded.  The launcher
+stays in the foreground for Jupyter, forwarding signals to the child and
+exiting when it does.
+
+When no template is listening the launcher starts one in the background
+for next time and runs a cold kernel itself.  METTA_KERNEL_POOL=0 always
+starts cold.
+
+The socket lives in $XDG_RUNTIME_DIR (or a 0700 directory of our own under
+the temp dir) and both ends check the other's uid before trusting it.  A
+lock file next to the socket keeps it to one template per user.  The
+template retires after METTA_KERNEL_POOL_IDLE seconds without a launch
+(default 1800, 0 never) and as soon as a launch finds the interpreter
+sources changed since it warmed up, so the next launch gets a fresh one.
+"""
+
+import fcntl
+import json
+import os
+import signal
+import socket
+import stat
+import struct
+import subprocess
+import sys
+import tempfile
+import threading
+
+FORWARDED_SIGNALS = (signal.SIGINT, signal.SIGTERM, signal.SIGHUP, signal.SIGQUIT)
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+# what the warm interpreter was built from
+SOURCES = [os.path.join(SRC_DIR, d) for d in ('canary', 'mettalog')] + \
+    [os.path.join(SRC_DIR, f) for f in ('metta_jupyter_kernel.py', 'metta_kernel_pool.py')]
+
+def pool_socket_path():
+    path = os.environ.get('METTA_KERNEL_POOL_SOCKET')
+    if path:
+        return path
+    runtime = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime and os.path.isdir(runtime):
+        return os.path.join(runtime, 'metta-kernel-pool.sock')
+    return os.path.join(private_dir(os.path.join(tempfile.gettempdir(), f"metta-kernel-pool-{os.getuid()}")),
+                        'pool.sock')
+
+def private_dir(path):
+    """path as a directory only we can use; refuses one someone else made."""
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+    st = os.lstat(path)
+    if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid() or stat.S_IMODE(st.st_mode) & 0o077:
+        raise PermissionError(f"{path} is not a private directory")
+    return path
+
+def peer_uid(sock):
+    pid, uid, gid = struct.unpack('3i', sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED,
+                                                        struct.calcsize('3i')))
+    return uid
+
+def sources_stamp():
+    """Newest modification time among the interpreter sources."""
+    newest = 0
+    for top in SOURCES:
+        if os.path.isfile(top):
+            newest = max(newest, os.stat(top).st_mtime_ns)
+            continue
+        for dirpath, _, files in os.walk(top):
+            for f in files:
+                if f.endswith(('.pl', '.py', '.metta')):
+                    newest = max(newest, os.stat(os.path.join(dirpath, f)).st_mtime_ns)
+    return newest
+
+def idle_timeout():
+    seconds = float(os.environ.get('METTA_KERNEL_POOL_IDLE', '1800'))
+    return seconds if seconds > 0 else None
+
+# ------------------------------------------------------------------
+# Template side
+# ------------------------------------------------------------------
+
+def warm_up():
+    """Pay the interpreter start-up cost once, before any kernel asks."""
+    import metta_jupyter_kernel
+    from ipykernel.kernelapp import IPKernelApp  # noqa: F401, imported so children don't have to
+    sig = signal.signal(signal.SIGINT, signal.SIG_DFL)
+    try:
+        metta = metta_jupyter_kernel.ExtendedMeTTa()
+        list(metta.run("!(+ 1 1)"))
+    finally:
+        signal.signal(signal.SIGINT, sig)
+    try:
+        # forking is only safe while Prolog runs on this one thread
+        from pyswip.prolog import Prolog
+        list(Prolog.query("set_prolog_gc_thread(stop)"))
+    except Exception as e:
+        print(f"metta-kernel-pool: could not stop the Prolog gc thread ({e})", file=sys.stderr)
+    return metta
+
+def take_pool_lock(path):
+    """The lock fd if no other template serves path, else None."""
+    fd = os.open(path + '.lock', os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        os.close(fd)
+        return None
+    return fd
+
+def socket_answers(path):
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+        return True
+    except OSError:
+        return False
+    finally:
+        probe.close()
+
+def serve(path):
+    # two cold launches may both start a template; only the first stays
+    lock = take_pool_lock(path)
+    if lock is None or socket_answers(path):
+        return
+    stamp = sources_stamp()
+    metta = warm_up()
+    if os.path.exists(path):
+        os.unlink(path)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    umask = os.umask(0o077)
+    try:
+        server.bind(path)
+    finally:
+        os.umask(umask)
+    server.listen(16)
+    server.settimeout(idle_timeout())
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+    print(f"metta-kernel-pool: ready on {path}", file=sys.stderr)
+    while True:
+        try:
+            conn, _ = server.accept()
+        except socket.timeout:
+            print("metta-kernel-pool: idle, exiting", file=sys.stderr)
+            break
+        conn.settimeout(None)
+        if peer_uid(conn) != os.getuid():
+            conn.close()
+            continue
+        if sources_stamp() != stamp:
+            # retire before answering so the launcher's replacement gets the lock
+            print("metta-kernel-pool: sources changed, exiting", file=sys.stderr)
+            os.unlink(path)
+            os.close(lock)
+            conn.close()
+            return
+        try:
+            _, fds, _, _ = socket.recv_fds(conn, 1, 3)
+            request = json.loads(conn.makefile('rb').readline())
+        except Exception as e:
+            print(f"metta-kernel-pool: bad request ({e})", file=sys.stderr)
+            conn.close()
+            continue
+        if os.fork() == 0:
+            server.close()
+            os.close(lock)
+            run_kernel(conn, request, fds, metta)
+        conn.close()
+        for fd in fds:
+            os.close(fd)
+    os.unlink(path)
+    os.close(lock)
+
+def run_kernel(conn, request, fds, metta):
+    """In the forked child: take over the launcher's identity and run the kernel."""
+    try:
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+        os.setsid()
+        for target, fd in enumerate(fds):
+            if fd != target:
+                os.dup2(fd, target)
+                os.close(fd)
+        os.chdir(request['cwd'])
+        os.environ.clear()
+        os.environ.update(request['env'])
+        sys.argv = [sys.argv[0]] + request['argv']
+        conn.sendall(f"{os.getpid()}\n".encode())
+        threading.Thread(target=exit_with_launcher, args=(conn,), daemon=True).start()
+
+        import metta_jupyter_kernel
+        from ipykernel.kernelapp import IPKernelApp
+        metta_jupyter_kernel.WARM_METTA = metta
+        IPKernelApp.launch_instance(kernel_class=metta_jupyter_kernel.MeTTaKernel)
+    finally:
+        os._exit(0)
+
+def exit_with_launcher(conn):
+    # the launcher never writes, so recv only returns once it has gone
+    try:
+        conn.recv(1)
+    finally:
+        os._exit(0)
+
+# ------------------------------------------------------------------
+# Launcher side (keep imports light: this runs on every kernel start)
+# ------------------------------------------------------------------
+
+def start_pool_in_background(path):
+    subprocess.Popen([sys.executable, '-m', 'metta_kernel_pool', '--serve'],
+                     env=dict(os.environ, METTA_KERNEL_POOL_SOCKET=path),
+                     stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                     start_new_session=True)
+
+def cold_start(argv):
+    os.execv(sys.executable, [sys.executable, '-m', 'metta_jupyter_kernel'] + argv)
+
+def launch(argv):
+    if os.environ.get('METTA_KERNEL_POOL', '1') == '0':
+        cold_start(argv)
+    try:
+        path = pool_socket_path()
+    except OSError as e:
+        print(f"metta-kernel-pool: {e}, starting cold", file=sys.stderr)
+        cold_start(argv)
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+        if peer_uid(sock) != os.getuid():
+            print(f"metta-kernel-pool: {path} belongs to another user, starting cold", file=sys.stderr)
+            sock.close()
+            cold_start(argv)
+        socket.send_fds(sock, [b'F'], [0, 1, 2])
+        sock.sendall(json.dumps({'argv': argv, 'cwd': os.getcwd(), 'env': dict(os.environ)}).encode() + b'\n')
+        reply = sock.makefile('rb').readline()
+    except OSError:
+        reply = b''
+    if not reply:
+        sock.close()
+        start_pool_in_background(path)
+        cold_start(argv)
+    pid = int(reply)
+
+    def forward(signum, frame):
+        try:
+            os.kill(pid, signum)
+        except ProcessLookupError:
+            pass
+    for signum in FORWARDED_SIGNALS:
+        signal.signal(signum, forward)
+    while sock.recv(1):
+        pass
+
+if __name__ == '__main__':
+    if sys.argv[1:] == ['--serve']:
+        serve(pool_socket_path())
+    else:
+        launch(sys.argv[1:])
@@ -62,7 +62,15 @@ try: from pyswip import (Atom as PySwipAtom, Term, call, Functor, PL_discard_for
 except ImportError as e:
     if verbose >= 0: print_exception_stack(e)
 
-try: from pyswip.easy import newModule, Query
+try: from pyswip.easy import newModule, Query, getTerm
+except ImportError as e:
+    if verbose >= 0: print_exception_stack(e)
+
+try: from pyswip.core import PL_exception
+except ImportError as e:
+    if verbose >= 0: print_exception_stack(e)
+
+try: from pyswip.prolog import PrologError
 except ImportError as e:
     if verbose >= 0: print_exception_stack(e)
 
@@ -814,7 +822,14 @@ class PySwipQ(Query):
         super().__init__(*terms, **kwargs)
 
     def nextSolution(self):
-        return Query.nextSolution()
+        if Query.nextSolution():
+            return True
+        # the query catches what Prolog throws and just fails, so an error
+        # or an interrupt would look like running out of answers
+        exception = PL_exception(Query.qid)
+        if exception:
+            raise PrologError(f"{getTerm(exception)}")
+        return False
         #return PL_next_solution(Query.qid)
     #nextSolution = staticmethod(nextSolution)
 
@@ -1181,13 +1196,15 @@ def _eval_mettalog(fn, *args):
     #user = newModule("user")
     X = Variable()
     q = PySwipQ(call_sexpr(argmode, selected_space_name, str(expr), swip_obj, X))
-    while q.nextSolution():
+    try:
+        while q.nextSolution():
+            flush_console()
+            r = X.value
+            println(r)
+            yield s2m(circles, r)
+    finally:
+        q.closeQuery()
         flush_console()
-        r = X.value
-        println(r)
-        yield s2m(circles, r)
-    q.closeQuery()
-    flush_console()
 
 @export_flags(MeTTa=True, CallsVSpace=True)
 def mettalog_pl():
@@ -1242,19 +1259,21 @@ def call_mettalog(line, parseWithRust = False, returnMetta = False, flat=False):
         swip_obj = m2s(circles, expr);
         if verbose > 1: print_cmt(f"% P-Expr {swip_obj}")
     else:
-        swip_obj = line
+        expr = swip_obj = line
 
     flush_console()
     call_sexpr = Functor("call_sexpr", 5)
     user = newModule("user")
     X = Variable()
     q = PySwipQ(call_sexpr(argmode, selected_space_name, str(line), swip_obj, X))
-    while q.nextSolution():
+    try:
+        while q.nextSolution():
+            flush_console()
+            if returnMetta: yield expr, s2m1(circles, X.value)
+            else: yield X.value
+    finally:
+        q.closeQuery()
         flush_console()
-        if returnMetta: yield expr, s2m1(circles, X.value)
-        else: yield X.value
-    q.closeQuery()
-    flush_console()
 
 
 
@@ -1303,6 +1322,7 @@ def vspace_init():
 
 
 from collections.abc import Iterable
+from mettalog.completion import symbol_trie
 
 def is_lisp_dashed(s):
     pattern = re.compile('^[A-Za-z0-9-_:]+$')
@@ -1604,6 +1624,7 @@ def register_mettalog_atom_op(m, name, symbol):
         #print_l_cmt(2, f"register_atom: {name} {symbol}")
         print_operations_table(name, {name:symbol}, quiet = True)
     op_registry_atoms[name]=symbol
+    symbol_trie.add(name)
 
 
 def register_mettalog_token_op(m, regexp, constr):
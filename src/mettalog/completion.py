@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+
+# Symbol completion shared by the REPL (repl_loop.completer) and the Jupyter kernel.
+#
+# Symbols live in a burst trie.  A node keeps a sorted bucket of the symbols
+# under its prefix until the bucket grows past BURST_SIZE; then it bursts
+# into one child per next character, keeping only the symbol equal to its
+# own prefix, if any.  Adding a symbol walks to the one bucket that can hold
+# it, so inserts stay cheap however many symbols there are, and update()
+# sorts a batch once and merges it into each bucket it reaches.  A lookup
+# walks the burst nodes and bisects one bucket, or visits the subtree under
+# a short prefix in order, stopping at the limit.
+
+import threading
+from bisect import bisect_left
+from heapq import merge
+from itertools import groupby
+
+BURST_SIZE = 256
+
+SPECIAL_FORMS = ["add-atom", "remove-atom", "match", "let", "let*",
+                 "!", "=", ":", "&", "superpose", "collapse", "&self", "if", "case", "nop",
+                 "init-state", "bind!", "init-space", "import!", "get-atoms", "new-space"]
+
+class _Node:
+    __slots__ = ("bucket", "children")
+
+    def __init__(self, bucket=None):
+        self.bucket = bucket if bucket is not None else []
+        self.children = None  # next character -> _Node, once burst
+
+class SymbolTrie:
+    def __init__(self, symbols=()):
+        self._root = _Node()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.update(symbols)
+
+    def __len__(self):
+        return self._size
+
+    def __contains__(self, symbol):
+        node, _ = self._walk(symbol)
+        if node is None: return False
+        bucket = node.bucket
+        i = bisect_left(bucket, symbol)
+        return i < len(bucket) and bucket[i] == symbol
+
+    def _walk(self, prefix):
+        """The deepest node on the path of prefix, and its depth."""
+        node, depth = self._root, 0
+        while node.children is not None and depth < len(prefix):
+            node = node.children.get(prefix[depth])
+            if node is None: return None, depth
+            depth += 1
+        return node, depth
+
+    def add(self, symbol):
+        """Add one symbol; returns False if it was already known."""
+        if not symbol: return False
+        with self._lock:
+            node, depth = self._root, 0
+            while node.children is not None and depth < len(symbol):
+                node = node.children.setdefault(symbol[depth], _Node())
+                depth += 1
+            bucket = node.bucket
+            i = bisect_left(bucket, symbol)
+            if i < len(bucket) and bucket[i] == symbol: return False
+            bucket.insert(i, symbol)
+            self._size += 1
+            if node.children is None and len(bucket) > BURST_SIZE: self._burst(node, depth)
+            return True
+
+    def update(self, symbols):
+        """Add many symbols: sorted once, then merged into each bucket they reach."""
+        batch = sorted(set(s for s in symbols if s))
+        if not batch: return
+        with self._lock:
+            self._insert(self._root, 0, batch)
+
+    def _insert(self, node, depth, batch):
+        # batch: sorted distinct symbols, all starting with node's prefix
+        if node.children is None:
+            before = len(node.bucket)
+            node.bucket = [s for s, _ in groupby(merge(node.bucket, batch))]
+            added = len(node.bucket) - before
+            self._size += added
+            if len(node.bucket) > BURST_SIZE: self._burst(node, depth)
+            return added
+        added = 0
+        for c, group in groupby(batch, key=lambda s: s[depth] if len(s) > depth else None):
+            group = list(group)
+            if c is None:
+                if not node.bucket:
+                    node.bucket = group
+                    added += 1
+                    self._size += 1
+                continue
+            child = node.children.get(c)
+            if child is None: child = node.children[c] = _Node()
+            added += self._insert(child, depth + 1, group)
+        return added
+
+    def _burst(self, node, depth):
+        bucket, node.bucket, node.children = node.bucket, [], {}
+        for c, group in groupby(bucket, key=lambda s: s[depth] if len(s) > depth else None):
+            if c is None:
+                node.bucket = list(group)
+            else:
+                node.children[c] = child = _Node(list(group))
+                if len(child.bucket) > BURST_SIZE: self._burst(child, depth + 1)
+
+    def discard(self, symbol):
+        with self._lock:
+            node, _ = self._walk(symbol)
+            if node is None: return
+            bucket = node.bucket
+            i = bisect_left(bucket, symbol)
+            if i < len(bucket) and bucket[i] == symbol:
+                del bucket[i]
+                self._size -= 1
+
+    def complete(self, prefix, limit=200):
+        """Up to limit known symbols starting with prefix, sorted."""
+        with self._lock:
+            node, depth = self._walk(prefix)
+            if node is None: return []
+            found = []
+            if node.children is None or depth < len(prefix):
+                bucket = node.bucket
+                for i in range(bisect_left(bucket, prefix), len(bucket)):
+                    if len(found) >= limit or not bucket[i].startswith(prefix): break
+                    found.append(bucket[i])
+            else:
+                self._collect(node, found, limit)
+            return found
+
+    def _collect(self, node, found, limit):
+        # a node's own symbol sorts before its children, and they in character order
+        found.extend(node.bucket[:limit - len(found)])
+        if node.children is None: return
+        for c in sorted(node.children):
+            if len(found) >= limit: return
+            self._collect(node.children[c], found, limit)
+
+# The one trie the REPL and the kernel both complete from
+symbol_trie = SymbolTrie(SPECIAL_FORMS)
+
+# Definitions made before the first refresh, whatever loaded them
+SEED_QUERY = ("findall(S, (distinct(S, (metta_atom('&self', ['=', [S|_], _]) ; "
+              "metta_atom('&self', [':', S, _]))), atom(S)), Symbols)")
+
+_refresh_lock = threading.Lock()
+_next_symbol = None  # first metta_defined_symbol/2 number not yet read, None until seeded
+
+def refresh_from_prolog(trie=symbol_trie):
+    """
+    Add the symbols the interpreter has defined since the last call; the
+    first call also loads everything defined before it.  'add-atom' numbers
+    each new definition head, so a refresh only reads the new ones.  Call it
+    on a thread that can run Prolog queries.  Returns False when the
+    interpreter could not be asked, so a later call tries again.
+    """
+    global _next_symbol
+    if not _refresh_lock.acquire(blocking=False):
+        return True  # another thread is refreshing right now
+    try:
+        from pyswip.prolog import Prolog
+        Prolog._init_prolog_thread()
+        since = _next_symbol
+        if since is None:
+            since = list(Prolog.query("flag(metta_defined_symbols, N, N)"))[0]["N"]
+            for answer in Prolog.query(SEED_QUERY):
+                trie.update(str(s) for s in answer["Symbols"])
+        for answer in Prolog.query(f"metta_defined_symbols_since({since}, Symbols, Next)"):
+            trie.update(str(s) for s in answer["Symbols"])
+            since = answer["Next"]
+        _next_symbol = since
+        return True
+    except Exception:
+        return False  # interpreter not up yet
+    finally:
+        _refresh_lock.release()
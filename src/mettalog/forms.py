@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+
+# Splitting MeTTa source into top-level forms without parsing it, shared by
+# the REPL (repl_loop) and the Jupyter kernel so each form can be run, timed
+# and reported on by itself.
+
+def split_toplevel_forms(code):
+    """
+    Split source text into its top-level forms, keeping a leading ! with the
+    form it applies to and dropping ; comments.
+    """
+    forms, current, depth, i, n = [], [], 0, 0, len(code)
+    def finish():
+        text = "".join(current).strip()
+        if text and text != "!":
+            forms.append(text)
+        current.clear()
+    while i < n:
+        c = code[i]
+        if c == ';':
+            while i < n and code[i] != '\n':
+                i += 1
+            continue
+        if c == '"':
+            j = i + 1
+            while j < n and code[j] != '"':
+                j += 2 if code[j] == '\\' else 1
+            current.append(code[i:j + 1])
+            i = j + 1
+            if depth == 0 and "".join(current).strip() != "!":
+                finish()
+            continue
+        if c == '(':
+            depth += 1
+        elif c == ')':
+            depth -= 1
+        if c.isspace() and depth == 0:
+            if "".join(current).strip() not in ("", "!"):
+                finish()
+            i += 1
+            continue
+        current.append(c)
+        if c == ')' and depth <= 0:
+            depth = 0
+            finish()
+        i += 1
+    finish()
+    return forms
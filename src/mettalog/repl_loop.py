@@ -7,7 +7,7 @@
 # Douglas R. Miles 2023
 
 # Standard Library Imports
-import atexit, io, inspect, json, os, re, subprocess, sys, traceback
+import atexit, io, inspect, json, os, re, select, subprocess, sys, threading, traceback
 import sys
 import os
 import importlib.util
@@ -177,11 +177,19 @@ def insertDefaultHistory():
     insert_to_history('!(import! &self mettalog)', position_from_last=1)
     insert_to_history('!(import! &self motto)', position_from_last=1)
 
-OPTIONS = ['apple', 'banana', 'cherry', 'date', 'elderberry']
+from mettalog.completion import symbol_trie, refresh_from_prolog
+from mettalog.forms import split_toplevel_forms
+
+# readline asks for state 0, 1, 2... of the same text; look it up once
+completer_cache = {"text": None, "options": []}
 
 # The completer function
 def completer(text, state):
-    options = [i for i in OPTIONS if i.startswith(text)]
+    if state == 0 or completer_cache["text"] != text:
+        refresh_from_prolog()
+        completer_cache["text"] = text
+        completer_cache["options"] = symbol_trie.complete(text)
+    options = completer_cache["options"]
     if state < len(options):
         return options[state]
     else:
@@ -228,8 +236,99 @@ def repl_loop_impl(theMeTTa, get_sexpr_input=get_sexpr_input, print_cmt=print_cm
         #global selected_space_name
 
 
+        interactive = sys.stdin.isatty()
+        pushed_back = []
+        at_eof = False
+
+        def more_input():
+            # piped input, or pasted text already waiting, so no one is typing it
+            if not interactive: return True
+            try: return bool(select.select([sys.stdin], [], [], 0)[0])
+            except (OSError, ValueError): return False
+
+        def read_input(prmpt):
+            if pushed_back: return pushed_back.pop()
+            if at_eof: raise EOFError
+            return get_sexpr_input(prmpt)
+
+        def plain_metta(sline):
+            # what the dispatch below would not take as a command or comment
+            return not (sline.startswith(("@", ".", ";", "+", "-", "?", "^")) or sline.endswith(".")
+                        or sline == "!")
+
+        def print_error(e):
+            if verbose > 0: print_cmt(f"Error: {e}")
+            if verbose > 0:
+                buf = io.StringIO()
+                sys.stderr = buf
+                traceback.print_exc()
+                sys.stderr = sys.__stderr__
+                print_cmt(buf.getvalue().replace('rolog', 'ySwip'))
+
+        def run_metta(prefix, rest, line):
+            if prefix == "^":
+                println(theMeTTa.run(line));
+            else:
+                yield from run_parsed(prefix, parse_single(rest))
+
+        def run_parsed(prefix, expr):
+            if prefix == "?":
+                yield expr, the_running_metta_space().subst(expr, expr)
+            elif prefix == "+":
+                println(the_running_metta_space().add_atom(expr))
+            elif prefix == "-":
+                println(the_running_metta_space().remove_atom(expr))
+            else:
+                yield expr, interpret(the_running_metta_space(), expr)
+
+        runner_space = the_new_runner_space
+
+        def run_batch(forms):
+            # Consecutive plain MeTTa forms, run with one timing line: a form
+            # after ! is interpreted and a bare one follows the submode, as
+            # if typed.  In the + and ! submodes on the runner's own space
+            # that is what running them as a program does, so the runner
+            # parses and runs the lot in one call.  Otherwise the text is
+            # parsed once and each form dispatched; one that fails is
+            # reported and the rest still run.
+            t0 = monotonic_ns()
+            if submode == "!":
+                forms = [f if f.startswith("!") else "!" + f for f in forms]
+            program = "\n".join(forms)
+            if submode in "+!" and the_running_metta_space() is runner_space:
+                try:
+                    results = theMeTTa.run_hyperon(program)
+                    bangs = [f[1:] for f in forms if f.startswith("!")]
+                    yield from zip(bangs, results)
+                except Exception as e:
+                    print_error(e)
+            elif submode == "^":
+                for form in forms:
+                    try:
+                        yield from run_metta("^", form, form)
+                    except Exception as e:
+                        print_error(e)
+            else:
+                try:
+                    exprs = theMeTTa.parse_all(program)
+                except Exception as e:
+                    print_error(e)
+                    exprs = []
+                bang = False
+                for expr in exprs:
+                    if expr == S("!"):
+                        bang = True
+                        continue
+                    try:
+                        yield from run_parsed("!" if bang else submode, expr)
+                    except Exception as e:
+                        print_error(e)
+                    bang = False
+            if verbose > 0: timeFrom(f"MeTTa batch of {len(forms)}", t0)
+
         #history = []
         load_vspace()
+        threading.Thread(target=refresh_from_prolog, daemon=True).start()
 
         while True:
             try:
@@ -237,12 +336,33 @@ def repl_loop_impl(theMeTTa, get_sexpr_input=get_sexpr_input, print_cmt=print_cm
                 # Use the input function to get user input
                 prmpt = f"; {mode}@{selected_space_name} {submode}> "
 
-                line = get_sexpr_input(prmpt)
+                line = read_input(prmpt)
 
                 #print_cmt(f"You entered: {line}\n")
 
                 if line:
                     sline = line.lstrip().rstrip()
+                    # piped or pasted MeTTa: gather the plain forms that follow
+                    # and run them as one batch, up to the next command line
+                    if mode == "metta" and plain_metta(sline):
+                        text = line
+                        while more_input():
+                            try:
+                                more = get_sexpr_input("")
+                            except EOFError:
+                                at_eof = True
+                                break
+                            if not more.strip():
+                                continue
+                            if not plain_metta(more.strip()):
+                                pushed_back.append(more)
+                                break
+                            text += "\n" + more
+                        forms = split_toplevel_forms(text)
+                        if len(forms) > 1:
+                            yield from run_batch(forms)
+                            continue
+                        line, sline = text, text.strip()
                     add_to_history_if_unique(line, position_from_last=1)
                 else:
                     continue
@@ -477,29 +597,8 @@ def repl_loop_impl(theMeTTa, get_sexpr_input=get_sexpr_input, print_cmt=print_cm
 
                         #print_cmt(f"submode={submode} rest={rest} ")
 
-                        if prefix == "!":
-                            expr = parse_single(rest)
-                            yield expr, interpret(the_running_metta_space(), expr)
-                            continue
-                        elif prefix == "?":
-                            expr = parse_single(rest)
-                            yield expr, the_running_metta_space().subst(expr, expr)
-                            continue
-                        elif prefix == "+":
-                            expr = parse_single(rest)
-                            println(the_running_metta_space().add_atom(expr))
-                            continue
-                        elif prefix == "-":
-                            expr = parse_single(rest)
-                            println(the_running_metta_space().remove_atom(expr))
-                            continue
-                        elif prefix == "^":
-                            println(theMeTTa.run(line));
-                            continue
-                        else:
-                            expr = parse_single(rest)
-                            yield expr, interpret(the_running_metta_space(), expr)
-                            continue
+                        yield from run_metta(prefix, rest, line)
+                        continue
                     finally:
                         if verbose > 0: timeFrom("MeTTa", t0)
 
@@ -521,13 +620,7 @@ def repl_loop_impl(theMeTTa, get_sexpr_input=get_sexpr_input, print_cmt=print_cm
                 continue
 
             except Exception as e:
-                if verbose > 0: print_cmt(f"Error: {e}")
-                if verbose > 0:
-                    buf = io.StringIO()
-                    sys.stderr = buf
-                    traceback.print_exc()
-                    sys.stderr = sys.__stderr__
-                    print_cmt(buf.getvalue().replace('rolog', 'ySwip'))
+                print_error(e)
                 continue
 
 def repl(theMeTTa, get_sexpr_input=get_sexpr_input, print_cmt=print_cmt, mode="metta"):
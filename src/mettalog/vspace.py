@@ -404,25 +404,27 @@ class VSpace(AbstractSpace):
         q = PySwipQ(Functor('metta_iter_bind', 4)
                     (self.swip_space_name(), swip_obj, varsList, varNames), module=self.sp_module)
 
-        while q.nextSolution():
-            swivars = varsList.value
-            bindings = Bindings()
-            vn = 0
-            for mv in metta_vars:
-                svar = swivars[vn]
-                sval = svar
-                if verbose > 1: pt(f"svar({vn})=", svar, " ")
-                if isinstance(svar, Variable):
-                    sval = sval.value
-                else: sval = svar
-                if verbose > 1: pt(f"sval({vn})=", sval, " ")
-                mval = s2m(circles, sval)
-                if verbose > 1: pt(f"mval({vn})=", mval, " ")
-                bindings.add_var_binding(mv, mval)
-                vn = vn + 1
-
-            new_bindings_set.push(bindings)
-        q.closeQuery()
+        try:
+            while q.nextSolution():
+                swivars = varsList.value
+                bindings = Bindings()
+                vn = 0
+                for mv in metta_vars:
+                    svar = swivars[vn]
+                    sval = svar
+                    if verbose > 1: pt(f"svar({vn})=", svar, " ")
+                    if isinstance(svar, Variable):
+                        sval = sval.value
+                    else: sval = svar
+                    if verbose > 1: pt(f"sval({vn})=", sval, " ")
+                    mval = s2m(circles, sval)
+                    if verbose > 1: pt(f"mval({vn})=", mval, " ")
+                    bindings.add_var_binding(mv, mval)
+                    vn = vn + 1
+
+                new_bindings_set.push(bindings)
+        finally:
+            q.closeQuery()
         return new_bindings_set
 
     def _call(self, functor_name, *args):
@@ -0,0 +1,80 @@
+# The stdlib-only helpers of src/metta_kernel_pool.py: where the socket
+# lives, the one-template lock, and when a template should retire.
+import importlib.util
+import os
+import socket
+
+SRC = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'src')
+
+spec = importlib.util.spec_from_file_location('metta_kernel_pool', os.path.join(SRC, 'metta_kernel_pool.py'))
+pool = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(pool)
+
+def test_socket_path_from_environment(monkeypatch, tmp_path):
+    monkeypatch.setenv('METTA_KERNEL_POOL_SOCKET', str(tmp_path / 'p.sock'))
+    assert pool.pool_socket_path() == str(tmp_path / 'p.sock')
+    monkeypatch.delenv('METTA_KERNEL_POOL_SOCKET')
+    monkeypatch.setenv('XDG_RUNTIME_DIR', str(tmp_path))
+    assert pool.pool_socket_path() == str(tmp_path / 'metta-kernel-pool.sock')
+
+def test_private_dir_is_0700_and_refuses_open_ones(tmp_path):
+    path = str(tmp_path / 'mine')
+    assert pool.private_dir(path) == path
+    assert os.stat(path).st_mode & 0o777 == 0o700
+    assert pool.private_dir(path) == path  # already there is fine
+    os.chmod(path, 0o755)
+    try:
+        pool.private_dir(path)
+        assert False, "a group/world readable directory was accepted"
+    except PermissionError:
+        pass
+
+def test_only_one_template_gets_the_lock(tmp_path):
+    path = str(tmp_path / 'pool.sock')
+    first = pool.take_pool_lock(path)
+    assert first is not None
+    assert pool.take_pool_lock(path) is None
+    os.close(first)
+    again = pool.take_pool_lock(path)
+    assert again is not None
+    os.close(again)
+
+def test_socket_answers_and_peer_uid(tmp_path):
+    path = str(tmp_path / 'pool.sock')
+    assert not pool.socket_answers(path)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(path)
+    server.listen(1)
+    try:
+        assert pool.socket_answers(path)
+        client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        client.connect(path)
+        conn, _ = server.accept()
+        assert pool.peer_uid(conn) == os.getuid()
+        assert pool.peer_uid(client) == os.getuid()
+        conn.close()
+        client.close()
+    finally:
+        server.close()
+
+def test_idle_timeout(monkeypatch):
+    monkeypatch.delenv('METTA_KERNEL_POOL_IDLE', raising=False)
+    assert pool.idle_timeout() == 1800
+    monkeypatch.setenv('METTA_KERNEL_POOL_IDLE', '0')
+    assert pool.idle_timeout() is None
+    monkeypatch.setenv('METTA_KERNEL_POOL_IDLE', '2.5')
+    assert pool.idle_timeout() == 2.5
+
+def test_sources_stamp_follows_the_newest_source(monkeypatch, tmp_path):
+    (tmp_path / 'canary').mkdir()
+    old = tmp_path / 'canary' / 'a.pl'
+    old.write_text('a.')
+    os.utime(old, ns=(10**18, 10**18))
+    monkeypatch.setattr(pool, 'SOURCES', [str(tmp_path / 'canary'), str(tmp_path / 'missing.py')])
+    assert pool.sources_stamp() == 10**18
+    (tmp_path / 'canary' / 'notes.txt').write_text('ignored')
+    assert pool.sources_stamp() == 10**18
+    new = tmp_path / 'canary' / 'b.metta'
+    new.write_text('(b)')
+    os.utime(new, ns=(10**18 + 5, 10**18 + 5))
+    assert pool.sources_stamp() == 10**18 + 5
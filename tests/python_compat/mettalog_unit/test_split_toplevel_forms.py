@@ -0,0 +1,39 @@
+# split_toplevel_forms from src/mettalog/forms.py, loaded by path so the
+# mettalog package (and hyperon) is not imported.
+import importlib.util
+import os
+
+SRC = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'src', 'mettalog')
+
+spec = importlib.util.spec_from_file_location('forms', os.path.join(SRC, 'forms.py'))
+forms = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(forms)
+split_toplevel_forms = forms.split_toplevel_forms
+
+def test_one_form_per_entry():
+    assert split_toplevel_forms('(= (f) 1)\n!(f)') == ['(= (f) 1)', '!(f)']
+
+def test_several_forms_on_one_line():
+    assert split_toplevel_forms('(a) (b c) !(d)') == ['(a)', '(b c)', '!(d)']
+
+def test_form_over_several_lines():
+    assert split_toplevel_forms('(= (g $x)\n   (+ $x 1))\n') == ['(= (g $x)\n   (+ $x 1))']
+
+def test_bang_kept_with_its_form():
+    assert split_toplevel_forms('! (f)') == ['!(f)']
+    assert split_toplevel_forms('!\n(f)') == ['!(f)']
+
+def test_comments_dropped():
+    assert split_toplevel_forms('; heading\n(a) ; trailing ( paren\n(b)') == ['(a)', '(b)']
+
+def test_parens_and_semicolons_in_strings():
+    code = '(println! "a ) ; b") (c)'
+    assert split_toplevel_forms(code) == ['(println! "a ) ; b")', '(c)']
+    assert split_toplevel_forms(r'(s "q \" )") (d)') == [r'(s "q \" )")', '(d)']
+
+def test_bare_atoms():
+    assert split_toplevel_forms('foo !bar 12') == ['foo', '!bar', '12']
+
+def test_empty_and_blank():
+    assert split_toplevel_forms('') == []
+    assert split_toplevel_forms('  \n ; only a comment\n') == []
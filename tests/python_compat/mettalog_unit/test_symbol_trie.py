@@ -0,0 +1,92 @@
+# SymbolTrie from src/mettalog/completion.py.  The module is loaded by path:
+# importing the mettalog package would pull in hyperon, which these pure
+# Python pieces do not need.
+import importlib.util
+import os
+
+SRC = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'src', 'mettalog')
+
+def load(name):
+    spec = importlib.util.spec_from_file_location(name, os.path.join(SRC, name + '.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+completion = load('completion')
+SymbolTrie = completion.SymbolTrie
+
+def test_add_and_contains():
+    trie = SymbolTrie()
+    assert trie.add('match')
+    assert not trie.add('match')
+    assert not trie.add('')
+    assert 'match' in trie
+    assert 'mat' not in trie
+    assert 'matches' not in trie
+    assert len(trie) == 1
+
+def test_complete_long_prefix_bisects_one_bucket():
+    trie = SymbolTrie(['add-atom', 'add-reduct', 'adder', 'remove-atom', 'addx'])
+    assert trie.complete('add-') == ['add-atom', 'add-reduct']
+    assert trie.complete('adde') == ['adder']
+    assert trie.complete('zzz') == []
+
+def test_complete_short_prefix_walks_subtree():
+    trie = SymbolTrie(['a', 'ab', 'abc', 'abcd', 'abd', 'b'])
+    assert trie.complete('') == ['a', 'ab', 'abc', 'abcd', 'abd', 'b']
+    assert trie.complete('a') == ['a', 'ab', 'abc', 'abcd', 'abd']
+    assert trie.complete('ab') == ['ab', 'abc', 'abcd', 'abd']
+
+def test_complete_respects_limit():
+    trie = SymbolTrie(f'sym{i:03}' for i in range(500))
+    assert trie.complete('sym', limit=5) == ['sym000', 'sym001', 'sym002', 'sym003', 'sym004']
+    assert len(trie.complete('s', limit=7)) == 7
+    assert len(trie.complete('sym')) == 200
+
+def test_discard():
+    trie = SymbolTrie(['let', 'let*'])
+    trie.discard('let')
+    trie.discard('never-added')
+    assert 'let' not in trie
+    assert trie.complete('le') == ['let*']
+    assert len(trie) == 1
+
+def test_shared_trie_starts_with_special_forms():
+    for form in completion.SPECIAL_FORMS:
+        assert form in completion.symbol_trie
+
+def buckets(node):
+    yield node.bucket
+    for child in (node.children or {}).values():
+        yield from buckets(child)
+
+def test_buckets_burst_past_the_threshold():
+    symbols = [f'FBgn{i:07}' for i in range(5000)]
+    trie = SymbolTrie()
+    for symbol in symbols:
+        trie.add(symbol)
+    assert len(trie) == 5000
+    assert trie._root.children is not None
+    assert max(len(b) for b in buckets(trie._root)) <= completion.BURST_SIZE
+    assert trie.complete('FBgn000', limit=3) == symbols[:3]
+    assert trie.complete('FBgn00049') == symbols[4900:5000]
+    assert 'FBgn0004999' in trie and 'FBgn0005000' not in trie
+
+def test_update_merges_a_batch_into_existing_buckets():
+    trie = SymbolTrie(['b', 'FBgn0000001'])
+    trie.update(f'FBgn{i:07}' for i in range(3000, 0, -1))
+    trie.update(['b', 'a', ''])
+    assert len(trie) == 3002
+    assert max(len(b) for b in buckets(trie._root)) <= completion.BURST_SIZE
+    assert trie.complete('', limit=2) == ['FBgn0000001', 'FBgn0000002']
+    assert trie.complete('FBgn') == [f'FBgn{i:07}' for i in range(1, 201)]
+    assert trie.complete('a') == ['a'] and trie.complete('b') == ['b']
+
+def test_symbol_equal_to_a_burst_prefix():
+    trie = SymbolTrie(f'ab{i:04}' for i in range(1000))
+    trie.add('ab')
+    trie.add('ab0')
+    assert 'ab' in trie and 'ab0' in trie
+    assert trie.complete('ab', limit=3) == ['ab', 'ab0', 'ab0000']
+    trie.discard('ab0')
+    assert trie.complete('ab0', limit=2) == ['ab0000', 'ab0001']